@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark: type-ahead suggestions over a 200k-city index.
+
+Builds a weather_autocomplete.CityIndex from synthetic city names (or a
+real OpenWeatherMap city.list.json.gz) and replays typing: every prefix of
+many city names is one keystroke. Reports build time, index memory
+(tracemalloc) and per-keystroke latency (median, p99, max).
+
+    python benchmarks/bench_autocomplete.py [--cities N] [--city-list PATH]
+"""
+
+import argparse
+import os
+import random
+import string
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from weather_autocomplete import CityIndex, load_city_list  # noqa: E402
+
+BUDGET_MS = 1.0  # per keystroke
+SYLLABLES = ["an", "ber", "cas", "dor", "el", "fra", "gen", "ham", "is", "jo", "kar", "lon",
+             "mar", "new", "or", "pol", "qu", "ros", "san", "tor", "ur", "vil", "wes", "york"]
+
+
+def synthetic_cities(rng, count):
+    """(name, state, country, id, lat, lon) rows with realistic-looking names."""
+    rows = []
+    for i in range(count):
+        name = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).title()
+        if rng.random() < 0.1:
+            name += " " + rng.choice(["City", "Springs", "Heights", "Bay"])
+        country = rng.choice(string.ascii_uppercase) + rng.choice(string.ascii_uppercase)
+        rows.append((name, None, country, i, rng.uniform(-80, 80), rng.uniform(-180, 180)))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--cities", type=int, default=200000)
+    parser.add_argument("--city-list", help="OpenWeatherMap city.list.json(.gz) instead of synthetic names")
+    parser.add_argument("--queries", type=int, default=2000, help="city names typed letter by letter")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    rows = load_city_list(args.city_list) if args.city_list else synthetic_cities(rng, args.cities)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    index = CityIndex(rows, complete=True)
+    build = time.perf_counter() - start
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"index of {len(index)} cities built in {build:.2f}s, {memory / 1024 / 1024:.1f} MiB")
+
+    timings = []
+    for name, *_rest in rng.sample(rows, min(args.queries, len(rows))):
+        for end in range(1, len(name) + 1):
+            t0 = time.perf_counter()
+            index.suggest(name[:end])
+            timings.append(time.perf_counter() - t0)
+    timings.sort()
+    median = timings[len(timings) // 2] * 1e3
+    p99 = timings[int(len(timings) * 0.99)] * 1e3
+    print(f"{len(timings)} keystrokes: median {median:.3f} ms, p99 {p99:.3f} ms, "
+          f"max {timings[-1] * 1e3:.3f} ms")
+    ok = p99 < BUDGET_MS
+    print("OK" if ok else f"FAIL: p99 above the {BUDGET_MS} ms budget")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark: refreshing the 24-hour chart for many cities in a row.
+
+Compares the old refresh (ax.clear(), restyle, plot + fill_between,
+tight_layout, full draw) with weather_charts.HourlyChart, which reuses its
+artists and blits when the layout is unchanged. Reports time per refresh,
+memory growth (tracemalloc) and the number of artists left on the axes.
+Runs headless on the Agg canvas:
+
+    python benchmarks/bench_charts.py [--cities N]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    import matplotlib
+    matplotlib.use("Agg")
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+except ImportError:
+    matplotlib = None
+
+BG, FG, ACCENT, ACCENT_SOFT = "#ffffff", "#212529", "#0d6efd", "#cfe2ff"
+
+
+def synthetic_hours(rng, hour0):
+    base = rng.uniform(-5, 30)
+    labels = [f"{(hour0 + i) % 24:02d}:00" for i in range(24)]
+    temps = [base + 4 * ((i % 12) / 12) + rng.uniform(-1, 1) for i in range(24)]
+    return labels, temps
+
+
+def new_figure():
+    fig = Figure(figsize=(8, 3), dpi=100)
+    canvas = FigureCanvasAgg(fig)
+    return fig, fig.add_subplot(), canvas
+
+
+def old_refresh(fig, ax, canvas, labels, temps):
+    """What _update_hourly_chart used to do on every refresh."""
+    ax.clear()
+    x = list(range(len(temps)))
+    fig.patch.set_facecolor(BG)
+    ax.set_facecolor(BG)
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+    ax.spines['bottom'].set_color(FG)
+    ax.spines['left'].set_color(FG)
+    ax.tick_params(axis='x', colors=FG)
+    ax.tick_params(axis='y', colors=FG)
+    ax.plot(x, temps, marker='o', color=ACCENT, linewidth=3, markersize=5)
+    ax.fill_between(x, temps, color=ACCENT_SOFT, alpha=0.35)
+    ax.set_xticks(x[::2])
+    ax.set_xticklabels([labels[i] for i in x[::2]], rotation=45, ha='right')
+    ax.set_ylabel('°C')
+    ax.set_title("Next 24 Hours")
+    ax.grid(alpha=0.2)
+    fig.tight_layout()
+    canvas.draw()
+
+
+def run(name, refresh, datasets):
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    start = time.perf_counter()
+    for labels, temps in datasets:
+        refresh(labels, temps)
+    elapsed = (time.perf_counter() - start) / len(datasets)
+    growth = sum(stat.size_diff for stat in
+                 tracemalloc.take_snapshot().compare_to(before, "filename"))
+    tracemalloc.stop()
+    print(f"{name:<22} {elapsed * 1e3:8.2f} ms/refresh   memory growth {growth / 1024:8.1f} KiB")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--cities", type=int, default=200)
+    args = parser.parse_args()
+
+    if matplotlib is None:
+        print("matplotlib is not installed; nothing to benchmark.")
+        return 1
+    from weather_charts import HourlyChart
+
+    rng = random.Random(42)
+    # Consecutive refreshes within the same hour share tick labels, as on a dashboard
+    datasets = [synthetic_hours(rng, 6 + i // 50) for i in range(args.cities)]
+
+    fig, ax, canvas = new_figure()
+    old = run("old: clear + redraw", lambda l, t: old_refresh(fig, ax, canvas, l, t), datasets)
+    print(f"{'':<22} artists on axes: {len(ax.lines) + len(ax.collections)}")
+
+    fig, ax, canvas = new_figure()
+    chart = HourlyChart(fig, ax, canvas, BG, FG, ACCENT, ACCENT_SOFT)
+    new = run("new: HourlyChart", chart.update, datasets)
+    print(f"{'':<22} artists on axes: {len(ax.lines) + len(ax.collections)}   "
+          f"full draws {chart.full_draws}, blits {chart.blits}")
+    print(f"{old / new:.1f}x faster per refresh")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
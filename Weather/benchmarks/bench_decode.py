@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark: decoding a /forecast response body.
+
+Compares the old path (response.json() on the whole body, then walking the
+nested dicts into a ForecastTable) with weather_decode.decode_forecast, for
+decode time and peak memory (tracemalloc). Runs headless:
+
+    python benchmarks/bench_decode.py [--repeat N]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import weather_decode  # noqa: E402
+from weather_core import ForecastTable  # noqa: E402
+
+
+def synthetic_forecast_body(items=40, start=1_700_000_000):
+    """A /forecast body with every field OpenWeatherMap returns."""
+    entries = []
+    for i in range(items):
+        entries.append({
+            "dt": start + i * 10800,
+            "main": {"temp": 10.0 + (i % 8), "feels_like": 9.1, "temp_min": 9.5, "temp_max": 11.2,
+                     "pressure": 1012, "sea_level": 1012, "grnd_level": 1008, "humidity": 60 + i % 30,
+                     "temp_kf": 0.4},
+            "weather": [{"id": 500, "main": "Rain" if i % 3 else "Clouds",
+                         "description": "light rain" if i % 3 else "broken clouds", "icon": "10d"}],
+            "clouds": {"all": 75},
+            "wind": {"speed": 4.1, "deg": 230, "gust": 7.9},
+            "visibility": 10000,
+            "pop": round((i % 10) / 10, 1),
+            "rain": {"3h": 0.42},
+            "sys": {"pod": "d"},
+            "dt_txt": time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(start + i * 10800)),
+        })
+    payload = {
+        "cod": "200", "message": 0, "cnt": items, "list": entries,
+        "city": {"id": 2643743, "name": "London", "coord": {"lat": 51.5085, "lon": -0.1257},
+                 "country": "GB", "population": 1000000, "timezone": 3600,
+                 "sunrise": start - 20000, "sunset": start + 20000},
+    }
+    return json.dumps(payload).encode("utf-8")
+
+
+def old_path(body):
+    """response.json() + walking the full tree (what _fetch_weather used to do)."""
+    raw = json.loads(body)
+    return raw, ForecastTable.from_json(raw)
+
+
+def new_path(body):
+    return weather_decode.decode_forecast(body)
+
+
+def measure(fn, body, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn(body)
+    elapsed = (time.perf_counter() - start) / repeat
+
+    tracemalloc.start()
+    result = fn(body)
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=500)
+    args = parser.parse_args()
+
+    body = synthetic_forecast_body()
+    print(f"forecast body: {len(body)} bytes, orjson: {weather_decode.ORJSON_AVAILABLE}")
+    rows = []
+    for name, fn in (("old: json + tree walk", old_path),
+                     ("new: decode_forecast", new_path),
+                     ("new: stdlib streaming", weather_decode._decode_forecast_streaming)):
+        elapsed, peak, _ = measure(fn, body, args.repeat)
+        rows.append((name, elapsed, peak))
+        print(f"{name:<24} {elapsed * 1e6:9.1f} us/decode   peak {peak / 1024:8.1f} KiB")
+
+    base = rows[0]
+    for name, elapsed, peak in rows[1:]:
+        print(f"{name}: {base[1] / elapsed:.2f}x faster, {base[2] / max(peak, 1):.2f}x less peak memory")
+
+
+if __name__ == "__main__":
+    main()
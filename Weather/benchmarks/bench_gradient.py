@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark: drawing the GradientFrame background.
+
+Compares the old renderer (one canvas line per pixel row, rebuilt on every
+<Configure>) with weather_gradient.GradientCache, for a simulated resize
+drag and for switching between weather themes. Needs a display (e.g. run
+under xvfb-run on a headless machine):
+
+    python benchmarks/bench_gradient.py [--repeat N] [--height H]
+"""
+
+import argparse
+import os
+import sys
+import time
+import tkinter as tk
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from weather_gradient import GradientCache  # noqa: E402
+
+THEME_COLORS = [
+    ("#FFF3E0", "#FFE0B2"),
+    ("#E8EAF6", "#C5CAE9"),
+    ("#E3F2FD", "#BBDEFB"),
+    ("#EDE7F6", "#D1C4E9"),
+]
+
+
+def draw_lines(canvas, color1, color2, width, height):
+    """The original GradientFrame._draw_gradient."""
+    canvas.delete("gradient")
+    r1, g1, b1 = canvas.winfo_rgb(color1)
+    r2, g2, b2 = canvas.winfo_rgb(color2)
+    r_ratio = (r2 - r1) / height
+    g_ratio = (g2 - g1) / height
+    b_ratio = (b2 - b1) / height
+    for i in range(height):
+        nr = max(0, min(int(r1 + (r_ratio * i)), 65535))
+        ng = max(0, min(int(g1 + (g_ratio * i)), 65535))
+        nb = max(0, min(int(b1 + (b_ratio * i)), 65535))
+        canvas.create_line(0, i, width, i, fill=f'#{nr:04x}{ng:04x}{nb:04x}', tags="gradient")
+
+
+def make_draw_cached(cache):
+    def draw_cached(canvas, color1, color2, width, height):
+        canvas.delete("gradient")
+        img = cache.get(canvas, color1, color2, width, height)
+        canvas.create_image(0, 0, anchor="nw", image=img, tags="gradient")
+        canvas._gradient_image = img
+    return draw_cached
+
+
+def run(root, canvas, draw, frames):
+    """Draw every (colors, width, height) frame and flush to the screen."""
+    start = time.perf_counter()
+    for color1, color2, width, height in frames:
+        draw(canvas, color1, color2, width, height)
+        root.update_idletasks()
+    return (time.perf_counter() - start) / len(frames)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--height", type=int, default=700)
+    args = parser.parse_args()
+
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        print(f"No display available ({e}); run under xvfb-run.")
+        return 1
+    canvas = tk.Canvas(root, width=1000, height=args.height)
+    canvas.pack()
+    root.update()
+
+    c1, c2 = THEME_COLORS[0]
+    # A resize drag: the height wobbles around a few values, as while dragging
+    drag = [(c1, c2, 900 + (i % 20) * 5, args.height - (i % 6) * 10)
+            for i in range(60)] * args.repeat
+    # Refreshes that flip between weather themes at a fixed size
+    themes = [colors + (1000, args.height) for colors in THEME_COLORS] * (10 * args.repeat)
+
+    for label, frames in (("resize drag", drag), ("theme switches", themes)):
+        old = run(root, canvas, draw_lines, frames)
+        cache = GradientCache()
+        new = run(root, canvas, make_draw_cached(cache), frames)
+        print(f"{label:<15} lines: {old * 1e3:8.2f} ms/frame ({args.height} items)   "
+              f"cached image: {new * 1e3:7.2f} ms/frame (1 item)   "
+              f"{old / new:6.1f}x faster   {cache.stats()}")
+
+    root.destroy()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,316 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark: the forecast pipeline on saved API responses, against a baseline.
+
+Replays the /weather and /forecast bodies in benchmarks/fixtures/ through
+the functions behind the dashboard's _process_forecast_data,
+_get_24h_from_forecast, _group_hourly_by_day and _generate_suggestions
+(the weather_core functions they delegate to), headless:
+
+- single-city cases time each step on its own, cycling through the fixtures,
+- the N-city case (default 1,000) runs every step for each of N cities
+  derived from the fixtures (shifted temperatures, ids and names).
+
+The bundled fixtures are full-format responses for eight climates and
+time zones; benchmarks/record_fixtures.py replaces them with live ones.
+
+Each case reports ops/sec (best of --rounds) and the memory one op
+allocates including the result it keeps (tracemalloc peak / ops), and is
+compared with benchmarks/baseline.json:
+
+- memory is exact for a given Python version, so allocating more than
+  --tolerance above the baseline fails the run (exit 1) whenever the
+  baseline was recorded with the same Python major.minor,
+- ops/sec only compares on the machine that recorded the baseline (and
+  even there, shared or throttled CPUs swing by tens of percent), so
+  being slower fails the run only when the baseline's host matches this
+  one, or with --gate-time; otherwise it is reported as a warning.
+
+Record a baseline with --save-baseline before changing code, then rerun.
+
+Fixture timestamps are shifted by whole days so "now" falls in the first
+day of each forecast: the 24-hour window and "today" cover the same rows
+on every run, whatever the date.
+
+    python benchmarks/bench_pipeline.py [--cities N] [--save-baseline] [--only CASE]
+"""
+
+import argparse
+import gc
+import glob
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+from weather_core import (build_data_package, generate_suggestions,  # noqa: E402
+                          get_24h_from_forecast, group_hourly_by_day, process_forecast_data)
+from weather_decode import decode_current, decode_forecast  # noqa: E402
+
+FIXTURES_DIR = os.path.join(HERE, "fixtures")
+BASELINE_FILE = os.path.join(HERE, "baseline.json")
+DEFAULT_TOLERANCE = 0.25  # fraction slower (or more memory) that counts as a regression
+ROUND_TIME = 0.05  # seconds per timing round
+
+
+# --- Fixtures ---
+
+def shift_times(body, shift):
+    """Move every timestamp of a decoded /weather or /forecast response by `shift` seconds."""
+    for obj in [body, body.get("sys", {}), body.get("city", {})] + body.get("list", []):
+        for field in ("dt", "sunrise", "sunset"):
+            if isinstance(obj.get(field), int):
+                obj[field] += shift
+        if "dt_txt" in obj:
+            obj["dt_txt"] = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(obj["dt"]))
+    return body
+
+
+def load_fixtures(path=FIXTURES_DIR, now=None):
+    """
+    [(name, current, forecast)] decoded responses from `path`
+    (<name>_current.json + <name>_forecast.json), rebased to `now`.
+    """
+    now = time.time() if now is None else now
+    fixtures = []
+    for forecast_file in sorted(glob.glob(os.path.join(path, "*_forecast.json"))):
+        name = os.path.basename(forecast_file)[:-len("_forecast.json")]
+        with open(os.path.join(path, f"{name}_current.json"), encoding="utf-8") as f:
+            current = json.load(f)
+        with open(forecast_file, encoding="utf-8") as f:
+            forecast = json.load(f)
+        shift = int((now - forecast["list"][0]["dt"]) // 86400) * 86400
+        fixtures.append((name, shift_times(current, shift), shift_times(forecast, shift)))
+    if not fixtures:
+        raise SystemExit(f"no fixtures in {path} (record some with benchmarks/record_fixtures.py)")
+    return fixtures
+
+
+def derive_cities(fixtures, count, seed=42):
+    """`count` (current_body, forecast_body) pairs: fixture copies with their own id, name and temperatures."""
+    rng = random.Random(seed)
+    cities = []
+    for i in range(count):
+        name, current, forecast = fixtures[i % len(fixtures)]
+        current = json.loads(json.dumps(current))
+        forecast = json.loads(json.dumps(forecast))
+        delta = round(rng.uniform(-6.0, 6.0), 2)
+        for main in [current["main"]] + [item["main"] for item in forecast["list"]]:
+            for field in ("temp", "feels_like", "temp_min", "temp_max"):
+                main[field] = round(main[field] + delta, 2)
+        city_id = 9_000_000 + i
+        current["id"] = forecast["city"]["id"] = city_id
+        current["name"] = forecast["city"]["name"] = f"{current['name']} {i}"
+        cities.append((json.dumps(current).encode("utf-8"), json.dumps(forecast).encode("utf-8")))
+    return cities
+
+
+# --- Cases ---
+
+def pipeline(current_body, forecast_body, now):
+    """Everything a search runs between the response and the UI update."""
+    current = decode_current(current_body)
+    forecast = decode_forecast(forecast_body)
+    package = build_data_package(current, forecast, now)
+    get_24h_from_forecast(forecast, forecast.tz_offset)
+    process_forecast_data(forecast, forecast.tz_offset, daily=package["daily"])
+    return package
+
+
+def build_cases(fixtures, cities):
+    """
+    [(case, ops per call, fn)]; each fn runs one op per fixture (or per
+    city) and returns the results, as the app keeps them.
+    """
+    now = datetime.now()
+    bodies = [(json.dumps(c).encode("utf-8"), json.dumps(f).encode("utf-8")) for _n, c, f in fixtures]
+    decoded = [(decode_current(c), decode_forecast(f)) for c, f in bodies]
+    n = len(fixtures)
+
+    def decode():
+        return [(decode_current(c), decode_forecast(f)) for c, f in bodies]
+
+    def process():
+        return [process_forecast_data(table, table.tz_offset) for _current, table in decoded]
+
+    def hourly():
+        return [get_24h_from_forecast(table, table.tz_offset) for _current, table in decoded]
+
+    def group():
+        return [group_hourly_by_day(table, table.tz_offset) for _current, table in decoded]
+
+    def suggestions():
+        return [generate_suggestions(current, table) for current, table in decoded]
+
+    def package():
+        return [build_data_package(current, table, now) for current, table in decoded]
+
+    def many():
+        return [pipeline(current_body, forecast_body, now) for current_body, forecast_body in cities]
+
+    return [
+        ("decode", n, decode),
+        ("process_forecast_data", n, process),
+        ("get_24h_from_forecast", n, hourly),
+        ("group_hourly_by_day", n, group),
+        ("generate_suggestions", n, suggestions),
+        ("build_data_package", n, package),
+        (f"pipeline_{len(cities)}_cities", len(cities), many),
+    ]
+
+
+def check_outputs(fixtures):
+    """Fail fast if the pipeline returns nothing useful, so a broken step cannot look fast."""
+    now = datetime.now()
+    for name, current, forecast in fixtures:
+        package = pipeline(json.dumps(current).encode("utf-8"), json.dumps(forecast).encode("utf-8"), now)
+        table = package["forecast"]
+        hours = get_24h_from_forecast(table, table.tz_offset)
+        days = process_forecast_data(table, table.tz_offset, daily=package["daily"])
+        if len(hours) != 24 or not 4 <= len(days) <= 5 or not package["suggestions"]:
+            raise SystemExit(f"fixture {name}: unexpected output ({len(hours)} hours, {len(days)} days)")
+
+
+# --- Measurement ---
+
+def host_id():
+    """Identifies the machine and interpreter a baseline's timings belong to."""
+    return f"{platform.node()}/{platform.machine()}/python {platform.python_version()}"
+
+
+def same_python(baseline):
+    """True when `baseline` was recorded with this Python major.minor (memory compares)."""
+    recorded = str(baseline.get("python", "")).split(".")[:2]
+    return recorded == platform.python_version().split(".")[:2]
+
+
+def measure(fn, ops, rounds):
+    """
+    Return (ops/sec, peak bytes per op): the best of `rounds` timing rounds
+    with the garbage collector paused (like timeit), then one traced call
+    whose peak includes the results it returns.
+    """
+    fn()  # warm up (lazy imports, caches)
+    start = time.perf_counter()
+    fn()
+    once = time.perf_counter() - start
+    calls = max(1, int(ROUND_TIME / max(once, 1e-9)))
+    best = 0.0
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(rounds):
+            start = time.perf_counter()
+            for _ in range(calls):
+                fn()
+            best = max(best, calls * ops / (time.perf_counter() - start))
+    finally:
+        gc.enable()
+
+    tracemalloc.start()
+    result = fn()
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return best, peak / ops
+
+
+def compare(results, baseline, tolerance, gate_time=True, gate_memory=True):
+    """
+    Print results next to the baseline; return the names of regressed cases.
+    Slower (or larger) cases whose gate is off are only flagged as warnings.
+    """
+    cases = baseline.get("cases", {}) if baseline else {}
+    regressed = []
+    print(f"{'case':<26} {'ops/sec':>11} {'baseline':>11} {'change':>8}  {'KiB/op':>8} {'baseline':>9}")
+    for name, result in results.items():
+        base = cases.get(name)
+        if base is None:
+            print(f"{name:<26} {result['ops_per_sec']:11.1f} {'-':>11} {'':>8}  {result['peak_kib']:8.1f} {'-':>9}")
+            continue
+        change = result["ops_per_sec"] / base["ops_per_sec"] - 1
+        slower = change < -tolerance
+        bigger = result["peak_kib"] > base["peak_kib"] * (1 + tolerance)
+        flag = ""
+        if slower:
+            flag += "  SLOWER" if gate_time else "  slower (warning)"
+        if bigger:
+            flag += "  MORE MEMORY" if gate_memory else "  more memory (warning)"
+        print(f"{name:<26} {result['ops_per_sec']:11.1f} {base['ops_per_sec']:11.1f} {change:+8.1%}  "
+              f"{result['peak_kib']:8.1f} {base['peak_kib']:9.1f}{flag}")
+        if (slower and gate_time) or (bigger and gate_memory):
+            regressed.append(name)
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--cities", type=int, default=1000, help="cities in the multi-city case")
+    parser.add_argument("--rounds", type=int, default=10, help="timing rounds per case (best is kept)")
+    parser.add_argument("--fixtures", default=FIXTURES_DIR)
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--only", action="append", help="run only this case (repeatable)")
+    parser.add_argument("--gate-time", action="store_true",
+                        help="fail on slower cases even if the baseline is from another host")
+    args = parser.parse_args()
+
+    fixtures = load_fixtures(args.fixtures)
+    check_outputs(fixtures)
+    cities = derive_cities(fixtures, args.cities)
+    print(f"{len(fixtures)} fixtures ({', '.join(name for name, _c, _f in fixtures)}), "
+          f"{len(cities)} derived cities, python {platform.python_version()}")
+
+    results = {}
+    for name, ops, fn in build_cases(fixtures, cities):
+        if args.only and name not in args.only:
+            continue
+        ops_per_sec, peak = measure(fn, ops, args.rounds)
+        results[name] = {"ops_per_sec": round(ops_per_sec, 1), "peak_kib": round(peak / 1024, 1)}
+
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    gate_time = gate_memory = True
+    if baseline is not None and not args.save_baseline:
+        gate_time = args.gate_time or baseline.get("host") == host_id()
+        gate_memory = same_python(baseline)
+        if not gate_time:
+            print(f"baseline timings are from {baseline.get('host', 'another host')}: "
+                  f"slower cases are warnings (--gate-time to fail on them)")
+        if not gate_memory:
+            print(f"baseline memory is from python {baseline.get('python')}: larger cases are warnings")
+    regressed = compare(results, None if args.save_baseline else baseline, args.tolerance,
+                        gate_time, gate_memory)
+
+    if args.save_baseline:
+        cases = dict(baseline.get("cases", {})) if baseline and args.only else {}
+        cases.update(results)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({"host": host_id(), "python": platform.python_version(), "machine": platform.machine(),
+                       "recorded": datetime.now().isoformat(timespec="seconds"),
+                       "cases": cases}, f, indent=2)
+            f.write("\n")
+        print(f"baseline saved to {args.baseline}")
+        return 0
+    if baseline is None:
+        print("no baseline yet: run with --save-baseline to record one")
+        return 0
+    if regressed:
+        print(f"FAIL: {', '.join(regressed)} regressed by more than {args.tolerance:.0%}")
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
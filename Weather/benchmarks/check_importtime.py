@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+Import-time check: how long does `import modern_weather` take?
+
+Runs a fresh interpreter with `-X importtime`, parses its report and fails
+(exit code 1) when
+- a module that must be imported lazily (matplotlib, mplcursors,
+  tkintermapview) is imported at startup, or
+- the total import time exceeds the budget.
+
+The slowest top-level imports are printed so regressions are easy to trace:
+
+    python benchmarks/check_importtime.py [--budget-ms MS] [--top N]
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+WEATHER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Must only be imported when a chart or the map is first shown
+DEFERRED_MODULES = ("matplotlib", "mplcursors", "tkintermapview")
+DEFAULT_BUDGET_MS = 1500
+
+# "import time:       123 |       4567 |   package.module"
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def importtime(module):
+    """Return [(self_us, cumulative_us, depth, name)] for importing `module` in a fresh process."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          cwd=WEATHER_DIR, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr else "import failed")
+    rows = []
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            rows.append((int(self_us), int(cumulative_us), (len(indent) - 1) // 2, name))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--module", default="modern_weather")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    try:
+        rows = importtime(args.module)
+    except RuntimeError as e:
+        print(f"Could not import {args.module}: {e}")
+        return 2
+
+    # Only what `import module` pulled in; interpreter startup (site, encodings) is excluded
+    target = [r for r in rows if r[2] == 0 and r[3] == args.module]
+    total_ms = target[-1][1] / 1000 if target else 0.0
+    children = rows[:rows.index(target[-1])][::-1] if target else []
+    print(f"import {args.module}: {total_ms:.1f} ms (budget {args.budget_ms:.0f} ms)")
+    direct = []
+    for row in children:  # walk back from the target: its direct imports are at depth 1
+        if row[2] == 0:
+            break
+        if row[2] == 1:
+            direct.append(row)
+    for _self_us, cumulative_us, _depth, name in sorted(direct, key=lambda r: r[1], reverse=True)[:args.top]:
+        print(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+
+    failed = False
+    eager = sorted({name for _s, _c, _d, name in rows
+                    if name.split(".")[0] in DEFERRED_MODULES})
+    if eager:
+        failed = True
+        print(f"FAIL: imported at startup but should be deferred: {', '.join(eager)}")
+    if total_ms > args.budget_ms:
+        failed = True
+        print(f"FAIL: import time {total_ms:.1f} ms exceeds the {args.budget_ms:.0f} ms budget")
+    if not failed:
+        print("OK")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
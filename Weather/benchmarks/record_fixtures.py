@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""
+Record OpenWeatherMap responses as fixtures for bench_pipeline.py.
+
+Saves the raw /weather and /forecast bodies of each city as
+fixtures/<name>_current.json and fixtures/<name>_forecast.json (existing
+files are replaced). Commit the fixtures together with a new baseline
+(bench_pipeline.py --save-baseline), since results depend on the data.
+
+    python benchmarks/record_fixtures.py --api-key KEY [City ...]
+"""
+
+import argparse
+import os
+import sys
+
+import requests
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+from weather_client import location_params  # noqa: E402
+
+URLS = {
+    "current": "http://api.openweathermap.org/data/2.5/weather?{query}&appid={key}&units=metric",
+    "forecast": "http://api.openweathermap.org/data/2.5/forecast?{query}&appid={key}&units=metric",
+}
+DEFAULT_CITIES = ["London", "New York", "Tokyo", "Mumbai", "Sydney", "Reykjavik", "Kathmandu", "Phoenix"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("cities", nargs="*", default=DEFAULT_CITIES)
+    parser.add_argument("--api-key", default=os.environ.get("OWM_API_KEY"),
+                        help="OpenWeatherMap API key (default: $OWM_API_KEY)")
+    parser.add_argument("--out", default=os.path.join(HERE, "fixtures"))
+    args = parser.parse_args()
+    if not args.api_key:
+        parser.error("an API key is required (--api-key or $OWM_API_KEY)")
+
+    os.makedirs(args.out, exist_ok=True)
+    session = requests.Session()
+    for city in args.cities:
+        name = "_".join(city.split(",")[0].lower().split())
+        for endpoint, url in URLS.items():
+            response = session.get(url.format(key=args.api_key, **location_params(city)), timeout=15)
+            response.raise_for_status()
+            path = os.path.join(args.out, f"{name}_{endpoint}.json")
+            with open(path, "wb") as f:
+                f.write(response.content)
+            print(f"{city}: {endpoint} -> {path} ({len(response.content)} bytes)")
+
+
+if __name__ == "__main__":
+    main()
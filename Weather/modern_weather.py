@@ -20,73 +20,143 @@ This improved version (v9.1) features:
 - UPDATED: Scrollbars on "Current" and "5-Day" tabs are now always visible for clarity.
 """
 
-import threading
+import os
+import sys
+import time
+_STARTED = time.perf_counter()  # reference point for --startup-report
+import argparse
 import tkinter as tk
-from tkinter import messagebox
+from tkinter import messagebox, filedialog
 from datetime import datetime, date, timedelta
-from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
 from ttkbootstrap.widgets import Meter  # Import the Meter widget
 from ttkbootstrap.scrolled import ScrolledFrame # Import for scrollable tabs
-import tkintermapview
 import requests
+from weather_client import WeatherClient, normalize_location
+from weather_config import (API_KEY, API_URLS, USE_ONECALL, CACHE, CACHE_MAX_STALE,
+                            GEOCODER, FLIGHTS, TRACER)
+from weather_gradient import GradientCache
+from weather_redraw import RedrawScheduler
+from weather_tiles import TileCache, TilePrefetcher
+from weather_ticker import AnimationTicker
+from weather_handoff import (HandoffQueue, Generations, STALE, RESULT, STATUS, REFRESH_FAILED,
+                             ERROR, LOADING, DONE)
+from weather_refresh import RefreshScheduler, retry_wait
+from weather_geocode import place_from_response
+from weather_autocomplete import Autocomplete
+from weather_core import (WEATHER_ICONS, WeatherService, StaleRefreshError,
+                          process_forecast_data, get_24h_from_forecast,
+                          group_hourly_by_day, generate_suggestions, data_version)
 import colorsys
-import time
 import math
-try:
-    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-    import matplotlib.pyplot as plt
-    MATPLOTLIB_AVAILABLE = True
-    # mplcursors provides simple tooltips on matplotlib plots
+import importlib
+import importlib.util
+
+# --- Deferred heavy imports ---
+# matplotlib, mplcursors and tkintermapview account for most of the cold-start
+# time, so they are only located here (find_spec does not import anything) and
+# imported the first time a chart or the map is built. See
+# benchmarks/check_importtime.py for the startup import budget.
+
+class _LazyModule:
+    """Stands in for a module and imports it on first attribute access."""
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def load(self):
+        """Import the module now (raises ImportError and friends on failure)."""
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self.load(), attr)
+
+
+def _module_available(name):
     try:
-        import mplcursors
-        MPLCURSORS_AVAILABLE = True
-    except Exception:
-        MPLCURSORS_AVAILABLE = False
-except Exception:
-    MATPLOTLIB_AVAILABLE = False
-    MPLCURSORS_AVAILABLE = False
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
 
-# --- Configuration ---
 
-# ! IMPORTANT: Replace "YOUR_API_KEY_HERE" with your actual OpenWeatherMap API key
-# You can get a free one from https://openweathermap.org/api
-API_KEY = "6f0f9af0779da1b1566b0ef931f2f61b" 
+MATPLOTLIB_AVAILABLE = _module_available("matplotlib")
+# mplcursors provides simple tooltips on matplotlib plots
+MPLCURSORS_AVAILABLE = MATPLOTLIB_AVAILABLE and _module_available("mplcursors")
+plt = _LazyModule("matplotlib.pyplot")
+backend_tkagg = _LazyModule("matplotlib.backends.backend_tkagg")
+weather_charts = _LazyModule("weather_charts")
+mplcursors = _LazyModule("mplcursors")
+tkintermapview = _LazyModule("tkintermapview")
+
+
+def _matplotlib_loaded():
+    """Import matplotlib for the first chart; False (and charts disabled) if it is broken."""
+    global MATPLOTLIB_AVAILABLE, MPLCURSORS_AVAILABLE
+    if MATPLOTLIB_AVAILABLE:
+        try:
+            plt.load()
+            backend_tkagg.load()
+            weather_charts.load()
+        except Exception as e:
+            print(f"matplotlib could not be loaded, charts disabled: {e}")
+            MATPLOTLIB_AVAILABLE = False
+            MPLCURSORS_AVAILABLE = False
+    return MATPLOTLIB_AVAILABLE
+
+# --- Configuration ---
+# The API key, response cache, geocode index, batch and tracing settings are
+# shared with the headless batch mode and live in weather_config.py.
 
-# Check if the user has replaced the placeholder API key
-if API_KEY == "YOUR_API_KEY_HERE":
-    print("ERROR: Please replace 'YOUR_API_KEY_HERE' with your OpenWeatherMap API key.")
-    # We'll allow the app to run so the user can see the UI,
-    # but API calls will fail until they add their key.
-    
-CURRENT_URL = "http://api.openweathermap.org/data/2.5/weather?q={city}&appid={key}&units=metric"
-FORECAST_URL = "http://api.openweathermap.org/data/2.5/forecast?q={city}&appid={key}&units=metric"
 CONFIG_CITY_FILE = "last_city.txt"
 
-# Simple in-memory cache for API responses: {city: (timestamp_seconds, data_package)}
-CACHE = {}
-CACHE_TTL = 300  # seconds
-
-# Weather Icons with Unicode characters
-WEATHER_ICONS = {
-    "Clear": "☀️",
-    "Clouds": "☁️",
-    "Rain": "🌧️",
-    "Drizzle": "🌦️",
-    "Thunderstorm": "⛈️",
-    "Snow": "❄️",
-    "Mist": "🌫️",
-    "Smoke": "🌫️",
-    "Haze": "🌁",
-    "Dust": "🌪️",
-    "Fog": "🌁",
-    "Sand": "🏜️",
-    "Ash": "🌋",
-    "Squall": "🌬️",
-    "Tornado": "🌪️",
-    "Default": "❓"
-}
+# Type-ahead suggestions come from searched cities, plus OpenWeatherMap's city list when
+# city.list.json.gz (http://bulk.openweathermap.org/sample/) is placed next to this script.
+# With the list, unknown names are reported without a request.
+CITY_LIST_FILE = "city.list.json.gz"
+AUTOCOMPLETE_LIMIT = 8
+
+# Background fetch workers for interactive searches
+FETCH_WORKERS = 4
+
+# Offline map tiles: TkinterMapView reads tiles from this SQLite file (it does not
+# store the tiles it downloads itself). With TILE_PREFETCH, the tiles around every
+# searched city are downloaded into it in the background. The public OpenStreetMap
+# servers forbid bulk downloads, so prefetching needs a TILE_SERVER of your own.
+TILE_SERVER = "https://a.tile.openstreetmap.org/{z}/{x}/{y}.png"
+TILE_MAX_ZOOM = 19
+TILE_CACHE_FILE = "map_tiles.sqlite3"
+TILE_CACHE_MAX_BYTES = 100 * 1024 * 1024
+TILE_PREFETCH = False
+TILE_PREFETCH_ZOOMS = {10: 2, 9: 1, 11: 3}  # zoom -> radius in tiles; the map uses set_zoom(10)
+TILES = TileCache(TILE_CACHE_FILE, max_bytes=TILE_CACHE_MAX_BYTES)
+
+
+# Worker results reach the Tk thread through a coalescing queue; the first message
+# put into an empty queue schedules one drain (nothing polls it while idle)
+HANDOFF_MAX_PENDING = 256  # cities with undelivered results before the oldest are dropped
+
+# Background auto-refresh of the displayed city (and AUTO_REFRESH_CITIES).
+# Refreshes go through the response cache, so only expired endpoints are
+# fetched, and the screen is only repainted when the upstream data changed.
+AUTO_REFRESH = True
+AUTO_REFRESH_INTERVAL = 360  # seconds; above CACHE_TTL so a refresh never lands on a fresh entry
+AUTO_REFRESH_JITTER = 0.1  # +/- fraction of the interval, spreads cities apart
+AUTO_REFRESH_MAX_BACKOFF = 3600  # seconds; failed refreshes back off exponentially up to this
+AUTO_REFRESH_CITIES = []  # extra cities kept warm in the cache, e.g. ["Paris", "Tokyo,JP"]
+AUTO_REFRESH_CHECK = 5  # seconds between checks for due refreshes
+
+# Rendered background gradients shared by every GradientFrame (LRU, see weather_gradient)
+GRADIENTS = GradientCache()
+
+# Redraw scheduling: bursts of resize/data events collapse into one frame per widget
+REDRAW_FRAME_MS = 16
+REDRAW_HEAVY_BUDGET_MS = 40  # charts and map share this much time per frame
+RESIZE_DEBOUNCE_MS = 60  # gradient redraws wait until a resize drag pauses
+ANIMATION_FPS = 30  # frame cap for value animations (the clock ticks once per second)
 
 # Modern UI Theme Configuration (Locked to Light)
 THEMES = {
@@ -134,10 +204,14 @@ class GradientFrame(tk.Frame):
     """
     A custom Frame widget that draws a vertical gradient background.
     """
-    def __init__(self, parent, color1, color2, **kwargs):
+    def __init__(self, parent, color1, color2, scheduler=None, **kwargs):
         super().__init__(parent, **kwargs)
         self.color1 = color1
         self.color2 = color2
+        self._image = None  # keep a reference so Tk does not free the image
+        self._drawn = None  # (color1, color2, width, height) currently on the canvas
+        # Optional RedrawScheduler; without one, redraws happen synchronously
+        self._scheduler = scheduler
         self.canvas = tk.Canvas(self, borderwidth=0, highlightthickness=0)
         self.canvas.pack(fill=BOTH, expand=YES)
         
@@ -145,11 +219,19 @@ class GradientFrame(tk.Frame):
         self._draw_gradient()
 
     def _on_resize(self, event):
-        """Redraw gradient when the frame is resized."""
-        self._draw_gradient()
+        """Redraw gradient when the frame is resized (debounced with a scheduler)."""
+        if self._drawn and self._drawn[2:] == (event.width, event.height):
+            return
+        self._request_draw(RESIZE_DEBOUNCE_MS)
+
+    def _request_draw(self, delay_ms=0):
+        if self._scheduler is None:
+            self._draw_gradient()
+        else:
+            self._scheduler.schedule(("gradient", str(self)), self._draw_gradient, delay_ms=delay_ms)
 
     def _draw_gradient(self):
-        """Draws the vertical gradient."""
+        """Draws the vertical gradient as a single cached image."""
         self.canvas.delete("gradient")
         width = self.winfo_width()
         height = self.winfo_height()
@@ -157,32 +239,18 @@ class GradientFrame(tk.Frame):
         if width < 2 or height < 2:
             return
 
-        # Calculate gradient colors
-        r1, g1, b1 = self.winfo_rgb(self.color1)
-        r2, g2, b2 = self.winfo_rgb(self.color2)
-        
-        r_ratio = (r2 - r1) / height
-        g_ratio = (g2 - g1) / height
-        b_ratio = (b2 - b1) / height
-
-        for i in range(height):
-            nr = int(r1 + (r_ratio * i))
-            ng = int(g1 + (g_ratio * i))
-            nb = int(b1 + (b_ratio * i))
-            
-            # Clamp values to 0-65535 range
-            nr = max(0, min(nr, 65535))
-            ng = max(0, min(ng, 65535))
-            nb = max(0, min(nb, 65535))
-
-            color = f'#{nr:04x}{ng:04x}{nb:04x}'
-            self.canvas.create_line(0, i, width, i, fill=color, tags="gradient")
+        self._drawn = (self.color1, self.color2, width, height)
+        self._image = GRADIENTS.get(self, self.color1, self.color2, width, height)
+        self.canvas.create_image(0, 0, anchor=NW, image=self._image, tags="gradient")
+        self.canvas.tag_lower("gradient")
 
     def update_gradient(self, color1, color2):
         """Updates the gradient colors and redraws."""
+        if (color1, color2) == (self.color1, self.color2) and self._drawn:
+            return
         self.color1 = color1
         self.color2 = color2
-        self._draw_gradient()
+        self._request_draw()
 
 class ForecastCard(ttk.Frame):
     """
@@ -213,7 +281,12 @@ class ForecastCard(ttk.Frame):
 class ModernWeatherDashboard(ttk.Window):
     """Modern Weather Dashboard using ttkbootstrap for enhanced visuals."""
     
-    def __init__(self):
+    def __init__(self, startup_report=False, trace_out=None):
+        init_start = time.perf_counter()
+        # Time spent in each startup phase (seconds); lazily built tabs are added later
+        self.startup_timings = {'imports': init_start - _STARTED}
+        self._startup_report = startup_report
+
         # Lock theme to 'light' ('cosmo')
         self.theme_mode = "light"
         self.theme_name = "cosmo"
@@ -227,6 +300,8 @@ class ModernWeatherDashboard(ttk.Window):
         # State variables
         self.location_var = tk.StringVar(value=self._load_preference(CONFIG_CITY_FILE, "London"))
         self.weather_data = None
+        # True while a search is in flight. Tk thread only: workers report through
+        # the handoff queue and DONE clears it in _drain_handoff, so no lock is needed.
         self.loading = False
         self.current_marker = None
         self.forecast_cards = []
@@ -234,20 +309,80 @@ class ModernWeatherDashboard(ttk.Window):
         self._tz_offset = 0
         # Last known numeric temp value used for smooth animations
         self._last_temp_value = None
-        # Simple per-instance cache reference (module-level CACHE used)
+        # Per-instance cache reference (module-level persistent CACHE used)
         self._cache = CACHE
+        # Timing spans of the whole fetch -> paint pipeline (module-level TRACER used)
+        self._tracer = TRACER
+        self._trace_out = trace_out
+        self._search_started = None  # (generation, perf_counter) of the search being painted
+        self._debug_panel = None
+        # Pooled keep-alive HTTP client; current + forecast are fetched concurrently
+        self._client = WeatherClient(API_URLS, API_KEY, tracer=self._tracer)
+        # Coalesces duplicate in-flight lookups (module-level FLIGHTS used)
+        self._flights = FLIGHTS
+        # Headless fetch pipeline: fresh cache -> stale paint -> coalesced refresh
+        self._service = WeatherService(self._client, cache=self._cache, flights=self._flights,
+                                       max_stale=CACHE_MAX_STALE, normalize=normalize_location,
+                                       geocoder=GEOCODER, combined='onecall' if USE_ONECALL else None,
+                                       tracer=self._tracer)
+        # Bounded pool for background fetches (instead of one thread per search)
+        self._workers = ThreadPoolExecutor(max_workers=FETCH_WORKERS, thread_name_prefix="weather-fetch")
+        # Per-request timings (seconds) of the most recent network fetch, taken from
+        # RESULT messages on the Tk thread
+        self.last_fetch_timings = {}
+        # Per-section render bookkeeping: the fingerprint each section last
+        # rendered, how long that took (seconds) and how often it was skipped.
+        # Chart and map drawing runs later; see self._redraw.timings.
+        self._rendered = {}
+        self.render_timings = {}
+        self.render_skips = {}
+        # Warms the offline tile cache around each searched city (None when disabled)
+        self._tile_prefetcher = None
+        if TILE_PREFETCH:
+            try:
+                self._tile_prefetcher = TilePrefetcher(TILES, TILE_SERVER, zooms=TILE_PREFETCH_ZOOMS)
+            except ValueError as e:  # the server forbids bulk downloads
+                print(f"Tile prefetch disabled: {e}")
+        # Coalesces redraws (gradient, charts, map) into at most one per widget per frame
+        self._redraw = RedrawScheduler(self, frame_ms=REDRAW_FRAME_MS,
+                                       heavy_budget_ms=REDRAW_HEAVY_BUDGET_MS, tracer=self._tracer)
+        # One frame loop for value animations and the clock; paused while minimised
+        self._ticker = AnimationTicker(self, fps=ANIMATION_FPS)
+        # Workers post typed messages here instead of calling Tk; only the
+        # latest message per city is kept until the main loop drains it
+        self._handoff = HandoffQueue(max_pending=HANDOFF_MAX_PENDING, notify=self._schedule_drain)
+        # Each search gets a generation; a new search cancels the one in flight
+        self._searches = Generations()
+        # Decides when watched cities are refreshed (jitter, error backoff)
+        self._refresher = RefreshScheduler(interval=AUTO_REFRESH_INTERVAL, jitter=AUTO_REFRESH_JITTER,
+                                           max_backoff=AUTO_REFRESH_MAX_BACKOFF)
+        self._displayed_key = None
+        self._warm_keys = {normalize_location(city) for city in AUTO_REFRESH_CITIES}
+        # Type-ahead index, built on first use of the search box
+        self._autocomplete = None
+        self._suggestions = []
+        # Last search rejected by the city list; searching it again goes online anyway
+        self._rejected_search = None
         # Label for the live clock
         self.clock_lbl = None
         
         # Setup UI
-        self._setup_styles()
-        self._create_layout()
+        self._timed('styles', self._setup_styles)
+        self._timed('layout', self._create_layout)
+        if startup_report:
+            self.after_idle(self._report_startup)
         
         # Load initial weather data
         self.after(100, self.search_weather)
         
-        # Start the live clock
-        self.after(1000, self._update_clock)
+        # Start the live clock (ticks on each second through the shared ticker)
+        self._ticker.every("clock", 1.0, self._update_clock)
+        if AUTO_REFRESH:
+            for city in AUTO_REFRESH_CITIES:
+                self._refresher.watch(normalize_location(city), spread=True, location=city)
+            self._ticker.every("auto_refresh", AUTO_REFRESH_CHECK, self._auto_refresh)
+        self.bind("<Unmap>", self._on_visibility_change, add="+")
+        self.bind("<Map>", self._on_visibility_change, add="+")
         
     def _load_preference(self, filename, default):
         """Load user preference from file."""
@@ -338,11 +473,19 @@ class ModernWeatherDashboard(ttk.Window):
         content.add(self.forecast_tab_frame, text="🗓️ 5-Day Forecast")
         content.add(self.map_tab, text="🗺️ Map")
 
-        # Setup tab contents
-        self._setup_current_tab()
-        self._setup_hourly_tab() # NEW
-        self._setup_forecast_tab()
-        self._setup_map_tab()
+        # Setup tab contents: only the visible "Current" tab is built now. The
+        # others (charts, map) are built the first time they are selected and
+        # then filled from the last weather data (see _on_tab_changed).
+        self._notebook = content
+        self._lazy_tabs = {
+            str(self.hourly_tab_frame): ("hourly", self._setup_hourly_tab),
+            str(self.forecast_tab_frame): ("forecast", self._setup_forecast_tab),
+            str(self.map_tab): ("map", self._setup_map_tab),
+        }
+        self._built_tabs = set()
+        self._timed('tab:current', self._setup_current_tab)
+        self._built_tabs.add("current")
+        content.bind("<<NotebookTabChanged>>", self._on_tab_changed)
         # Status bar (accessibility & small hints) — shows subtle messages and hover hints
         status_frame = ttk.Frame(container)
         status_frame.pack(fill=X, pady=(10, 0))
@@ -354,7 +497,49 @@ class ModernWeatherDashboard(ttk.Window):
 
         # Keyboard accessibility: Ctrl+F focusses the search box
         self.bind_all('<Control-f>', lambda e: self.search_entry.focus_set())
+        # Hidden diagnostics: Ctrl+D toggles the timing panel. Bound on the window
+        # and, ahead of the Entry class binding (delete character), on the search box
+        self.bind('<Control-d>', self._on_debug_key)
+        self.search_entry.bind('<Control-d>', self._on_debug_key)
         
+    def _on_tab_changed(self, event):
+        """Build a lazily created tab on its first selection and apply the current data."""
+        entry = self._lazy_tabs.pop(self._notebook.select(), None)
+        if entry is None:
+            return
+        name, setup = entry
+        elapsed = self._timed(f'tab:{name}', setup)
+        self._built_tabs.add(name)
+        if self._startup_report:
+            print(f"Built {name} tab on first use in {elapsed * 1000:.1f} ms")
+        self._apply_model_to_tab(name)
+
+    def _apply_model_to_tab(self, name):
+        """Render the stored weather data into a tab that was just built."""
+        if self.weather_data is not None:
+            self._render_tab(name, self.weather_data)
+
+    def _timed(self, phase, fn):
+        """Run a startup step and record how long it took. Returns the duration."""
+        start = time.perf_counter()
+        fn()
+        elapsed = self.startup_timings[phase] = time.perf_counter() - start
+        return elapsed
+
+    def _report_startup(self):
+        """Print how long each startup phase took (--startup-report)."""
+        self.update_idletasks()  # make sure the window has been laid out and drawn
+        self.startup_timings['window_ready'] = time.perf_counter() - _STARTED
+        print("Startup report:")
+        phases = sorted(self.startup_timings.items(), key=lambda item: item[0].startswith("tab:"))
+        for phase, elapsed in phases:
+            # tab:* steps are part of 'layout' (or ran later, on first selection)
+            indent = "    " if phase.startswith("tab:") else "  "
+            print(f"{indent}{phase:<{20 - len(indent)}}{elapsed * 1000:8.1f} ms")
+        pending = [name for name, _setup in self._lazy_tabs.values()]
+        if pending:
+            print(f"  deferred until first selected: {', '.join(pending)}")
+
     def _create_header(self, parent):
         """Create modern header with logo."""
         header = ttk.Frame(parent)
@@ -383,6 +568,18 @@ class ModernWeatherDashboard(ttk.Window):
         # Accessibility: show hint in status when focusing search
         self.search_entry.bind('<FocusIn>', lambda e: self.status_lbl.configure(text='Type a city and press Enter to search'))
         self.search_entry.bind('<FocusOut>', lambda e: self.status_lbl.configure(text='Ready'))
+        # Type-ahead suggestions
+        self.search_entry.bind('<FocusIn>', lambda e: self._ensure_autocomplete(), add='+')
+        self.search_entry.bind('<FocusOut>', lambda e: self.after(150, self._hide_suggestions_unless_focused), add='+')
+        self.search_entry.bind('<KeyRelease>', self._on_search_key)
+        self.search_entry.bind('<Down>', self._focus_suggestions)
+        self.search_entry.bind('<Escape>', lambda e: self._hide_suggestions())
+        self._suggest_box = tk.Listbox(self, activestyle='none', exportselection=False,
+                                       font=DEFAULT_FONT, relief=SOLID, borderwidth=1)
+        self._suggest_box.bind('<Return>', self._pick_suggestion)
+        self._suggest_box.bind('<ButtonRelease-1>', self._pick_suggestion)
+        self._suggest_box.bind('<Escape>', lambda e: (self._hide_suggestions(), self.search_entry.focus_set()))
+        self._suggest_box.bind('<FocusOut>', lambda e: self.after(150, self._hide_suggestions_unless_focused))
         
         self.search_btn = ttk.Button(search,
                                      text="Search",
@@ -403,7 +600,8 @@ class ModernWeatherDashboard(ttk.Window):
         
         # Main weather card (placed inside the scrollable container)
         colors = THEMES[self.theme_mode]["dynamic_bg"]["Default"]
-        self.gradient_card = GradientFrame(scroll_frame.container, colors[0], colors[1])
+        self.gradient_card = GradientFrame(scroll_frame.container, colors[0], colors[1],
+                                           scheduler=self._redraw)
         self.gradient_card.pack(fill=BOTH, expand=YES)
         
         # We need an inner frame on top of the canvas to hold widgets
@@ -523,144 +721,47 @@ class ModernWeatherDashboard(ttk.Window):
         body = ttk.Frame(self.hourly_tab_frame)
         body.pack(fill=BOTH, expand=YES)
 
-        if MATPLOTLIB_AVAILABLE:
+        if _matplotlib_loaded():
             fig, ax = plt.subplots(figsize=(8,3), dpi=100)
             self._hourly_fig = fig
             self._hourly_ax = ax
-            self._hourly_canvas = FigureCanvasTkAgg(fig, master=body)
+            self._hourly_canvas = backend_tkagg.FigureCanvasTkAgg(fig, master=body)
             self._hourly_canvas.get_tk_widget().pack(fill=BOTH, expand=YES)
-            # Placeholders
-            self._hourly_line = None
-            self._hourly_fill = None
-            self._hourly_vline = None
+            # Artists are built once and refreshed in place (see weather_charts)
+            self._hourly_chart = weather_charts.HourlyChart(fig, ax, self._hourly_canvas,
+                                             self.style.lookup('TFrame', 'background'),
+                                             self.style.lookup('TLabel', 'foreground'),
+                                             PALETTE['accent'], PALETTE['accent_soft'])
         else:
             ttk.Label(body, text='Install matplotlib to view the interactive 24-hour graph.', style='Muted.TLabel').pack(padx=8, pady=8)
 
-    def _get_24h_from_forecast(self, forecast_list, tz_offset=0):
-        """Interpolate the 3-hourly forecast into 24 hourly points starting from current hour
-        at the target location's local time (tz_offset in seconds).
-        Returns list of dicts: {'dt': datetime, 'label': 'HH:00', 'temp': float, 'main': str}
-        """
-        try:
-            now_local = datetime.utcnow() + timedelta(seconds=tz_offset)
-            now_local = now_local.replace(minute=0, second=0, microsecond=0)
-            targets = [now_local + timedelta(hours=i) for i in range(24)]
-
-            # Build points from forecast_list using UTC timestamp + tz_offset
-            pts = []
-            for item in forecast_list:
-                dt_local = datetime.utcfromtimestamp(item['dt']) + timedelta(seconds=tz_offset)
-                dt_local = dt_local.replace(minute=0, second=0, microsecond=0)
-                temp = item['main']['temp']
-                main = item['weather'][0]['main'] if item.get('weather') else None
-                pts.append((dt_local, float(temp), main))
-
-            # Sort pts
-            pts.sort(key=lambda x: x[0])
-
-            result = []
-            if not pts:
-                return result
-
-            for t in targets:
-                # If an exact match
-                exact = next((p for p in pts if p[0] == t), None)
-                if exact:
-                    result.append({'dt': t, 'label': t.strftime('%H:%M'), 'temp': exact[1], 'main': exact[2]})
-                    continue
-
-                # Find surrounding points
-                before = None
-                after = None
-                for p in pts:
-                    if p[0] < t:
-                        before = p
-                    if p[0] > t and after is None:
-                        after = p
-                        break
-
-                if before and after:
-                    total = (after[0] - before[0]).total_seconds()
-                    if total == 0:
-                        temp = before[1]
-                        frac = 0
-                    else:
-                        frac = (t - before[0]).total_seconds() / total
-                        temp = before[1] + (after[1] - before[1]) * frac
-                    main = before[2] if frac < 0.5 else after[2]
-                elif before and not after:
-                    temp = before[1]
-                    main = before[2]
-                elif after and not before:
-                    temp = after[1]
-                    main = after[2]
-                else:
-                    temp = pts[0][1]
-                    main = pts[0][2]
-
-                result.append({'dt': t, 'label': t.strftime('%H:%M'), 'temp': temp, 'main': main})
-
-            return result
-        except Exception:
-            return []
+    def _get_24h_from_forecast(self, forecast, tz_offset=0):
+        """Interpolate the forecast into 24 hourly points (see weather_core.get_24h_from_forecast)."""
+        with self._tracer.span('forecast', step='24h'):
+            return get_24h_from_forecast(forecast, tz_offset=tz_offset)
 
     def _update_hourly_chart(self, hourly):
         """Update the embedded 24-hour chart using interpolated hourly data."""
         try:
-            if not MATPLOTLIB_AVAILABLE or not hasattr(self, '_hourly_ax'):
+            if not MATPLOTLIB_AVAILABLE or not hasattr(self, '_hourly_chart'):
                 return
 
             if not hourly:
                 return
 
-            ax = self._hourly_ax
-            fig = self._hourly_fig
-            canvas = self._hourly_canvas
-            ax.clear()
-
-            times = [h['label'] for h in hourly]
-            temps = [h['temp'] for h in hourly]
-
-            x = list(range(len(times)))
-
-            # --- Attractive Styling ---
-            bg_color = self.style.lookup('TFrame', 'background')
-            fg_color = self.style.lookup('TLabel', 'foreground')
-
-            fig.patch.set_facecolor(bg_color)
-            ax.set_facecolor(bg_color)
-            ax.spines['top'].set_visible(False)
-            ax.spines['right'].set_visible(False)
-            ax.spines['bottom'].set_color(fg_color)
-            ax.spines['left'].set_color(fg_color)
-            ax.tick_params(axis='x', colors=fg_color)
-            ax.tick_params(axis='y', colors=fg_color)
-            ax.yaxis.label.set_color(fg_color)
-            ax.title.set_color(fg_color)
-            # --- End Styling ---
-
-            # Plot line but animate the drawing by progressively revealing points
-            line, = ax.plot(x, temps, marker='o', color=PALETTE['accent'], linewidth=3, markersize=5)
-            area = ax.fill_between(x, temps, color=PALETTE['accent_soft'], alpha=0.35)
-
-            ax.set_xticks(x[::2]) # Show every 2nd label
-            ax.set_xticklabels([times[i] for i in x[::2]], rotation=45, ha='right')
-            ax.set_ylabel('°C')
-            ax.set_title("Next 24 Hours")
-            ax.grid(alpha=0.2)
-
-            fig.tight_layout()
-            canvas.draw()
-            
-            # attach mplcursors if available
+            # Only the line data and fill change; styling, ticks and layout are reused
+            self._hourly_chart.update([h['label'] for h in hourly], [h['temp'] for h in hourly])
+
+            # attach mplcursors if available (once: the same line is reused)
             try:
                 if MPLCURSORS_AVAILABLE:
-                    mplcursors.cursor(ax.lines, hover=True)
+                    self._hourly_chart.attach_cursor(mplcursors.cursor, hover=True)
             except Exception:
                 pass
                 
         except Exception as e:
             print(f"Error updating today chart: {e}")
+            self._forget_section("hourly")
             
     def _setup_forecast_tab(self):
         """Set up the forecast tab with 5 visual day cards."""
@@ -698,12 +799,16 @@ class ModernWeatherDashboard(ttk.Window):
             self.forecast_cards.append(card)
 
         # Matplotlib area in the right pane (embedded chart)
-        if MATPLOTLIB_AVAILABLE:
+        if _matplotlib_loaded():
             fig, ax = plt.subplots(figsize=(6,3), dpi=100)
             self._forecast_fig = fig
             self._forecast_ax = ax
-            self._forecast_canvas = FigureCanvasTkAgg(fig, master=right)
+            self._forecast_canvas = backend_tkagg.FigureCanvasTkAgg(fig, master=right)
             self._forecast_canvas.get_tk_widget().pack(fill=BOTH, expand=YES)
+            self._forecast_chart = weather_charts.ForecastChart(fig, ax, self._forecast_canvas,
+                                                 self.style.lookup('TFrame', 'background'),
+                                                 self.style.lookup('TLabel', 'foreground'),
+                                                 PALETTE['accent'], '#ffc107', PALETTE['accent_soft'])
         else:
             ttk.Label(right, text='Install matplotlib for interactive charts', style='Muted.TLabel').pack(padx=8, pady=8)
             
@@ -713,7 +818,8 @@ class ModernWeatherDashboard(ttk.Window):
             self.map_widget = tkintermapview.TkinterMapView(self.map_tab,
                                                             width=800,
                                                             height=600,
-                                                            corner_radius=0)
+                                                            corner_radius=0,
+                                                            database_path=TILES.ensure_schema())
             self.map_widget.pack(fill=BOTH, expand=YES)
             
             self.map_widget.set_position(51.5074, -0.1278) # Default: London
@@ -733,10 +839,31 @@ class ModernWeatherDashboard(ttk.Window):
             return
             
         # Locked to light theme, so only standard OSM tile is needed
-        self.map_widget.set_tile_server("https://a.tile.openstreetmap.org/{z}/{x}/{y}.png", max_zoom=19)
+        self.map_widget.set_tile_server(TILE_SERVER, max_zoom=TILE_MAX_ZOOM)
+
+    def _prefetch_tiles(self, current):
+        """Start warming the tile cache around the location (background threads)."""
+        if self._tile_prefetcher is None:
+            return
+        try:
+            coords = current['coord']
+            self._tile_prefetcher.prefetch(coords['lat'], coords['lon'])
+        except Exception as e:
+            print(f"Tile prefetch failed: {e}")
             
+    def _on_visibility_change(self, event):
+        """Pause animations and the clock while the window is hidden or minimised."""
+        if event.widget is not self:
+            return  # <Map>/<Unmap> of child widgets also reach the toplevel binding
+        if event.type == tk.EventType.Unmap:
+            self._ticker.pause()
+        else:
+            self._ticker.resume()
+            if len(self._handoff):
+                self._drain_handoff()  # results held while hidden
+
     def _update_clock(self):
-        """Updates the live clock every second."""
+        """Updates the live clock (called every second by the shared ticker)."""
         try:
             # Check if weather data is loaded and has a timezone offset
             if hasattr(self, '_tz_offset'):
@@ -756,9 +883,6 @@ class ModernWeatherDashboard(ttk.Window):
             if self.clock_lbl:
                 self.clock_lbl.configure(text="--:--:--")
             print(f"Error updating clock: {e}")
-        
-        # Schedule next update
-        self.after(1000, self._update_clock)
 
     def _style_mini_ax(self, ax, bg_color):
         """(REMOVED) Helper to style the minimal sparkline graph"""
@@ -802,9 +926,12 @@ class ModernWeatherDashboard(ttk.Window):
         self._loading_pb.pack(padx=20, pady=20)
 
     def _show_loading(self):
-        """Show the loading overlay and start spinner."""
+        """Show the loading overlay and start spinner.
+        It covers the tabs only, so the search bar stays usable for a new search.
+        """
         try:
-            x = self.winfo_rootx(); y = self.winfo_rooty(); w = self.winfo_width(); h = self.winfo_height()
+            area = self._notebook
+            x = area.winfo_rootx(); y = area.winfo_rooty(); w = area.winfo_width(); h = area.winfo_height()
             self.loading_win.geometry(f"{w}x{h}+{x}+{y}")
             self.loading_win.deiconify()
             self._loading_pb.start(10)
@@ -825,37 +952,22 @@ class ModernWeatherDashboard(ttk.Window):
     def _animate_value(self, label, target, fmt='{:.0f}°C', duration=600):
         """Animate numeric transition for a label from previous value to target.
         This makes temperature changes feel smooth (micro-interaction).
+        Runs on the shared ticker: a new target for the same label retargets
+        the running animation from the value currently shown.
         """
         try:
-            start = self._last_temp_value if self._last_temp_value is not None else 0
             end = float(target)
-            steps = max(6, int(duration / 50))
-            steps = int(steps)
-            delta = (end - start) / steps
-            i = 0
-
-            def step():
-                nonlocal i, start
-                i += 1
-                val = start + delta * i
-                label.configure(text=fmt.format(val))
-                if i < steps:
-                    self.after(50, step)
-                else:
-                    # finalize
-                    self._last_temp_value = end
-                    label.configure(text=fmt.format(end))
-
-            step()
+            start = self._last_temp_value if self._last_temp_value is not None else 0
+            self._last_temp_value = end
+            self._ticker.animate(("value", str(label)),
+                                 lambda value: label.configure(text=fmt.format(value)),
+                                 start, end, duration / 1000.0)
         except Exception:
             # fallback to direct set
             label.configure(text=fmt.format(target))
 
     def search_weather(self):
         """Fetch weather data for the searched location."""
-        if self.loading:
-            return
-            
         location = self.location_var.get().strip()
         if not location:
             return
@@ -867,160 +979,370 @@ class ModernWeatherDashboard(ttk.Window):
                                  "Please add your OpenWeatherMap API key to the Python script.")
             return
 
+        self._hide_suggestions()
+        # With the full city list loaded, catch typos without a round-trip
+        if self._autocomplete is not None and location != self._rejected_search:
+            if self._autocomplete.validate(location) is False:
+                self._rejected_search = location
+                self.location_lbl.configure(text="City not found")
+                self.status_lbl.configure(text=f"No city named '{location}' in the city list. "
+                                               "Search again to look it up online.")
+                return
+
+        # Supersede any search still in flight instead of ignoring this one;
+        # the search button stays enabled
+        token = self._searches.begin()
+        self._search_started = (token.generation, time.perf_counter())
         self.loading = True
-        self.search_btn.configure(state="disabled", text="Loading...")
         self.location_lbl.configure(text="Loading...")
         
-        thread = threading.Thread(target=self._fetch_weather, args=(location,))
-        thread.daemon = True
-        thread.start()
+        self._workers.submit(self._fetch_weather, location, token)
         
-    def _fetch_weather(self, location):
-        """Fetch weather data in background thread."""
+    def _fetch_weather(self, location, token, background=False):
+        """Fetch weather data in background thread.
+        Never updates widgets: every outcome is posted to the handoff queue
+        as a message whose text is built here, then applied by _drain_handoff.
+        Once `token` is cancelled by a newer search nothing more is posted;
+        a request already on the wire finishes in the background (its
+        response still fills the cache) but is no longer shown.
+        With `background` it is a scheduled refresh (see _refresh_watched).
+        """
+        key = normalize_location(location)
+
+        def post(kind, payload=None):
+            if token is not None and not token.cancelled:
+                self._handoff.put(kind, key, payload, generation=token.generation)
+
+        if background:
+            try:
+                self._refresh_watched(location, key, token, post)
+            finally:
+                # due() marked the city in flight; settle it however the refresh
+                # ended (superseded, failed unexpectedly) or it is never due again
+                self._refresher.release(key)
+            return
+
+        if token.cancelled:
+            return  # superseded before a worker picked it up
         try:
-            now_ts = time.time()
-            key = location.lower()
-            # Return cached response if fresh
-            cached = self._cache.get(key)
-            if cached and (now_ts - cached[0] < CACHE_TTL):
-                data_package = cached[1]
-                self.after(0, lambda: self._update_weather_ui(data_package))
+            data_package = self._service.load(
+                location,
+                on_stale=lambda package: post(STALE, package),
+                on_cold=lambda: post(LOADING))
+            if token.cancelled:
                 return
-            # --- Fetch Current Weather ---
-            current_url = CURRENT_URL.format(city=location, key=API_KEY)
-            current_response = requests.get(current_url, timeout=10)
-            current_response.raise_for_status() # Raise exception for 4xx/5xx errors
-            current_data = current_response.json()
-            
-            # --- Fetch Forecast ---
-            forecast_url = FORECAST_URL.format(city=location, key=API_KEY)
-            forecast_response = requests.get(forecast_url, timeout=10)
-            forecast_response.raise_for_status()
-            forecast_data = forecast_response.json()
-            
-            # --- Combine Data ---
-            data_package = {
-                "current": current_data,
-                "forecast_raw": forecast_data,
-                "last_updated": datetime.now().strftime("%I:%M %p")
-            }
-
-            # store in cache
-            try:
-                self._cache[key] = (time.time(), data_package)
-            except Exception:
-                pass
-            
+
             self._save_preference(CONFIG_CITY_FILE, location)
-            self.after(0, lambda: self._update_weather_ui(data_package))
+            data_package["location"] = location  # what auto-refresh fetches again
+            post(RESULT, data_package)
             
+        except StaleRefreshError as e:
+            # Keep the stale data on screen; report the failed refresh quietly
+            # and let the auto-refresh schedule retry it
+            post(REFRESH_FAILED, {"message": f"Refresh failed, showing cached data: {e}",
+                                  "location": location})
         except requests.exceptions.HTTPError as e:
             if e.response.status_code == 404:
-                self.after(0, lambda: self._show_error(f"City not found: {location}"))
+                post(ERROR, f"City not found: {location}")
             elif e.response.status_code == 401:
-                self.after(0, lambda: self._show_error("Invalid API Key. Please check your key in the script."))
+                post(ERROR, "Invalid API Key. Please check your key in the script.")
             else:
-                self.after(0, lambda: self._show_error(f"HTTP Error: {e}"))
+                post(ERROR, f"HTTP Error: {e}")
         except requests.exceptions.ConnectionError:
-            self.after(0, lambda: self._show_error("Network Error: Could not connect to weather service."))
+            post(ERROR, "Network Error: Could not connect to weather service.")
         except Exception as e:
-            self.after(0, lambda: self._show_error(f"An unexpected error occurred: {e}"))
+            post(ERROR, f"An unexpected error occurred: {e}")
         finally:
-            self.after(0, self._end_loading)
+            post(DONE)
 
-    def _process_forecast_data(self, forecast_list, tz_offset=0):
+    def _schedule_drain(self):
         """
-        Process the raw 3-hour forecast list into a 5-day summary.
+        HandoffQueue callback (worker thread, once per batch): schedule one
+        drain on the Tk thread. tkinter hands after() from another thread
+        to the thread running the main loop.
         """
-        daily_data = {}
-        # Use local date at target timezone
-        today = (datetime.utcnow() + timedelta(seconds=tz_offset)).date()
-
-        for item in forecast_list:
-            item_date = (datetime.utcfromtimestamp(item['dt']) + timedelta(seconds=tz_offset)).date()
-
-            # Skip today's data
-            if item_date == today:
-                continue
-
-            if item_date not in daily_data:
-                daily_data[item_date] = {
-                    'temps': [],
-                    'conditions': [],
-                    'icons': []
-                }
-            
-            daily_data[item_date]['temps'].append(item['main']['temp'])
-            daily_data[item_date]['conditions'].append(item['weather'][0]['description'])
-            daily_data[item_date]['icons'].append(item['weather'][0]['main'])
-
-        processed_forecast = []
-        # Sort by date and take the first 5 days
-        for day in sorted(daily_data.keys())[:5]:
-            temps = daily_data[day]['temps']
-            icons = daily_data[day]['icons']
-            
-            # Find the most common icon for the day
-            try:
-                most_common_icon = Counter(icons).most_common(1)[0][0]
-            except IndexError:
-                most_common_icon = "Default"
-
-            processed_forecast.append({
-                'day_name': day.strftime('%A'), # e.g., "Tuesday"
-                'temp_max': max(temps),
-                'temp_min': min(temps),
-                'icon_main': most_common_icon,
-                'icon_char': WEATHER_ICONS.get(most_common_icon, WEATHER_ICONS["Default"]),
-                'date_iso': day.isoformat()
-            })
-            
-        return processed_forecast
+        try:
+            self.after(0, self._drain_handoff)
+        except (RuntimeError, tk.TclError):
+            pass  # the window is closing
 
-    def _group_hourly_by_day(self, forecast_list, tz_offset=0):
-        """Group the 3-hour forecast items by ISO date string -> list(items).
-        Returns a dict like {'2025-10-30': [item, ...], ...}
+    def _refresh_watched(self, location, key, token, post):
+        """
+        Auto-refresh `location` (worker thread). The data is only posted when
+        its upstream version changed; failures back off quietly. `token` is
+        None for cities that are only kept warm in the cache.
         """
-        grouped = {}
-        for item in forecast_list:
-            item_date = (datetime.utcfromtimestamp(item['dt']) + timedelta(seconds=tz_offset)).date()
-            iso = item_date.isoformat()
-            if iso not in grouped:
-                grouped[iso] = []
-            grouped[iso].append(item)
-        return grouped
+        if token is not None and token.cancelled:
+            return  # superseded by a search before a worker picked it up
+        try:
+            data_package = self._service.load(location)
+        except Exception as e:
+            delay = self._refresher.failed_refresh(key)
+            if delay is None:  # no longer watched, nothing scheduled
+                post(STATUS, f"Auto-refresh failed: {e}")
+            else:
+                post(STATUS, f"Auto-refresh failed, retrying in {retry_wait(delay)}: {e}")
+            return
+        if self._refresher.succeeded(key, data_version(data_package)):
+            data_package["location"] = location
+            post(RESULT, data_package)
+        else:
+            post(STATUS, f"Checked at {data_package['last_updated']}: no new data")
+
+    def _drain_handoff(self):
+        """Apply messages posted by fetch workers (Tk thread, scheduled by _schedule_drain)."""
+        if self._ticker.paused:
+            return  # held (and coalesced) until the window is shown again
+        # Messages from superseded searches are dropped unseen
+        messages = [m for m in self._handoff.drain() if self._searches.is_current(m.generation)]
+        # Only one city is on screen: of several pending packages, paint the newest
+        packages = [m for m in messages if m.kind in (STALE, RESULT)]
+        newest = packages[-1] if packages else None
+        for message in messages:
+            kind = message.kind
+            if kind in (STALE, RESULT):
+                if message is newest:
+                    self._update_weather_ui(message.payload)
+                    self._trace_search(message)
+                    if kind == RESULT:
+                        if message.payload.get("timings"):
+                            self.last_fetch_timings = message.payload["timings"]
+                        self._watch_displayed(message.key, data_version(message.payload),
+                                              message.payload.get("location"))
+                        self._remember_city(message.payload)
+            elif kind == LOADING:
+                self._show_loading()
+            elif kind == STATUS:
+                self.status_lbl.configure(text=message.payload)
+            elif kind == REFRESH_FAILED:
+                self._keep_stale(message.key, message.payload)
+            elif kind == ERROR:
+                # The dialog is modal; show it outside the ticker's frame
+                self.after_idle(lambda text=message.payload: self._show_error(text))
+            elif kind == DONE:
+                self._end_loading()
+
+    def _keep_stale(self, key, failure):
+        """
+        A search painted cached data but could not refresh it: drop the
+        "refreshing" note and put the city on the auto-refresh schedule,
+        backed off as after a failed refresh, so it is retried.
+        """
+        text = failure["message"]
+        if self.weather_data is not None and self.weather_data.get("stale"):
+            self.updated_lbl.configure(text=f"Last updated: {self.weather_data['last_updated']} (cached)")
+        if AUTO_REFRESH:
+            # No version: whatever the retry fetches replaces the cached data on screen
+            self._watch_displayed(key, None, failure["location"])
+            text += f" (retrying in {retry_wait(self._refresher.failed_refresh(key))})"
+        self.status_lbl.configure(text=text)
+
+    def _trace_search(self, message):
+        """Record a "search" span from pressing Search to its data being painted."""
+        started = self._search_started
+        if started is None or started[0] != message.generation:
+            return
+        self._tracer.record('search', time.perf_counter() - started[1], city=message.key,
+                            stale=message.kind == STALE)
+        if message.kind == RESULT:
+            self._search_started = None
+
+    # --- Debug panel (Ctrl+D) ---
+
+    def _on_debug_key(self, event=None):
+        """Ctrl+D: toggle the timing panel without passing the key on."""
+        self._toggle_debug_panel()
+        return "break"
+
+    def _toggle_debug_panel(self):
+        """Show or hide the timing panel: a per-span summary of the trace buffer."""
+        if self._debug_panel is not None:
+            self._close_debug_panel()
+            return
+        panel = self._debug_panel = tk.Toplevel(self)
+        panel.title("WeatherScope Pro - Timings")
+        panel.geometry("640x420")
+        panel.protocol("WM_DELETE_WINDOW", self._close_debug_panel)
+
+        columns = ("count", "mean", "p95", "max", "last")
+        tree = ttk.Treeview(panel, columns=columns, height=14)
+        tree.heading("#0", text="span")
+        tree.column("#0", width=220)
+        for column in columns:
+            tree.heading(column, text=column if column == "count" else f"{column} ms")
+            tree.column(column, width=70, anchor=E)
+        tree.pack(fill=BOTH, expand=YES, padx=8, pady=8)
+        self._debug_tree = tree
+
+        buttons = ttk.Frame(panel)
+        buttons.pack(fill=X, padx=8, pady=(0, 8))
+        ttk.Button(buttons, text="Export JSON lines...", command=self._export_trace).pack(side=LEFT)
+        ttk.Button(buttons, text="Clear", command=self._tracer.clear).pack(side=LEFT, padx=8)
+        self._debug_summary = ttk.Label(buttons, style='Muted.TLabel')
+        self._debug_summary.pack(side=RIGHT)
+
+        # Refreshed once a second while open (on the shared ticker)
+        self._ticker.every("debug_panel", 1.0, self._refresh_debug_panel)
+
+    def _refresh_debug_panel(self):
+        tree = self._debug_tree
+        tree.delete(*tree.get_children())
+        for row in self._tracer.summary():
+            tree.insert("", END, text=row['span'],
+                        values=(row['count'], f"{row['mean_ms']:.1f}", f"{row['p95_ms']:.1f}",
+                                f"{row['max_ms']:.1f}", f"{row['last_ms']:.1f}"))
+        self._debug_summary.configure(
+            text=f"{len(self._tracer.spans())} spans buffered, {self._tracer.recorded} recorded")
+
+    def _close_debug_panel(self):
+        self._ticker.cancel("debug_panel")
+        if self._debug_panel is not None:
+            self._debug_panel.destroy()
+            self._debug_panel = None
+
+    def _export_trace(self):
+        path = filedialog.asksaveasfilename(parent=self._debug_panel, defaultextension=".jsonl",
+                                            initialfile="weather_trace.jsonl",
+                                            filetypes=[("JSON lines", "*.jsonl"), ("All files", "*.*")])
+        if path:
+            count = self._tracer.export_jsonl(path)
+            self.status_lbl.configure(text=f"Exported {count} timing spans to {path}")
+
+    # --- Type-ahead suggestions ---
+
+    def _ensure_autocomplete(self):
+        """Build the suggestion index on first use; the city list loads in a worker."""
+        if self._autocomplete is not None:
+            return
+        self._autocomplete = Autocomplete(GEOCODER.places())
+        if os.path.exists(CITY_LIST_FILE):
+            self._workers.submit(self._load_city_list)
+
+    def _load_city_list(self):
+        """Index CITY_LIST_FILE (background thread; about a second for ~200k cities)."""
+        try:
+            self._autocomplete.load_full(CITY_LIST_FILE)
+        except Exception as e:
+            print(f"Autocomplete: could not load {CITY_LIST_FILE}: {e}")
+
+    def _remember_city(self, data):
+        """Rank the city just shown first in later suggestions."""
+        place = place_from_response(current=data.get("current"))
+        if self._autocomplete is not None and place is not None:
+            self._autocomplete.remember(place)
+
+    def _on_search_key(self, event):
+        """Refresh the suggestion list as the user types."""
+        if event.keysym in ('Return', 'KP_Enter', 'Escape', 'Down', 'Up', 'Tab'):
+            return
+        self._ensure_autocomplete()
+        text = self.location_var.get()
+        self._show_suggestions(self._autocomplete.suggest(text, AUTOCOMPLETE_LIMIT) if text.strip() else [])
+
+    def _show_suggestions(self, suggestions):
+        self._suggestions = suggestions
+        box = self._suggest_box
+        if not suggestions:
+            box.place_forget()
+            return
+        box.delete(0, END)
+        box.insert(END, *[label for label, _place in suggestions])
+        box.configure(height=len(suggestions))
+        entry = self.search_entry
+        box.place(x=entry.winfo_rootx() - self.winfo_rootx(),
+                  y=entry.winfo_rooty() - self.winfo_rooty() + entry.winfo_height(),
+                  width=entry.winfo_width())
+        box.lift()
+
+    def _hide_suggestions(self):
+        self._suggestions = []
+        self._suggest_box.place_forget()
+
+    def _hide_suggestions_unless_focused(self):
+        if self.focus_get() not in (self.search_entry, self._suggest_box):
+            self._hide_suggestions()
+
+    def _focus_suggestions(self, event=None):
+        """Down arrow: move from the entry into the list."""
+        if self._suggestions:
+            self._suggest_box.focus_set()
+            self._suggest_box.selection_clear(0, END)
+            self._suggest_box.selection_set(0)
+            self._suggest_box.activate(0)
+        return "break"
+
+    def _pick_suggestion(self, event=None):
+        """Search the selected city; it is fetched by id (see GeocodeIndex.remember)."""
+        selection = self._suggest_box.curselection()
+        if not selection or selection[0] >= len(self._suggestions):
+            return
+        label, place = self._suggestions[selection[0]]
+        GEOCODER.remember(label, place)
+        self.location_var.set(label)
+        self.search_entry.focus_set()
+        self.search_entry.icursor(END)
+        self.search_weather()
+
+    def _watch_displayed(self, key, version, location=None):
+        """
+        Auto-refresh the city now on screen (instead of the previous one),
+        fetching `location` (what the user searched) rather than its key.
+        """
+        if not AUTO_REFRESH:
+            return
+        previous, self._displayed_key = self._displayed_key, key
+        if previous and previous != key and previous not in self._warm_keys:
+            self._refresher.unwatch(previous)
+        self._refresher.watch(key, version=version, location=location)
+
+    def _auto_refresh(self):
+        """Start the refreshes that are due (Tk thread, every AUTO_REFRESH_CHECK)."""
+        if self.loading:
+            return  # a search is in flight; it restarts the displayed city's timer
+        for key, location in self._refresher.due():
+            token = self._searches.current if key == self._displayed_key else None
+            self._workers.submit(self._fetch_weather, location, token, background=True)
+
+    def _process_forecast_data(self, forecast, tz_offset=0, daily=None):
+        """Summarise the 3-hour forecast into 5 days (see weather_core.process_forecast_data)."""
+        with self._tracer.span('forecast', step='5day'):
+            return process_forecast_data(forecast, tz_offset=tz_offset, daily=daily)
+
+    def _group_hourly_by_day(self, forecast, tz_offset=0):
+        """Group forecast rows by local ISO date (see weather_core.group_hourly_by_day)."""
+        return group_hourly_by_day(forecast, tz_offset=tz_offset)
 
     def _on_forecast_card_click(self, idx):
         """Open daily/hourly view for the forecast card at index idx."""
         try:
             # Map index to processed forecast entry
-            forecast_raw = self.weather_data.get('forecast_raw', {})
-            if not forecast_raw:
+            forecast = self.weather_data.get('forecast')
+            if not forecast:
                 return
-            tz_offset = forecast_raw.get('city', {}).get('timezone', 0)
-            processed = self._process_forecast_data(forecast_raw.get('list', []), tz_offset=tz_offset)
+            # Daily aggregates and the day -> rows index are precomputed per fetch
+            processed = self._process_forecast_data(forecast, daily=self.weather_data['daily'])
             if idx >= len(processed):
                 return
             day_entry = processed[idx]
             iso = day_entry.get('date_iso')
-            grouped = self._group_hourly_by_day(forecast_raw.get('list', []), tz_offset=tz_offset)
-            hourly = grouped.get(iso, [])
-            if not hourly:
+            rows = self.weather_data['day_index'].get(iso, range(0))
+            if not rows:
                 messagebox.showinfo("No data", "No hourly data available for this day.")
                 return
             # Show the daily/hourly graph
-            self._show_daily_graph(day_entry['day_name'], hourly, tz_offset=tz_offset)
+            self._show_daily_graph(day_entry['day_name'], forecast, rows)
         except Exception as e:
             print(f"Error opening daily graph: {e}")
 
-    def _show_daily_graph(self, day_name, hourly_list, tz_offset=0):
+    def _show_daily_graph(self, day_name, forecast, rows):
         """Show a Toplevel window with an hourly temperature line chart for the selected day.
+        `rows` are the ForecastTable row indices of that day.
         Uses matplotlib if available; otherwise shows a textual breakdown.
         """
-        if MATPLOTLIB_AVAILABLE:
+        if _matplotlib_loaded():
             try:
-                times = [(datetime.utcfromtimestamp(it['dt']) + timedelta(seconds=tz_offset)).strftime('%H:%M') for it in hourly_list]
-                temps = [it['main']['temp'] for it in hourly_list]
+                times = [forecast.local_datetime(i).strftime('%H:%M') for i in rows]
+                temps = [forecast.temp[i] for i in rows]
 
                 win = tk.Toplevel(self)
                 win.title(f"Hourly - {day_name}")
@@ -1052,9 +1374,11 @@ class ModernWeatherDashboard(ttk.Window):
                 ax.grid(alpha=0.25)
                 fig.tight_layout()
 
-                canvas = FigureCanvasTkAgg(fig, master=win)
+                canvas = backend_tkagg.FigureCanvasTkAgg(fig, master=win)
                 canvas.draw()
                 canvas.get_tk_widget().pack(fill=BOTH, expand=YES)
+                # pyplot keeps every figure alive until closed; release it with the window
+                win.bind("<Destroy>", lambda e, f=fig: plt.close(f) if e.widget is win else None)
 
                 # Add interactive tooltips with mplcursors if available
                 try:
@@ -1078,82 +1402,61 @@ class ModernWeatherDashboard(ttk.Window):
             win = tk.Toplevel(self)
             win.title(f"Hourly - {day_name}")
             txt = tk.Text(win, wrap='word', height=20)
-            for it in hourly_list:
-                t = (datetime.utcfromtimestamp(it['dt']) + timedelta(seconds=tz_offset)).strftime('%H:%M')
-                temp = it['main']['temp']
-                desc = it['weather'][0]['description']
+            for i in rows:
+                t = forecast.local_datetime(i).strftime('%H:%M')
+                temp = forecast.temp[i]
+                desc = forecast.description(i)
                 txt.insert('end', f"{t} — {temp:.1f}°C — {desc}\n")
             txt.config(state='disabled')
             txt.pack(fill=BOTH, expand=YES)
 
-    def _generate_suggestions(self, current, forecast_raw):
-        """Generate a short list of avoidance/safety suggestions based on current conditions
-        and the upcoming forecast. Returns a single concatenated string.
-        """
-        suggestions = []
-
-        try:
-            main = current['weather'][0]['main']
-            desc = current['weather'][0]['description']
-            wind = current['wind']['speed']
-            temp = current['main']['temp']
-            uvi = None
-            # try to read uvi if present in current or forecast (OneCall provides uvi)
-            if 'uvi' in current:
-                uvi = current['uvi']
-        except Exception:
-            main = None; desc = None; wind = 0; temp = None; uvi = None
-
-        # Basic rules
-        if main and main in ('Rain', 'Thunderstorm', 'Drizzle'):
-            suggestions.append('Rain expected — avoid outdoor events; carry an umbrella or seek indoor alternatives.')
-        if wind and wind >= 10:
-            suggestions.append('High winds — avoid boating and secure loose outdoor objects.')
-        if temp is not None and temp >= 33:
-            suggestions.append('Heat alert — avoid intense outdoor exercise during peak hours; stay hydrated and seek shade.')
-        if temp is not None and temp <= 0:
-            suggestions.append('Freezing temperatures — dress warmly and avoid prolonged exposure.')
-        if uvi is not None and uvi >= 7:
-            suggestions.append('High UV index — wear sunscreen and protective clothing.')
-
-        # Look for days with heavy rain probability in forecast (simple heuristic)
-        try:
-            heavy_rain_days = set()
-            for item in forecast_raw.get('list', []):
-                pop = item.get('pop', 0)
-                if pop >= 0.6:
-                    d = datetime.fromtimestamp(item['dt']).date().isoformat()
-                    heavy_rain_days.add(d)
-            if heavy_rain_days:
-                suggestions.append('Some upcoming days have high rain probability — consider indoor plans for those days.')
-        except Exception:
-            pass
-
-        if not suggestions:
-            suggestions.append('No major hazards detected. Enjoy your day — check back for updates.')
-
-        return ' \n'.join(suggestions)
+    def _generate_suggestions(self, current, forecast):
+        """Build the suggestions text (see weather_core.generate_suggestions)."""
+        return generate_suggestions(current, forecast)
 
     def _update_weather_ui(self, data):
         """
         Update UI with new weather data.
-        This is the main orchestrator function.
+        This is the main orchestrator function. Each section remembers the
+        fingerprint of the inputs it last rendered (see data["fingerprints"])
+        and is skipped when they are unchanged, e.g. on a cache hit or a stale
+        paint followed by an identical refresh.
         """
+        previous = self.weather_data
         self.weather_data = data
-        
+
         try:
             # --- Parse Core Data ---
             current = data["current"]
-            forecast_raw = data.get("forecast_raw", {})
-            forecast_list = forecast_raw.get("list", [])
-            tz_offset = forecast_raw.get('city', {}).get('timezone', 0)
+            forecast = data["forecast"]  # columnar ForecastTable, parsed once per fetch
+            tz_offset = forecast.tz_offset
             self._tz_offset = tz_offset # Store for other methods
+            fingerprints = data["fingerprints"]
             
-            # --- Call Sub-Updaters ---
-            self._update_current_tab_ui(current, forecast_raw, tz_offset, data["last_updated"])
-            self._update_map_ui(current)
-            self._update_hourly_tab_ui(forecast_list, tz_offset)
-            self._update_forecast_tab_ui(forecast_list, tz_offset)
+            # --- Call Sub-Updaters (skipping unchanged sections) ---
+            if not self._render_section("current", (fingerprints["current"], tz_offset),
+                                        lambda: self._update_current_tab_ui(current, tz_offset)):
+                # search_weather() replaced the name with "Loading..."; restore it
+                self.location_lbl.configure(text=f"{current['name']}, {current['sys']['country']}")
+            self._render_section("suggestions", fingerprints["suggestions"],
+                                 lambda: self.suggestions_lbl.configure(text=f"Suggestions: {data['suggestions']}"))
+            if previous is None or previous["fingerprints"]["map"] != fingerprints["map"]:
+                self._prefetch_tiles(current)
+            # Tabs that have not been opened yet are rendered when first selected
+            for name in ("hourly", "forecast", "map"):
+                if name in self._built_tabs:
+                    self._render_tab(name, data)
+
+            stale_note = " (cached, refreshing…)" if data.get("stale") else ""
+            self.updated_lbl.configure(text=f"Last updated: {data['last_updated']}{stale_note}")
+            if not data.get("stale"):
+                self._hide_loading()
+
+            # Report network timings of fresh fetches in the status bar
+            timings = data.get("timings")
+            if timings:
+                detail = ", ".join(f"{k} {v:.2f}s" for k, v in timings.items() if k != 'total')
+                self.status_lbl.configure(text=f"Fetched in {timings['total']:.2f}s ({detail})")
 
         except KeyError as e:
             self._show_error(f"Error parsing weather data: Missing key {e}")
@@ -1161,8 +1464,56 @@ class ModernWeatherDashboard(ttk.Window):
         except Exception as e:
             print(f"Error during UI update: {e}")
 
+    def _render_section(self, name, inputs, render):
+        """
+        Call render() unless section `name` already shows `inputs` (a fingerprint).
+        Renderers catch their own errors and return False when they failed; the
+        fingerprint is only recorded on success, so a failed section renders again
+        on the next update. Returns True if it rendered; the time taken is kept in
+        self.render_timings.
+        """
+        if self._rendered.get(name) == inputs:
+            self.render_skips[name] = self.render_skips.get(name, 0) + 1
+            return False
+        start = time.perf_counter()
+        ok = render() is not False
+        elapsed = self.render_timings[name] = time.perf_counter() - start
+        self._tracer.record('render', elapsed, section=name, ok=ok)
+        if not ok:
+            self._forget_section(name)
+            return False
+        self._rendered[name] = inputs
+        return True
+
+    def _forget_section(self, name):
+        """Make section `name` render again on the next update (e.g. its deferred draw failed)."""
+        self._rendered.pop(name, None)
+
+    def _section_inputs(self, name, data):
+        """Fingerprint of everything tab section `name` renders from `data`."""
+        fingerprints = data["fingerprints"]
+        local_now = int(time.time()) + data["forecast"].tz_offset
+        if name == "hourly":
+            # The 24-hour window also moves on with the local hour
+            return (fingerprints["forecast"], local_now // 3600)
+        if name == "forecast":
+            # The five days start tomorrow, so they move on with the local date
+            return (fingerprints["forecast"], local_now // 86400)
+        return fingerprints[name]
+
+    def _render_tab(self, name, data):
+        """Render a built tab ("hourly", "forecast" or "map") if its inputs changed."""
+        if name == "hourly":
+            render = lambda: self._update_hourly_tab_ui(data["forecast"])
+        elif name == "forecast":
+            render = lambda: self._update_forecast_tab_ui(data["forecast"], data["daily"])
+        else:
+            # The map pans on the redraw scheduler; its draw time is in self._redraw.timings
+            render = lambda: self._redraw.schedule("map", lambda: self._update_map_ui(data["current"]),
+                                                   heavy=True)
+        self._render_section(name, self._section_inputs(name, data), render)
 
-    def _update_current_tab_ui(self, current, forecast_raw, tz_offset, last_updated):
+    def _update_current_tab_ui(self, current, tz_offset):
         """Updates all widgets on the 'Current' tab."""
         try:
             location_name = f"{current['name']}, {current['sys']['country']}"
@@ -1195,7 +1546,6 @@ class ModernWeatherDashboard(ttk.Window):
             
             self.icon_lbl.configure(text=icon)
             self.condition_lbl.configure(text=description)
-            self.updated_lbl.configure(text=f"Last updated: {last_updated}")
             
             # Update meters
             self.feels_like_meter.configure(amountused=int(feels_like))
@@ -1211,13 +1561,11 @@ class ModernWeatherDashboard(ttk.Window):
             theme_colors = THEMES[self.theme_mode]["dynamic_bg"]
             colors = theme_colors.get(main_condition, theme_colors["Default"])
             self.gradient_card.update_gradient(colors[0], colors[1])
-
-            # Update suggestions
-            suggestions_text = self._generate_suggestions(current, forecast_raw)
-            self.suggestions_lbl.configure(text=f"Suggestions: {suggestions_text}")
+            return True
 
         except Exception as e:
             print(f"Error updating Current tab: {e}")
+            return False
 
     def _update_map_ui(self, current):
         """Updates all widgets on the 'Map' tab."""
@@ -1226,6 +1574,10 @@ class ModernWeatherDashboard(ttk.Window):
                 coords = current['coord']
                 lat, lon = coords['lat'], coords['lon']
                 
+                # While tile downloads fail, serve the map from the tile cache only
+                if self._tile_prefetcher is not None and hasattr(self.map_widget, 'use_database_only'):
+                    self.map_widget.use_database_only = not self._tile_prefetcher.online
+
                 # Clear old marker
                 if self.current_marker:
                     self.current_marker.delete()
@@ -1235,20 +1587,24 @@ class ModernWeatherDashboard(ttk.Window):
                 self.map_widget.set_zoom(10)
         except Exception as e:
             print(f"Error updating Map tab: {e}")
+            self._forget_section("map")
 
-    def _update_hourly_tab_ui(self, forecast_list, tz_offset):
+    def _update_hourly_tab_ui(self, forecast):
         """Updates all widgets on the 'Hourly' tab."""
         try:
-            hourly_24h = self._get_24h_from_forecast(forecast_list, tz_offset=tz_offset)
-            self._update_hourly_chart(hourly_24h)
+            hourly_24h = self._get_24h_from_forecast(forecast)
+            # Only the latest data is drawn when refreshes arrive in a burst
+            self._redraw.schedule("hourly_chart", lambda: self._update_hourly_chart(hourly_24h), heavy=True)
+            return True
         except Exception as e:
             print(f"Error updating Hourly tab: {e}")
+            return False
 
-    def _update_forecast_tab_ui(self, forecast_list, tz_offset):
+    def _update_forecast_tab_ui(self, forecast, daily=None):
         """Updates all widgets on the '5-Day Forecast' tab."""
         try:
             # --- Process and Update Forecast Cards ---
-            processed_forecast = self._process_forecast_data(forecast_list, tz_offset=tz_offset)
+            processed_forecast = self._process_forecast_data(forecast, daily=daily)
             
             # Update forecast cards
             for i, card in enumerate(self.forecast_cards):
@@ -1265,59 +1621,32 @@ class ModernWeatherDashboard(ttk.Window):
                     card.pack_forget() # Hide extra cards
                     
             # --- Update embedded Forecast Chart (if present) ---
-            if MATPLOTLIB_AVAILABLE and hasattr(self, '_forecast_ax'):
-                ax = self._forecast_ax
-                fig = self._forecast_fig
-                ax.clear()
+            self._redraw.schedule("forecast_chart",
+                                  lambda: self._update_forecast_chart(processed_forecast), heavy=True)
+            return True
+        except Exception as e:
+            print(f"Error updating Forecast tab: {e}")
+            return False
 
-                # Plot daily highs and lows
+    def _update_forecast_chart(self, processed_forecast):
+        """Redraw the embedded 5-day high/low chart (runs from the redraw scheduler)."""
+        try:
+            if MATPLOTLIB_AVAILABLE and hasattr(self, '_forecast_chart'):
+                # Plot daily highs and lows into the existing artists
                 days = [d['day_name'] for d in processed_forecast]
                 highs = [d['temp_max'] for d in processed_forecast]
                 lows = [d['temp_min'] for d in processed_forecast]
-                
-                # --- Attractive Styling for 5-Day Chart ---
-                bg_color = self.style.lookup('TFrame', 'background')
-                fg_color = self.style.lookup('TLabel', 'foreground')
+                self._forecast_chart.update(days, highs, lows)
 
-                fig.patch.set_facecolor(bg_color)
-                ax.set_facecolor(bg_color)
-                ax.spines['top'].set_visible(False)
-                ax.spines['right'].set_visible(False)
-                ax.spines['bottom'].set_color(fg_color)
-                ax.spines['left'].set_color(fg_color)
-                ax.tick_params(axis='x', colors=fg_color)
-                ax.tick_params(axis='y', colors=fg_color)
-                ax.yaxis.label.set_color(fg_color)
-                ax.title.set_color(fg_color)
-                # --- End Styling ---
-
-                x = range(len(days))
-                ax.plot(x, highs, marker='o', color=PALETTE['accent'], label='High', linewidth=3, markersize=6)
-                ax.plot(x, lows, marker='o', color='#ffc107', label='Low', linewidth=3, markersize=6) # NEW Amber/Yellow
-                ax.fill_between(x, lows, highs, color=PALETTE['accent_soft'], alpha=0.35)
-                ax.set_xticks(x)
-                ax.set_xticklabels(days, rotation=10)
-                ax.set_title('5-Day Forecast')
-                ax.set_ylabel('Temperature (°C)')
-                ax.grid(alpha=0.2)
-                legend = ax.legend(frameon=False)
-                # Set legend text color
-                plt.setp(legend.get_texts(), color=fg_color)
-                
-                fig.tight_layout()
-                try:
-                    self._forecast_canvas.draw()
-                except Exception:
-                    pass
-
-                # Attach simple hover tooltips using mplcursors
+                # Attach simple hover tooltips using mplcursors (once per chart)
                 try:
                     if MPLCURSORS_AVAILABLE:
-                        mplcursors.cursor(ax.lines, hover=True)
+                        self._forecast_chart.attach_cursor(mplcursors.cursor, hover=True)
                 except Exception:
                     pass
         except Exception as e:
-            print(f"Error updating Forecast tab: {e}")
+            print(f"Error updating forecast chart: {e}")
+            self._forget_section("forecast")
             
     def _show_error(self, message):
         """Show error message to user."""
@@ -1327,19 +1656,51 @@ class ModernWeatherDashboard(ttk.Window):
     def _end_loading(self):
         """Reset loading state."""
         self.loading = False
-        self.search_btn.configure(state="normal", text="Search")
+        self._hide_loading()
+
+    def destroy(self):
+        """Close pooled HTTP connections and fetch workers along with the window."""
+        try:
+            self._redraw.close()
+            self._ticker.close()
+            self._workers.shutdown(wait=False, cancel_futures=True)
+            self._client.close()
+            if self._tile_prefetcher is not None:
+                self._tile_prefetcher.close()
+            if self._trace_out:
+                print(f"Wrote {self._tracer.export_jsonl(self._trace_out)} timing spans to {self._trace_out}")
+        except Exception:
+            pass
+        super().destroy()
         
 if __name__ == "__main__":
-    # A quick check to ensure dependencies are installed
-    try:
-        import requests
-        import tkintermapview
-        import ttkbootstrap
-    except ImportError as e:
-        print(f"Error: Required library not found: {e.name}")
+    parser = argparse.ArgumentParser(description="WeatherScope Pro weather dashboard")
+    parser.add_argument('--batch', nargs='+', metavar='CITY', default=[],
+                        help="fetch these cities headlessly (no window) and exit")
+    parser.add_argument('--batch-file', metavar='PATH',
+                        help="file with one city per line to fetch headlessly")
+    parser.add_argument('--startup-report', action='store_true',
+                        help="print how long each startup phase took")
+    parser.add_argument('--trace-out', metavar='PATH',
+                        help="write the timing spans as JSON lines to PATH on exit")
+    args = parser.parse_args()
+
+    if args.batch or args.batch_file:
+        # Same as weather_batch_cli.py, which also runs without tkinter installed
+        from weather_batch_cli import run_batch, read_locations
+        cities = list(args.batch)
+        if args.batch_file:
+            cities += read_locations(args.batch_file)
+        sys.exit(1 if run_batch(cities, trace_out=args.trace_out) else 0)
+
+    # A quick check to ensure dependencies are installed (without importing them)
+    missing = [name for name in ("requests", "tkintermapview", "ttkbootstrap")
+               if not _module_available(name)]
+    if missing:
+        print(f"Error: Required library not found: {missing[0]}")
         print("Please install all required libraries:")
         print("   pip install requests tkintermapview ttkbootstrap")
         exit()
 
-    app = ModernWeatherDashboard()
+    app = ModernWeatherDashboard(startup_report=args.startup_report, trace_out=args.trace_out)
     app.mainloop()
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""
+Shared fixtures: the Weather modules on sys.path and a local stub HTTP server.
+
+    python -m pytest -q        (from the Weather directory)
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class StubServer:
+    """
+    HTTP server on 127.0.0.1 answering from `routes`: path ->
+    (status, body bytes, delay seconds, etag or None). A request whose
+    If-None-Match equals the route's ETag gets 304 Not Modified.
+
+    `hits` counts requests per path, `max_concurrent` the most requests
+    that were being answered at the same time.
+    """
+    def __init__(self):
+        self.routes = {}
+        self.hits = Counter()
+        self.not_modified = 0
+        self.max_concurrent = 0
+        self._active = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self._server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}"
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def route(self, path, body=b'{}', status=200, delay=0.0, etag=None):
+        self.routes[path] = (status, body, delay, etag)
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, as the real API
+
+            def do_GET(self):
+                path = urlsplit(self.path).path
+                with stub._lock:
+                    stub.hits[path] += 1
+                    stub._active += 1
+                    stub.max_concurrent = max(stub.max_concurrent, stub._active)
+                try:
+                    status, body, delay, etag = stub.routes.get(path, (404, b'{"cod": "404"}', 0.0, None))
+                    time.sleep(delay)
+                    if etag is not None and self.headers.get('If-None-Match') == etag:
+                        with stub._lock:
+                            stub.not_modified += 1
+                        status, body = 304, b''
+                    self.send_response(status)
+                    if etag is not None:
+                        self.send_header('ETag', etag)
+                    self.send_header('Content-Type', 'application/json')
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                finally:
+                    with stub._lock:
+                        stub._active -= 1
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@pytest.fixture
+def stub_server():
+    server = StubServer()
+    yield server
+    server.close()
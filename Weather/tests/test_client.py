@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""WeatherClient and SingleFlight against a local stub server."""
+
+import threading
+import time
+
+import pytest
+import requests
+
+from weather_client import Place, SingleFlight, WeatherClient, location_params, normalize_location
+
+DELAY = 0.5  # seconds each stub endpoint takes to answer
+
+
+@pytest.fixture
+def client(stub_server):
+    urls = {name: f"{stub_server.url}/{name}?{{query}}&appid={{key}}" for name in ("current", "forecast")}
+    client = WeatherClient(urls, "test-key")
+    yield client
+    client.close()
+
+
+def test_fetch_requests_endpoints_concurrently(stub_server, client):
+    stub_server.route('/current', b'{"name": "London"}', delay=DELAY)
+    stub_server.route('/forecast', b'{"list": []}', delay=DELAY)
+
+    data, timings = client.fetch("London")
+
+    assert data == {'current': {'name': "London"}, 'forecast': {'list': []}}
+    assert stub_server.max_concurrent == 2
+    # Wall time is close to the slowest endpoint, not the sum of both
+    assert timings['total'] < 1.6 * DELAY
+    assert set(timings) == {'current', 'forecast', 'total'}
+
+
+def test_fetch_raw_returns_bodies(stub_server, client):
+    stub_server.route('/current', b'{"a": 1}')
+
+    data, _timings = client.fetch("London", endpoints=['current'], raw=True)
+
+    assert data == {'current': b'{"a": 1}'}
+
+
+def test_not_found_raises_http_error(stub_server, client):
+    stub_server.route('/current', b'{"cod": "404"}', status=404)
+    stub_server.route('/forecast', b'{}')
+
+    with pytest.raises(requests.exceptions.HTTPError) as raised:
+        client.fetch("Nowhere")
+    assert raised.value.response.status_code == 404
+
+
+def test_etag_revalidation_reuses_body(stub_server, client):
+    stub_server.route('/current', b'{"temp": 12}', etag='"v1"')
+
+    first, _ = client.get_json('current', "London")
+    second, _ = client.get_json('current', "London")
+
+    assert first == second == {'temp': 12}
+    assert stub_server.hits['/current'] == 2
+    assert stub_server.not_modified == 1
+    assert client.not_modified == 1
+
+
+def test_changed_etag_downloads_again(stub_server, client):
+    stub_server.route('/current', b'{"temp": 12}', etag='"v1"')
+    client.get_json('current', "London")
+    stub_server.route('/current', b'{"temp": 14}', etag='"v2"')
+
+    body, _ = client.get_json('current', "London")
+
+    assert body == {'temp': 14}
+    assert client.not_modified == 0
+
+
+def test_concurrent_identical_lookups_send_one_request(stub_server, client):
+    stub_server.route('/current', b'{"name": "London"}', delay=DELAY)
+    stub_server.route('/forecast', b'{"list": []}', delay=DELAY)
+    flights = SingleFlight()
+    callers = 8
+    barrier = threading.Barrier(callers)
+    results = []
+
+    def lookup():
+        barrier.wait()
+        data, _timings = flights.do(normalize_location("London"), client.fetch, "London")
+        results.append(data)
+
+    threads = [threading.Thread(target=lookup) for _ in range(callers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert stub_server.hits == {'/current': 1, '/forecast': 1}
+    assert len(results) == callers and all(r == results[0] for r in results)
+    assert flights.stats() == {'calls': callers, 'coalesced': callers - 1, 'in_flight': 0}
+
+
+def test_single_flight_shares_the_exception():
+    flights = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    errors = []
+
+    def failing():
+        started.set()
+        release.wait(5)
+        raise ValueError("boom")
+
+    def call():
+        try:
+            flights.do('k', failing)
+        except ValueError as e:
+            errors.append(e)
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    started.wait(5)
+    follower = threading.Thread(target=call)
+    follower.start()
+    while flights.stats()['coalesced'] == 0:
+        time.sleep(0.01)
+    release.set()
+    leader.join()
+    follower.join()
+
+    assert len(errors) == 2 and errors[0] is errors[1]
+    assert flights.stats()['in_flight'] == 0
+
+
+def test_location_keys():
+    assert normalize_location("  London ,GB ") == normalize_location("london, gb") == "london,gb"
+    assert normalize_location((51.50853, -0.12574)) == "51.5085,-0.1257"
+    assert normalize_location(Place(2643743, "London", "GB", 51.5, -0.13)) == "id:2643743"
+    assert location_params(Place(2643743, "London", "GB", 51.5, -0.13))['query'] == "id=2643743"
+    assert location_params("New York")['query'] == "q=New%20York"
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""HandoffQueue coalescing and search generations."""
+
+from weather_handoff import DONE, ERROR, LOADING, RESULT, STALE, STATUS, Generations, HandoffQueue
+
+
+def test_newer_message_replaces_pending_one_per_channel():
+    queue = HandoffQueue()
+    queue.put(STALE, 'london', 'stale package', generation=1)
+    queue.put(LOADING, 'london', generation=1)
+    queue.put(RESULT, 'london', 'fresh package', generation=1)
+    queue.put(DONE, 'london', generation=1)
+
+    messages = queue.drain()
+
+    assert [(m.kind, m.payload) for m in messages] == [(RESULT, 'fresh package'), (DONE, None)]
+    assert queue.stats()['superseded'] == 2
+    assert len(queue) == 0
+
+
+def test_older_generation_never_replaces_newer():
+    queue = HandoffQueue()
+    queue.put(RESULT, 'london', 'new', generation=2)
+    queue.put(RESULT, 'london', 'old', generation=1)
+
+    assert [m.payload for m in queue.drain()] == ['new']
+
+
+def test_data_makes_pending_error_moot():
+    queue = HandoffQueue()
+    queue.put(ERROR, 'london', 'network error')
+    queue.put(STATUS, 'paris', 'refresh failed')
+    queue.put(RESULT, 'london', 'package')
+
+    assert [(m.kind, m.key) for m in queue.drain()] == [(STATUS, 'paris'), (RESULT, 'london')]
+
+
+def test_bound_drops_oldest_cities():
+    queue = HandoffQueue(max_pending=3)
+    for city in ('a', 'b', 'c', 'd', 'e'):
+        queue.put(RESULT, city, city)
+
+    assert [m.key for m in queue.drain()] == ['c', 'd', 'e']
+    assert queue.stats()['dropped'] == 2
+
+
+def test_begin_cancels_previous_generation():
+    searches = Generations()
+    first = searches.begin()
+    second = searches.begin()
+
+    assert first.cancelled and not second.cancelled
+    assert second.generation == first.generation + 1
+    assert searches.is_current(second.generation) and not searches.is_current(first.generation)
+
+
+def test_notify_fires_once_per_batch():
+    wakeups = []
+    queue = HandoffQueue(notify=lambda: wakeups.append(len(queue)))
+    queue.put(RESULT, 'london', 'package')
+    queue.put(DONE, 'london')
+    queue.put(RESULT, 'paris', 'package')
+    assert wakeups == [1]  # called after the first message is in
+
+    queue.drain()
+    queue.put(STATUS, 'london', 'checked')
+
+    assert wakeups == [1, 1]
+    assert queue.stats()['notified'] == 2
+
+
+def test_no_notify_while_idle():
+    wakeups = []
+    queue = HandoffQueue(notify=lambda: wakeups.append(1))
+    queue.drain()
+
+    assert wakeups == []
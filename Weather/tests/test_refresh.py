@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""RefreshScheduler timetable, backoff and in-flight bookkeeping."""
+
+import random
+
+import pytest
+
+from weather_refresh import RefreshScheduler, retry_wait
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def scheduler(clock):
+    return RefreshScheduler(interval=100, jitter=0, max_backoff=1000, clock=clock)
+
+
+def test_city_is_due_once_per_interval(clock, scheduler):
+    scheduler.watch('london', location="London")
+    clock.now = 99
+    assert scheduler.due() == []
+
+    clock.now = 100
+    assert scheduler.due() == [('london', "London")]
+    assert scheduler.due() == []  # in flight
+    assert scheduler.next_due() is None
+
+    assert scheduler.succeeded('london', 'v1')
+    clock.now = 199
+    assert scheduler.due() == []
+    clock.now = 200
+    assert scheduler.due() == [('london', "London")]
+
+
+def test_succeeded_reports_whether_the_version_changed(clock, scheduler):
+    scheduler.watch('london', version='v1')
+    clock.now = 100
+    scheduler.due()
+    assert not scheduler.succeeded('london', 'v1')
+    clock.now = 200
+    scheduler.due()
+    assert scheduler.succeeded('london', 'v2')
+    assert scheduler.stats()['changed'] == 1 and scheduler.stats()['unchanged'] == 1
+
+
+def test_failures_back_off_exponentially_up_to_the_cap(clock, scheduler):
+    scheduler.watch('london')
+    delays = []
+    for _ in range(5):
+        clock.now += 1000
+        assert scheduler.due() == [('london', 'london')]
+        delays.append(scheduler.failed_refresh('london'))
+    assert delays == [200, 400, 800, 1000, 1000]
+    assert scheduler.stats()['backing_off'] == 1
+
+    clock.now += 1000
+    scheduler.due()
+    scheduler.succeeded('london', 'v1')
+    clock.now += 100
+    scheduler.due()
+    assert scheduler.failed_refresh('london') == 200  # reset by the success
+
+
+def test_failed_city_is_due_after_its_backoff(clock, scheduler):
+    scheduler.watch('london')
+    clock.now = 100
+    scheduler.due()
+    scheduler.failed_refresh('london')
+    clock.now = 299
+    assert scheduler.due() == []
+    clock.now = 300
+    assert scheduler.due() == [('london', 'london')]
+
+
+def test_jitter_stays_within_bounds(clock):
+    scheduler = RefreshScheduler(interval=100, jitter=0.1, rng=random.Random(7), clock=clock)
+    for i in range(50):
+        scheduler.watch(f'city{i}')
+    clock.now = 89.9
+    assert scheduler.due() == []
+    clock.now = 110
+    assert len(scheduler.due()) == 50
+
+
+def test_spread_staggers_a_startup_list(clock):
+    scheduler = RefreshScheduler(interval=100, rng=random.Random(7), clock=clock)
+    for i in range(50):
+        scheduler.watch(f'city{i}', spread=True)
+    clock.now = 50
+    assert 0 < len(scheduler.due()) < 50
+
+
+def test_rewatching_a_busy_city_keeps_it_in_flight(clock, scheduler):
+    scheduler.watch('london', location="London,GB")
+    clock.now = 100
+    assert scheduler.due() == [('london', "London,GB")]
+
+    # A search for the city lands while its refresh is running
+    scheduler.watch('london', version='v2')
+    clock.now = 1000
+    assert scheduler.due() == []  # no second refresh while one is in flight
+
+    scheduler.succeeded('london', 'v2')
+    clock.now = 1100
+    assert scheduler.due() == [('london', "London,GB")]  # location kept
+
+
+def test_cancelled_refresh_is_due_again_after_release(clock, scheduler):
+    scheduler.watch('london', location="London")
+    clock.now = 100
+    assert scheduler.due() == [('london', "London")]
+
+    # Superseded by a search before it fetched: settled without a result
+    scheduler.release('london')
+
+    assert scheduler.due() == [('london', "London")]
+    assert scheduler.stats()['failed'] == 0
+
+
+def test_search_then_cancelled_refresh_restarts_the_timer(clock, scheduler):
+    scheduler.watch('london', location="London")
+    clock.now = 100
+    scheduler.due()
+    clock.now = 110
+    scheduler.watch('london', version='v3')  # the search's result
+    scheduler.release('london')  # the superseded refresh settles afterwards
+
+    clock.now = 209
+    assert scheduler.due() == []
+    clock.now = 210
+    assert scheduler.due() == [('london', "London")]
+
+
+def test_settling_an_unwatched_city(scheduler):
+    assert scheduler.succeeded('paris', 'v1')
+    assert scheduler.failed_refresh('paris') is None
+    scheduler.release('paris')
+    assert scheduler.watched() == []
+
+
+def test_retry_wait():
+    assert retry_wait(45.4) == "45 s"
+    assert retry_wait(720) == "12 min"
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""WeatherService: cache, coalescing and geocoding over a stub server."""
+
+import os
+import threading
+
+import pytest
+
+from weather_cache import ResponseCache
+from weather_client import SingleFlight, WeatherClient, normalize_location
+from weather_core import WeatherService
+from weather_geocode import GeocodeIndex
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks", "fixtures")
+
+
+def fixture(name):
+    with open(os.path.join(FIXTURES, name), 'rb') as f:
+        return f.read()
+
+
+@pytest.fixture
+def service(stub_server):
+    stub_server.route('/current', fixture("london_current.json"), delay=0.3)
+    stub_server.route('/forecast', fixture("london_forecast.json"), delay=0.3)
+    urls = {name: f"{stub_server.url}/{name}?{{query}}&appid={{key}}" for name in ("current", "forecast")}
+    client = WeatherClient(urls, "test-key")
+    cache = ResponseCache(":memory:")
+    yield WeatherService(client, cache=cache, flights=SingleFlight(), normalize=normalize_location,
+                         geocoder=GeocodeIndex(":memory:"))
+    client.close()
+    cache.close()
+
+
+def test_concurrent_loads_of_one_city_fetch_once(stub_server, service):
+    callers = 6
+    barrier = threading.Barrier(callers)
+    packages = []
+
+    def load(text):
+        barrier.wait()
+        packages.append(service.load(text))
+
+    threads = [threading.Thread(target=load, args=("London",)) for _ in range(callers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert stub_server.hits == {'/current': 1, '/forecast': 1}
+    assert len(packages) == callers
+    assert all(p["current"]["name"] == "London" for p in packages)
+
+
+def test_later_searches_for_the_same_city_hit_the_cache(stub_server, service):
+    service.load("London")
+    package = service.load(" LONDON ")
+
+    assert stub_server.hits == {'/current': 1, '/forecast': 1}
+    assert package["current"]["id"] == 2643743
+    assert service.cache.get('current', "id:2643743") is not None
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""The SQLite stores: ResponseCache TTL + LRU, GeocodeIndex aliases."""
+
+import pytest
+
+import weather_cache
+from weather_cache import ResponseCache
+from weather_client import Place
+from weather_geocode import GeocodeIndex
+
+
+class Clock:
+    """Stands in for time.time() in the store modules."""
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(weather_cache.time, 'time', clock)
+    return clock
+
+
+@pytest.fixture
+def cache():
+    cache = ResponseCache(":memory:", ttls={'current': 60}, default_ttl=600, max_entries=3, max_bytes=1000)
+    yield cache
+    cache.close()
+
+
+def test_entries_expire_per_endpoint_ttl(clock, cache):
+    cache.put('current', 'london', b'now')
+    cache.put('forecast', 'london', b'later')
+    clock.now += 61
+
+    assert cache.get('current', 'london') is None
+    assert cache.get('forecast', 'london') == (b'later', clock.now - 61)
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 1
+
+
+def test_expired_entries_stay_readable_as_stale(clock, cache):
+    cache.put('current', 'london', b'old')
+    clock.now += 120
+
+    assert cache.get_stale('current', 'london') == (b'old', clock.now - 120)
+    assert cache.get_stale('current', 'london', max_age=100) is None
+
+
+def test_least_recently_used_entry_is_evicted_first(clock, cache):
+    for key in ('a', 'b', 'c'):
+        cache.put('forecast', key, b'x')
+        clock.now += 1
+    cache.get('forecast', 'a')  # a is now more recent than b
+    clock.now += 1
+    cache.put('forecast', 'd', b'x')
+
+    assert cache.get_stale('forecast', 'b') is None
+    assert all(cache.get_stale('forecast', key) for key in ('a', 'c', 'd'))
+    assert cache.stats()['evictions'] == 1 and cache.stats()['entries'] == 3
+
+
+def test_byte_budget_evicts(clock, cache):
+    cache.put('forecast', 'a', b'x' * 600)
+    clock.now += 1
+    cache.put('forecast', 'b', b'x' * 600)
+
+    assert cache.get_stale('forecast', 'a') is None
+    assert cache.stats()['bytes'] == 600
+
+
+def test_geocode_aliases():
+    index = GeocodeIndex(":memory:")
+    london = Place(2643743, "London", "GB", 51.5085, -0.1257)
+    ontario = Place(6058560, "London", "CA", 42.9834, -81.233)
+    index.remember("London", london)
+    index.remember("london,ca", ontario)
+
+    assert index.resolve(" LONDON ") == london
+    assert index.resolve("London, GB") == london
+    assert index.resolve("London,CA") == ontario
+
+    # "name,country" keeps the first city; the exact text follows the latest answer
+    other = Place(1, "London", "GB", 0.0, 0.0)
+    index.remember("London", other)
+    assert index.resolve("london") == other
+    assert index.resolve("london,gb") == london
+    assert index.stats()['places'] == 3
+    index.close()
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""TileCache eviction and TilePrefetcher against a stub tile server."""
+
+import socket
+from concurrent.futures import wait
+
+import pytest
+
+import weather_tiles
+from weather_tiles import TileCache, TilePrefetcher, prefetch_allowed, tiles_around
+
+SERVER = "http://tiles.example/{z}/{x}/{y}.png"
+LONDON = (51.5085, -0.1257)
+
+
+@pytest.fixture
+def cache():
+    cache = TileCache(":memory:", max_tiles=3, max_bytes=1000)
+    yield cache
+    cache.close()
+
+
+@pytest.mark.parametrize("url", [
+    "https://tile.openstreetmap.org/{z}/{x}/{y}.png",
+    "https://a.tile.openstreetmap.org/{z}/{x}/{y}.png",
+    "https://C.TILE.OPENSTREETMAP.ORG./{z}/{x}/{y}.png",
+])
+def test_openstreetmap_is_never_prefetched(cache, url):
+    assert not prefetch_allowed(url)
+    with pytest.raises(ValueError):
+        TilePrefetcher(cache, url)
+
+
+def test_server_cannot_be_swapped_after_the_check(cache):
+    prefetcher = TilePrefetcher(cache, SERVER)
+    with pytest.raises(AttributeError):
+        prefetcher.server_url = "https://tile.openstreetmap.org/{z}/{x}/{y}.png"
+    prefetcher.close()
+    assert prefetch_allowed(SERVER)
+    assert prefetch_allowed("http://tile.openstreetmap.org.example.com/{z}/{x}/{y}.png")
+
+
+def test_least_recently_used_tiles_are_evicted(monkeypatch, cache):
+    now = [1000.0]
+    monkeypatch.setattr(weather_tiles.time, 'time', lambda: now[0])
+    for x in range(3):
+        cache.put(SERVER, 10, x, 0, b'png')
+        now[0] += 1
+    assert cache.touch(SERVER, [(10, 0, 0), (10, 9, 9)]) == {(10, 0, 0)}  # 0 is now the newest
+    now[0] += 1
+    cache.put(SERVER, 10, 3, 0, b'png')
+
+    assert cache.get(SERVER, 10, 1, 0) is None
+    assert all(cache.get(SERVER, 10, x, 0) for x in (0, 2, 3))
+    assert cache.stats()['tiles'] == 3 and cache.stats()['evictions'] == 1
+
+
+def test_byte_budget_evicts_tiles(cache):
+    cache.put(SERVER, 10, 0, 0, b'x' * 600)
+    cache.put(SERVER, 10, 1, 0, b'x' * 600)
+
+    assert cache.get(SERVER, 10, 0, 0) is None
+    assert cache.stats()['bytes'] == 600
+
+
+def test_prefetch_downloads_missing_tiles_once(stub_server):
+    cache = TileCache(":memory:")
+    wanted = tiles_around(*LONDON, 10, 1)
+    for zoom, x, y in wanted:
+        stub_server.route(f"/{zoom}/{x}/{y}.png", b'png')
+    prefetcher = TilePrefetcher(cache, stub_server.url + "/{z}/{x}/{y}.png", zooms={10: 1})
+
+    wait(prefetcher.prefetch(*LONDON).result())
+    again = prefetcher.prefetch(*LONDON).result()
+
+    assert len(wanted) == 9 and sum(stub_server.hits.values()) == 9
+    assert again == []
+    assert prefetcher.stats()['fetched'] == 9 and prefetcher.stats()['already_cached'] == 9
+    prefetcher.close()
+    cache.close()
+
+
+def test_offline_prefetch_probes_one_tile():
+    with socket.socket() as sock:  # a port nothing listens on
+        sock.bind(('127.0.0.1', 0))
+        dead = f"http://127.0.0.1:{sock.getsockname()[1]}/{{z}}/{{x}}/{{y}}.png"
+    cache = TileCache(":memory:")
+    prefetcher = TilePrefetcher(cache, dead, zooms={10: 1}, timeout=1)
+    wait(prefetcher.prefetch(*LONDON).result())
+    assert not prefetcher.online
+    for tile in tiles_around(*LONDON, 10, 1):
+        cache.put(dead, *tile, b'png')
+
+    probe = prefetcher.prefetch(*LONDON).result()
+
+    assert len(probe) == 1
+    wait(probe)
+    prefetcher.close()
+    cache.close()
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""
+Type-ahead city suggestions for WeatherScope Pro.
+
+CityIndex keeps city names in one sorted list of folded keys
+("london,gb", "london,on,ca") with the other fields in parallel compact
+arrays, and answers a prefix query with bisect: one binary search plus a
+walk over the first `limit` matches, well under a millisecond per
+keystroke even for OpenWeatherMap's full ~200k-entry city list (see
+benchmarks/bench_autocomplete.py).
+
+Autocomplete combines two indexes:
+- the cities the user already searched (from the geocode index), always
+  available and ranked first,
+- the optional full city list (OpenWeatherMap's city.list.json.gz, from
+  http://bulk.openweathermap.org/sample/), loaded in the background on
+  first use. Only with it can a name be rejected locally: validate() says
+  None ("don't know") until then. Only the city name is checked, so
+  country spellings the API accepts ("London, UK") are never rejected.
+"""
+
+import bisect
+import gzip
+import json
+import sys
+import unicodedata
+from array import array
+
+from weather_client import Place
+
+DEFAULT_LIMIT = 8
+
+
+def fold(text):
+    """Search key for text: accents stripped, case-folded, spaces around commas removed."""
+    text = str(text)
+    if not text.isascii():
+        text = ''.join(ch for ch in unicodedata.normalize('NFKD', text)
+                       if not unicodedata.combining(ch))
+    return ','.join(' '.join(part.split()) for part in text.casefold().split(','))
+
+
+def city_label(name, country, state=None):
+    """Display text of a suggestion, also a valid search ("Portland, OR, US")."""
+    return ", ".join(part for part in (name, state, country) if part)
+
+
+def load_city_list(path):
+    """
+    Read an OpenWeatherMap city list (.json or .json.gz) as
+    (name, state, country, id, lat, lon) tuples.
+    """
+    opener = gzip.open if str(path).endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8') as f:
+        cities = json.load(f)
+    return [(c['name'], c.get('state') or None, c.get('country', ''), c['id'],
+             c['coord']['lat'], c['coord']['lon']) for c in cities if c.get('name')]
+
+
+class CityIndex:
+    """
+    Sorted-array prefix index of cities. `complete` marks an index built
+    from a full city list, whose misses mean a name does not exist.
+    """
+    def __init__(self, cities=(), complete=False):
+        self.complete = complete
+        rows = sorted((fold(city_label(name, country, state)), name, state, country, city_id, lat, lon)
+                      for name, state, country, city_id, lat, lon in cities)
+        self._keys = [row[0] for row in rows]
+        self._names = [row[1] for row in rows]
+        self._labels = [city_label(row[1], row[3], row[2]) for row in rows]
+        self._countries = [sys.intern(row[3]) for row in rows]
+        self._ids = array('q', [row[4] for row in rows])
+        self._lat = array('d', [row[5] for row in rows])
+        self._lon = array('d', [row[6] for row in rows])
+
+    @classmethod
+    def from_places(cls, places):
+        return cls((p.name, None, p.country, p.id, p.lat, p.lon) for p in places)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def add(self, place):
+        """Insert a Place (e.g. a city just searched) unless its id is already indexed."""
+        key = fold(city_label(place.name, place.country))
+        i = bisect.bisect_left(self._keys, key)
+        while i < len(self._keys) and self._keys[i] == key:
+            if self._ids[i] == place.id:
+                return
+            i += 1
+        self._keys.insert(i, key)
+        self._names.insert(i, place.name)
+        self._labels.insert(i, city_label(place.name, place.country))
+        self._countries.insert(i, sys.intern(place.country))
+        self._ids.insert(i, place.id)
+        self._lat.insert(i, place.lat)
+        self._lon.insert(i, place.lon)
+
+    def _place(self, i):
+        return Place(self._ids[i], self._names[i], self._countries[i], self._lat[i], self._lon[i])
+
+    def suggest(self, text, limit=DEFAULT_LIMIT):
+        """Up to `limit` (label, Place) pairs whose label starts with `text`."""
+        prefix = fold(text)
+        if not prefix:
+            return []
+        keys = self._keys
+        i = bisect.bisect_left(keys, prefix)
+        found = []
+        while i < len(keys) and len(found) < limit and keys[i].startswith(prefix):
+            found.append((self._labels[i], self._place(i)))
+            i += 1
+        return found
+
+    def find(self, text):
+        """Places whose name is exactly the city part of `text` ("London" in "London, UK")."""
+        name = fold(text).split(',')[0]
+        keys = self._keys
+        matches = []
+        i = bisect.bisect_left(keys, name)
+        if i < len(keys) and keys[i] == name:  # indexed without a country
+            matches.append(self._place(i))
+        # "london bridge" sorts between "london" and "london,gb", so search again
+        i = bisect.bisect_left(keys, name + ',')
+        while i < len(keys) and keys[i].startswith(name + ','):
+            matches.append(self._place(i))
+            i += 1
+        return matches
+
+
+class Autocomplete:
+    """
+    Suggestions from the user's searched cities, then from the full city
+    list once load_full() has run (typically in a worker thread).
+    """
+    def __init__(self, history_places=()):
+        self.history = CityIndex.from_places(history_places)
+        self.full = None
+
+    @property
+    def complete(self):
+        return self.full is not None
+
+    def load_full(self, path):
+        """Build the full index from a city list file; safe to call off the Tk thread."""
+        self.full = CityIndex(load_city_list(path), complete=True)
+        return len(self.full)
+
+    def remember(self, place):
+        """Rank a city the user just searched with the history."""
+        self.history.add(place)
+
+    def suggest(self, text, limit=DEFAULT_LIMIT):
+        """Up to `limit` (label, Place) pairs, searched cities first, no duplicates."""
+        found = self.history.suggest(text, limit)
+        full = self.full
+        if full is not None and len(found) < limit:
+            seen = {place.id for _label, place in found}
+            for label, place in full.suggest(text, limit):
+                if place.id not in seen and len(found) < limit:
+                    found.append((label, place))
+        return found
+
+    def validate(self, text):
+        """True if `text` names a known city, False if it names none (full list
+        loaded), None when that cannot be decided locally.
+        """
+        if self.history.find(text):
+            return True
+        full = self.full
+        if full is None:
+            return None
+        return bool(full.find(text))
@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+"""
+Multi-city batch refresh engine for WeatherScope Pro.
+
+Fetches many cities (or lat/lon pairs) through a bounded worker pool with:
+- a per-host concurrency limit,
+- retries with exponential backoff and jitter on transient failures,
+- rate-limit awareness (HTTP 429 + Retry-After pauses every worker, and an
+  optional client-side calls-per-second ceiling),
+- results streamed back one city at a time as they complete.
+
+It has no Tk dependency and is used by the headless batch mode
+(weather_batch_cli.py).
+"""
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlsplit
+
+import requests
+
+from weather_client import normalize_location
+from weather_decode import DECODERS
+
+DEFAULT_WORKERS = 8
+DEFAULT_PER_HOST = 4
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.5  # seconds, doubled on every retry
+MAX_BACKOFF = 30.0
+
+# HTTP statuses worth retrying; anything else (404, 401, ...) fails at once
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class BatchFetcher:
+    """
+    Fetch weather for many locations concurrently.
+
+    Uses a WeatherClient for HTTP, and optionally a ResponseCache (fresh
+    entries are served without a request) and a SingleFlight group (shared
+    with interactive searches so the same city is never fetched twice at once).
+    With a `geocoder` (weather_geocode.GeocodeIndex), known city names are
+    fetched and cached by city id, and unknown ones are learned.
+    """
+    def __init__(self, client, cache=None, flights=None, endpoints=('current', 'forecast'),
+                 max_workers=DEFAULT_WORKERS, per_host=DEFAULT_PER_HOST,
+                 retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF, max_rate=None,
+                 geocoder=None):
+        self.client = client
+        self.geocoder = geocoder
+        self.cache = cache
+        self.flights = flights
+        self.endpoints = tuple(endpoints)
+        self.max_workers = max_workers
+        self.per_host = per_host
+        self.retries = retries
+        self.backoff = backoff
+        self.max_rate = max_rate  # max requests per second across all workers, or None
+
+        self._lock = threading.Lock()
+        self._host_slots = {}  # host -> BoundedSemaphore
+        self._paused_until = 0.0  # set when the server asks us to slow down
+        self._next_slot = 0.0  # next permitted request time under max_rate
+        self.requests_sent = 0
+        self.retried = 0
+
+    # --- Rate limiting helpers ---
+
+    def _host_semaphore(self, endpoint):
+        host = urlsplit(self.client.urls[endpoint]).netloc
+        with self._lock:
+            sem = self._host_slots.get(host)
+            if sem is None:
+                sem = self._host_slots[host] = threading.BoundedSemaphore(self.per_host)
+            return sem
+
+    def _wait_for_turn(self):
+        """Block until the global pause and the calls-per-second ceiling allow a request."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                wait = self._paused_until - now
+                if wait <= 0 and self.max_rate:
+                    wait = self._next_slot - now
+                    if wait <= 0:
+                        self._next_slot = max(now, self._next_slot) + 1.0 / self.max_rate
+                if wait <= 0:
+                    self.requests_sent += 1
+                    return
+            time.sleep(wait)
+
+    def _pause(self, seconds):
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    # --- Fetching ---
+
+    def _get_with_retries(self, endpoint, location):
+        """Fetch one endpoint, retrying transient errors with backoff.
+        Returns (body_bytes, elapsed_seconds) of the successful attempt.
+        """
+        attempt = 0
+        while True:
+            self._wait_for_turn()
+            try:
+                with self._host_semaphore(endpoint):
+                    return self.client.get_raw(endpoint, location)
+            except requests.exceptions.HTTPError as e:
+                status = e.response.status_code if e.response is not None else None
+                if status not in RETRY_STATUSES or attempt >= self.retries:
+                    raise
+                delay = self._retry_after(e.response)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if attempt >= self.retries:
+                    raise
+                delay = None
+
+            if delay is None:
+                delay = min(MAX_BACKOFF, self.backoff * (2 ** attempt))
+                delay *= random.uniform(0.5, 1.5)  # jitter avoids synchronised retries
+            else:
+                self._pause(delay)  # server-imposed: every worker waits
+            attempt += 1
+            with self._lock:
+                self.retried += 1
+            time.sleep(delay)
+
+    @staticmethod
+    def _retry_after(response):
+        """Seconds requested by a Retry-After header, or None."""
+        try:
+            return min(MAX_BACKOFF, float(response.headers.get('Retry-After')))
+        except (TypeError, ValueError, AttributeError):
+            return None
+
+    def _fetch_endpoints(self, location, key, endpoints):
+        """Fetch and cache raw bodies. Returns (bodies, timings), the same
+        shape as WeatherService refreshes, so both can share a SingleFlight.
+        Like WeatherService, a text search the geocoder learns from is
+        cached under the city's canonical key instead of the text.
+        """
+        start = time.perf_counter()
+        bodies = {}
+        timings = {}
+        for endpoint in endpoints:
+            bodies[endpoint], timings[endpoint] = self._get_with_retries(endpoint, location)
+        timings['total'] = time.perf_counter() - start
+        if self.geocoder is not None and isinstance(location, str):
+            place = self.geocoder.learn_bodies(location, bodies, DECODERS)
+            if place is not None:
+                key = normalize_location(place)
+        if self.cache is not None:
+            for endpoint, body in bodies.items():
+                self.cache.put(endpoint, key, body)
+        return bodies, timings
+
+    def fetch_one(self, location):
+        """Fetch every endpoint for one location. Returns (data, from_cache)
+        where `data` maps endpoint -> decoded response (see weather_decode).
+        """
+        if self.geocoder is not None and isinstance(location, str):
+            location = self.geocoder.resolve(location) or location
+        key = normalize_location(location)
+        bodies = {}
+        if self.cache is not None:
+            for endpoint in self.endpoints:
+                cached = self.cache.get(endpoint, key)
+                if cached:
+                    bodies[endpoint] = cached[0]
+        missing = tuple(e for e in self.endpoints if e not in bodies)
+        from_cache = not missing
+        if missing:
+            if self.flights is not None:
+                fetched, _timings = self.flights.do((key, missing), self._fetch_endpoints,
+                                                    location, key, missing)
+            else:
+                fetched, _timings = self._fetch_endpoints(location, key, missing)
+            bodies.update(fetched)
+        data = {e: DECODERS[e](body) for e, body in bodies.items()}
+        return data, from_cache
+
+    def run(self, locations):
+        """
+        Fetch all `locations`, yielding results as they complete.
+
+        Each result is a dict: {'location', 'data', 'error', 'cached', 'elapsed'}.
+        Exactly one of 'data' / 'error' is set.
+        """
+        def task(location):
+            start = time.perf_counter()
+            try:
+                data, cached = self.fetch_one(location)
+                error = None
+            except Exception as e:
+                data, cached, error = None, False, e
+            return {
+                'location': location,
+                'data': data,
+                'error': error,
+                'cached': cached,
+                'elapsed': time.perf_counter() - start,
+            }
+
+        with ThreadPoolExecutor(max_workers=self.max_workers,
+                                thread_name_prefix="weather-batch") as pool:
+            futures = [pool.submit(task, loc) for loc in locations]
+            for future in as_completed(futures):
+                yield future.result()
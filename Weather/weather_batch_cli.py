@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""
+Headless batch mode for WeatherScope Pro.
+
+Fetches many cities through weather_batch.BatchFetcher and prints one line
+per city as results stream in. It imports neither tkinter nor ttkbootstrap,
+so it runs on servers and in cron jobs; the cache and geocode index are the
+dashboard's (see weather_config), so a batch run also warms its searches.
+
+    python weather_batch_cli.py London Paris "New York"
+    python weather_batch_cli.py --file sites.txt [--trace-out trace.jsonl]
+"""
+
+import argparse
+import sys
+import time
+
+from weather_batch import BatchFetcher
+from weather_client import WeatherClient
+from weather_config import (API_KEY, API_URLS, CACHE, FLIGHTS, GEOCODER, TRACER,
+                            BATCH_WORKERS, BATCH_PER_HOST, BATCH_RETRIES, BATCH_MAX_RATE)
+
+
+def run_batch(locations, trace_out=None):
+    """
+    Fetch every location through the bounded worker pool and print one line
+    per city as results stream in. Network spans are written to `trace_out`
+    (JSON lines) when given. Returns the number of failed locations.
+    """
+    client = WeatherClient(API_URLS, API_KEY,
+                           pool_size=max(BATCH_WORKERS, BATCH_PER_HOST), tracer=TRACER)
+    fetcher = BatchFetcher(client, cache=CACHE, flights=FLIGHTS,
+                           max_workers=BATCH_WORKERS, per_host=BATCH_PER_HOST,
+                           retries=BATCH_RETRIES, max_rate=BATCH_MAX_RATE, geocoder=GEOCODER)
+    start = time.perf_counter()
+    failed = 0
+    try:
+        for done, result in enumerate(fetcher.run(locations), 1):
+            location = result['location']
+            if result['error'] is not None:
+                failed += 1
+                print(f"[{done}/{len(locations)}] {location}: ERROR {result['error']}")
+                continue
+            current = result['data']['current']
+            source = "cache" if result['cached'] else f"{result['elapsed']:.2f}s"
+            print(f"[{done}/{len(locations)}] {current['name']}, {current['sys']['country']}: "
+                  f"{current['main']['temp']:.1f}°C {current['weather'][0]['description']} ({source})")
+    finally:
+        client.close()
+        if trace_out:
+            print(f"Wrote {TRACER.export_jsonl(trace_out)} timing spans to {trace_out}")
+
+    elapsed = time.perf_counter() - start
+    print(f"Fetched {len(locations) - failed}/{len(locations)} locations in {elapsed:.2f}s "
+          f"({fetcher.requests_sent} requests, {fetcher.retried} retries, cache {CACHE.stats()})")
+    return failed
+
+
+def read_locations(path):
+    """Read one city per line from a file, ignoring blanks and # comments."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith('#')]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fetch weather for many cities without a window")
+    parser.add_argument('cities', nargs='*', metavar='CITY')
+    parser.add_argument('--file', metavar='PATH', help="file with one city per line")
+    parser.add_argument('--trace-out', metavar='PATH',
+                        help="write the timing spans as JSON lines to PATH on exit")
+    args = parser.parse_args(argv)
+    cities = list(args.cities)
+    if args.file:
+        cities += read_locations(args.file)
+    if not cities:
+        parser.error("no cities given")
+    return 1 if run_batch(cities, trace_out=args.trace_out) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
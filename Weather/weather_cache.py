@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+Persistent response cache for WeatherScope Pro.
+
+Raw API response bodies are stored in a small SQLite file so they survive
+restarts; decoding happens after lookup (see weather_decode).
+Each endpoint ("current", "forecast", ...) has its own TTL, and the store is
+bounded by an entry count and a byte budget; when either cap is exceeded the
+least-recently-used entries are evicted. Expired entries can still be read
+through get_stale() to support stale-while-revalidate. Hit/miss/eviction
+counters are kept for diagnostics. The connection is shared by worker
+threads under a lock (see weather_store).
+"""
+
+import sqlite3
+import time
+
+from weather_store import SQLiteStore
+
+DEFAULT_TTL = 300  # seconds
+DEFAULT_MAX_ENTRIES = 500
+DEFAULT_MAX_BYTES = 20 * 1024 * 1024  # 20 MB
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    endpoint    TEXT    NOT NULL,
+    key         TEXT    NOT NULL,
+    value       BLOB    NOT NULL,
+    size        INTEGER NOT NULL,
+    stored_at   REAL    NOT NULL,
+    last_access REAL    NOT NULL,
+    PRIMARY KEY (endpoint, key)
+);
+CREATE INDEX IF NOT EXISTS responses_lru ON responses (last_access);
+"""
+
+
+class ResponseCache(SQLiteStore):
+    """
+    SQLite-backed TTL + LRU cache of raw response bodies (bytes).
+
+    `ttls` maps endpoint name -> TTL in seconds; endpoints not listed use
+    `default_ttl`. Use ":memory:" as `path` for a throwaway cache.
+    """
+    SCHEMA = _SCHEMA
+    LRU_TABLE = 'responses'
+    LRU_KEY = ('endpoint', 'key')
+    LRU_TABLES = ('responses',)
+
+    def __init__(self, path, ttls=None, default_ttl=DEFAULT_TTL,
+                 max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES):
+        super().__init__(path)
+        self.ttls = dict(ttls or {})
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+
+    def ttl_for(self, endpoint):
+        """TTL in seconds for an endpoint."""
+        return self.ttls.get(endpoint, self.default_ttl)
+
+    def get(self, endpoint, key):
+        """
+        Return (value, stored_at) for a fresh entry, or None on a miss.
+        Expired entries count as misses but are kept until evicted.
+        """
+        now = time.time()
+        with self._lock:
+            try:
+                conn = self._connect()
+                row = conn.execute(
+                    "SELECT value, stored_at FROM responses WHERE endpoint = ? AND key = ?",
+                    (endpoint, key)).fetchone()
+                if row is None or now - row[1] >= self.ttl_for(endpoint):
+                    self.misses += 1
+                    return None
+                conn.execute(
+                    "UPDATE responses SET last_access = ? WHERE endpoint = ? AND key = ?",
+                    (now, endpoint, key))
+                conn.commit()
+                self.hits += 1
+                return bytes(row[0]), row[1]
+            except sqlite3.Error as e:
+                print(f"Cache read failed for {endpoint}/{key}: {e}")
+                self.misses += 1
+                return None
+
+    def get_stale(self, endpoint, key, max_age=None):
+        """
+        Return (value, stored_at) for an entry regardless of its TTL, or None.
+        Entries older than `max_age` seconds (when given) are ignored.
+        Used to paint expired data while a refresh is in flight.
+        """
+        now = time.time()
+        with self._lock:
+            try:
+                row = self._connect().execute(
+                    "SELECT value, stored_at FROM responses WHERE endpoint = ? AND key = ?",
+                    (endpoint, key)).fetchone()
+                if row is None or (max_age is not None and now - row[1] >= max_age):
+                    return None
+                self.stale_hits += 1
+                return bytes(row[0]), row[1]
+            except sqlite3.Error as e:
+                print(f"Cache read failed for {endpoint}/{key}: {e}")
+                return None
+
+    def put(self, endpoint, key, body):
+        """Store a response body (bytes) and evict down to the size caps."""
+        blob = bytes(body)
+        now = time.time()
+        with self._lock:
+            try:
+                conn = self._connect()
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                    (endpoint, key, blob, len(blob), now, now))
+                self._evict(conn, self.max_entries, self.max_bytes)
+                conn.commit()
+            except sqlite3.Error as e:
+                print(f"Cache write failed for {endpoint}/{key}: {e}")
+
+    def clear(self):
+        """Remove every cached response."""
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM responses")
+            conn.commit()
+
+    def stats(self):
+        """Return counters and current size as a dict."""
+        with self._lock:
+            count, total = self._usage()
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'stale_hits': self.stale_hits,
+                'evictions': self.evictions,
+                'entries': count,
+                'bytes': total,
+            }
@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+"""
+Incrementally updated matplotlib charts for WeatherScope Pro.
+
+Each chart builds its artists (styling, lines, fill_between polygons,
+ticks) once. A refresh only moves data into them (Line2D.set_data,
+PolyCollection.set_verts). When the axis limits and tick labels are
+unchanged, the static background (axes, grid, ticks, legend) is restored
+from a saved copy and only the data artists are repainted and blitted. A
+full draw happens only when the layout has to change. Each chart keeps at
+most one mplcursors cursor, however many cities are searched.
+
+This module only needs a matplotlib Figure/Axes and its canvas, so it also
+works with the Agg canvas (see benchmarks/bench_charts.py).
+"""
+
+import math
+from abc import ABC, abstractmethod
+
+from matplotlib.collections import PolyCollection
+
+Y_STEP = 5  # y-limits snap to multiples of this, so small changes can be blitted
+
+
+def fill_vertices(x, upper, lower):
+    """Closed polygon between two curves, as fill_between() would build it."""
+    if not x:
+        return [(0, 0)]
+    return [(xi, yi) for xi, yi in zip(x, upper)] + \
+           [(xi, yi) for xi, yi in zip(reversed(x), reversed(lower))]
+
+
+def padded_limits(values, step=Y_STEP):
+    """y-limits covering `values`, with headroom, snapped outwards to `step`."""
+    lo, hi = min(values), max(values)
+    lo = math.floor((lo - 1) / step) * step
+    hi = math.ceil((hi + 1) / step) * step
+    return float(lo), float(hi)
+
+
+class LiveChart(ABC):
+    """
+    One axes whose data artists are reused across refreshes.
+
+    Subclasses create their artists in _build() and register them with
+    _track(); update() callers then change data and call _refresh().
+    Counters `full_draws` and `blits` show how often each path ran.
+    """
+    def __init__(self, fig, ax, canvas, bg_color, fg_color):
+        self.fig = fig
+        self.ax = ax
+        self.canvas = canvas
+        self._animated = []  # data artists, drawn on top of the saved background
+        self._background = None
+        self._cursor = None
+        self._ticks = None  # tick labels currently shown
+        self.full_draws = 0
+        self.blits = 0
+
+        self._style(bg_color, fg_color)
+        self._build()
+        # Every full draw (first paint, resize, layout change) refreshes the background
+        self._draw_cid = canvas.mpl_connect('draw_event', self._on_draw)
+
+    def _style(self, bg_color, fg_color):
+        """Apply the dashboard chart styling (done once, not per refresh)."""
+        fig, ax = self.fig, self.ax
+        fig.patch.set_facecolor(bg_color)
+        ax.set_facecolor(bg_color)
+        ax.spines['top'].set_visible(False)
+        ax.spines['right'].set_visible(False)
+        ax.spines['bottom'].set_color(fg_color)
+        ax.spines['left'].set_color(fg_color)
+        ax.tick_params(axis='x', colors=fg_color)
+        ax.tick_params(axis='y', colors=fg_color)
+        ax.yaxis.label.set_color(fg_color)
+        ax.title.set_color(fg_color)
+        self.fg_color = fg_color
+
+    @abstractmethod
+    def _build(self):
+        """Create the chart's data artists and register them with _track()."""
+
+    def _add_fill(self, color):
+        """An empty filled polygon (what fill_between draws), updated via set_verts."""
+        fill = PolyCollection([], color=color, alpha=0.35)
+        self.ax.add_collection(fill, autolim=False)
+        return self._track(fill)
+
+    def _track(self, artist):
+        artist.set_animated(True)  # kept out of the background; drawn by _paint_data
+        self._animated.append(artist)
+        return artist
+
+    def _on_draw(self, event):
+        self._background = self.canvas.copy_from_bbox(self.fig.bbox)
+        self._paint_data()
+
+    def _paint_data(self):
+        for artist in self._animated:
+            self.ax.draw_artist(artist)
+
+    def _set_ticks(self, positions, labels, **kwargs):
+        """Update tick labels; returns True when they changed (needs a full draw)."""
+        ticks = (tuple(positions), tuple(labels))
+        if ticks == self._ticks:
+            return False
+        self._ticks = ticks
+        self.ax.set_xticks(positions)
+        self.ax.set_xticklabels(labels, **kwargs)
+        return True
+
+    def _set_limits(self, xlim, ylim):
+        """Update axis limits; returns True when they changed (needs a full draw)."""
+        changed = False
+        if tuple(self.ax.get_xlim()) != tuple(xlim):
+            self.ax.set_xlim(*xlim)
+            changed = True
+        if tuple(self.ax.get_ylim()) != tuple(ylim):
+            self.ax.set_ylim(*ylim)
+            changed = True
+        return changed
+
+    def _refresh(self, relayout):
+        """Show the new data: blit over the saved background when possible."""
+        if relayout or self._background is None:
+            if relayout:
+                self.fig.tight_layout()
+            self.canvas.draw()  # fires draw_event -> new background + data
+            self.full_draws += 1
+            return
+        self.canvas.restore_region(self._background)
+        self._paint_data()
+        self.canvas.blit(self.fig.bbox)
+        self.blits += 1
+
+    def attach_cursor(self, make_cursor, **kwargs):
+        """Create the hover cursor once (e.g. make_cursor=mplcursors.cursor).
+        The artists it follows are reused, so it stays valid across refreshes.
+        """
+        if self._cursor is None:
+            lines = [a for a in self._animated if hasattr(a, 'get_xdata')]
+            self._cursor = make_cursor(lines, **kwargs)
+        return self._cursor
+
+    def close(self):
+        """Disconnect from the canvas."""
+        self.canvas.mpl_disconnect(self._draw_cid)
+
+
+class HourlyChart(LiveChart):
+    """The 'Next 24 Hours' temperature line with a filled area down to 0 °C."""
+    def __init__(self, fig, ax, canvas, bg_color, fg_color, line_color, fill_color):
+        self.line_color = line_color
+        self.fill_color = fill_color
+        super().__init__(fig, ax, canvas, bg_color, fg_color)
+
+    def _build(self):
+        ax = self.ax
+        self.area = self._add_fill(self.fill_color)
+        self.line = self._track(ax.plot([], [], marker='o', color=self.line_color,
+                                        linewidth=3, markersize=5)[0])
+        ax.set_ylabel('°C')
+        ax.set_title("Next 24 Hours")
+        ax.grid(alpha=0.2)
+
+    def update(self, labels, temps):
+        """Show one temperature per hourly label."""
+        if not temps:
+            return
+        x = list(range(len(temps)))
+        self.line.set_data(x, temps)
+        self.area.set_verts([fill_vertices(x, temps, [0] * len(x))])
+
+        margin = max(len(x) - 1, 1) * 0.05
+        relayout = self._set_ticks(x[::2], [labels[i] for i in x[::2]], rotation=45, ha='right')
+        rescaled = self._set_limits((-margin, len(x) - 1 + margin), padded_limits(list(temps) + [0]))
+        self._refresh(relayout or rescaled)
+
+
+class ForecastChart(LiveChart):
+    """The 5-day daily high/low lines with the band between them filled."""
+    def __init__(self, fig, ax, canvas, bg_color, fg_color, high_color, low_color, fill_color):
+        self.high_color = high_color
+        self.low_color = low_color
+        self.fill_color = fill_color
+        super().__init__(fig, ax, canvas, bg_color, fg_color)
+
+    def _build(self):
+        ax = self.ax
+        self.band = self._add_fill(self.fill_color)
+        self.highs = self._track(ax.plot([], [], marker='o', color=self.high_color, label='High',
+                                         linewidth=3, markersize=6)[0])
+        self.lows = self._track(ax.plot([], [], marker='o', color=self.low_color, label='Low',
+                                        linewidth=3, markersize=6)[0])
+        ax.set_title('5-Day Forecast')
+        ax.set_ylabel('Temperature (°C)')
+        ax.grid(alpha=0.2)
+        legend = ax.legend(frameon=False)
+        for text in legend.get_texts():
+            text.set_color(self.fg_color)
+
+    def update(self, days, highs, lows):
+        """Show one high/low pair per day name."""
+        if not days:
+            return
+        x = list(range(len(days)))
+        self.highs.set_data(x, highs)
+        self.lows.set_data(x, lows)
+        self.band.set_verts([fill_vertices(x, highs, lows)])
+
+        margin = max(len(x) - 1, 1) * 0.05
+        relayout = self._set_ticks(x, days, rotation=10)
+        rescaled = self._set_limits((-margin, len(x) - 1 + margin), padded_limits(list(highs) + list(lows)))
+        self._refresh(relayout or rescaled)
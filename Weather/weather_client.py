@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+"""
+HTTP client layer for WeatherScope Pro.
+
+Holds a single long-lived keep-alive requests.Session so repeated searches
+reuse the same TCP/TLS connections, and sends the "current" and "forecast"
+calls concurrently instead of one after the other. Every fetch reports
+per-request timings so search latency can be inspected.
+
+The URL templates are injectable, which lets the client be pointed at a
+local stub HTTP server instead of api.openweathermap.org. A location is a
+city name, a (lat, lon) pair or a Place (a geocoded city, see
+weather_geocode); templates use `{query}` ("q=...", "id=..." or
+"lat=...&lon=..."), or `{lat}` / `{lon}` for coordinate-only endpoints.
+
+Responses that carry an ETag are remembered (bounded LRU), and the next
+request for the same URL is sent with If-None-Match; a 304 Not Modified
+answer reuses the remembered body, so an unchanged response costs no
+download.
+
+SingleFlight collapses concurrent lookups of the same place into one
+in-flight fetch whose result is shared by every caller.
+"""
+
+import json
+import re
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from concurrent.futures import Future, ThreadPoolExecutor
+from urllib.parse import quote
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from weather_trace import NULL_TRACER
+
+DEFAULT_TIMEOUT = 10  # seconds, per request
+DEFAULT_POOL_SIZE = 8
+DEFAULT_VALIDATORS = 64  # URLs whose ETag + body are remembered
+
+# A geocoded city: OpenWeatherMap city id (or None), display name, country code, coordinates
+Place = namedtuple('Place', 'id name country lat lon')
+
+
+def location_params(location):
+    """URL template fields for a city name, a (lat, lon) pair or a Place."""
+    if isinstance(location, Place):
+        query = f"id={location.id}" if location.id is not None else f"lat={location.lat}&lon={location.lon}"
+        return {'query': query, 'lat': location.lat, 'lon': location.lon, 'city': location.name}
+    if isinstance(location, (tuple, list)):
+        lat, lon = location
+        return {'query': f"lat={lat}&lon={lon}", 'lat': lat, 'lon': lon, 'city': f"{lat},{lon}"}
+    return {'query': "q=" + quote(str(location).strip(), safe=","), 'lat': '', 'lon': '',
+            'city': location}
+
+
+class WeatherClient:
+    """
+    Fetches OpenWeatherMap endpoints over a shared, pooled Session.
+
+    `urls` maps an endpoint name (e.g. "current", "forecast") to a URL
+    template with a `{key}` placeholder and the fields of location_params():
+    `{query}` ("q=London", "id=2643743" or "lat=..&lon=.."), `{lat}` and `{lon}`.
+    """
+    def __init__(self, urls, api_key, timeout=DEFAULT_TIMEOUT, pool_size=DEFAULT_POOL_SIZE,
+                 max_validators=DEFAULT_VALIDATORS, tracer=None):
+        self.urls = dict(urls)
+        self.tracer = tracer or NULL_TRACER  # records a "network" span per request
+        self.api_key = api_key
+        self.timeout = timeout
+        self.max_validators = max_validators
+        self._validators = OrderedDict()  # url -> (etag, body), LRU
+        self.not_modified = 0
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        # Worker threads used to issue the endpoint calls in parallel
+        self._executor = ThreadPoolExecutor(max_workers=pool_size,
+                                            thread_name_prefix="weather-http")
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def get_raw(self, endpoint, location):
+        """Fetch a single endpoint. Returns (body_bytes, elapsed_seconds).
+        Raises requests exceptions (HTTPError, ConnectionError, ...) unchanged.
+        """
+        url = self.urls[endpoint].format(key=self.api_key, **location_params(location))
+        with self._lock:
+            known = self._validators.get(url)
+        headers = {'If-None-Match': known[0]} if known else None
+        shown_url = url.replace(self.api_key, '***') if self.api_key else url
+        start = time.perf_counter()
+        try:
+            response = self.session.get(url, timeout=self.timeout, headers=headers)
+        except requests.exceptions.RequestException as e:
+            self.tracer.record('network', time.perf_counter() - start, endpoint=endpoint,
+                               url=shown_url, error=type(e).__name__)
+            raise
+        elapsed = time.perf_counter() - start
+        self.tracer.record('network', elapsed, endpoint=endpoint, url=shown_url,
+                           status=response.status_code, bytes=len(response.content))
+        if response.status_code == 304 and known:
+            with self._lock:
+                self.not_modified += 1
+                if url in self._validators:
+                    self._validators.move_to_end(url)
+            return known[1], elapsed
+        response.raise_for_status()  # Raise exception for 4xx/5xx errors
+        etag = response.headers.get('ETag')
+        if etag and self.max_validators:
+            with self._lock:
+                self._validators[url] = (etag, response.content)
+                self._validators.move_to_end(url)
+                while len(self._validators) > self.max_validators:
+                    self._validators.popitem(last=False)
+        return response.content, elapsed
+
+    def get_json(self, endpoint, location):
+        """Fetch a single endpoint. Returns (json_data, elapsed_seconds)."""
+        body, elapsed = self.get_raw(endpoint, location)
+        return json.loads(body), elapsed
+
+    def fetch(self, location, endpoints=None, raw=False):
+        """
+        Fetch several endpoints for `location` at the same time.
+
+        Returns (data, timings) where `data` maps endpoint -> decoded JSON (or
+        the raw body bytes when `raw` is true) and `timings` maps endpoint ->
+        seconds, plus a 'total' wall-clock entry.
+        The first failing request's exception is re-raised.
+        """
+        if endpoints is None:
+            endpoints = list(self.urls)
+
+        start = time.perf_counter()
+        get = self.get_raw if raw else self.get_json
+        futures = {name: self._executor.submit(get, name, location)
+                   for name in endpoints}
+
+        data = {}
+        timings = {}
+        error = None
+        for name, future in futures.items():
+            try:
+                data[name], timings[name] = future.result()
+            except Exception as e:
+                if error is None:
+                    error = e
+        if error is not None:
+            raise error
+
+        timings['total'] = time.perf_counter() - start
+        return data, timings
+
+    def close(self):
+        """Release pooled connections and worker threads."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._executor.shutdown(wait=False)
+        self.session.close()
+
+
+def normalize_location(location):
+    """
+    Return a canonical lookup key for a city name, a (lat, lon) pair or a Place.
+    "  London ,GB " and "london, gb" map to the same key; coordinates are
+    rounded to 4 decimals (~11 m); a Place is keyed by its city id ("id:2643743").
+    """
+    if isinstance(location, Place):
+        if location.id is not None:
+            return f"id:{location.id}"
+        return f"{float(location.lat):.4f},{float(location.lon):.4f}"
+    if isinstance(location, (tuple, list)):
+        lat, lon = location
+        return f"{float(lat):.4f},{float(lon):.4f}"
+    key = re.sub(r"\s+", " ", str(location).strip().lower())
+    return re.sub(r"\s*,\s*", ",", key)
+
+
+class SingleFlight:
+    """
+    Request coalescing: while a call for a key is running, further calls for
+    the same key wait for it and receive the same result (or exception)
+    instead of starting their own.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._inflight = {}  # key -> Future
+        self.calls = 0
+        self.coalesced = 0
+
+    def do(self, key, fn, *args, **kwargs):
+        """Run fn(*args, **kwargs) once per concurrent `key` and return its result."""
+        with self._lock:
+            self.calls += 1
+            future = self._inflight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                future = Future()
+                self._inflight[key] = future
+                leader = True
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def stats(self):
+        """Return call/coalesced counters and the number of keys in flight."""
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'coalesced': self.coalesced,
+                'in_flight': len(self._inflight),
+            }
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""
+Settings shared by the WeatherScope Pro dashboard (modern_weather.py) and
+the headless batch mode (weather_batch_cli.py).
+
+Nothing here imports tkinter, so batch runs work on machines without a
+display or ttkbootstrap. The cache, geocode index, single-flight group and
+tracer are created once at import and shared by everything that imports
+this module.
+"""
+
+from weather_cache import ResponseCache
+from weather_client import SingleFlight
+from weather_geocode import GeocodeIndex
+from weather_trace import Tracer
+
+# ! IMPORTANT: Replace "YOUR_API_KEY_HERE" with your actual OpenWeatherMap API key
+# You can get a free one from https://openweathermap.org/api
+API_KEY = "6f0f9af0779da1b1566b0ef931f2f61b"
+
+# Check if the user has replaced the placeholder API key
+if API_KEY == "YOUR_API_KEY_HERE":
+    print("ERROR: Please replace 'YOUR_API_KEY_HERE' with your OpenWeatherMap API key.")
+    # We'll allow the app to run so the user can see the UI,
+    # but API calls will fail until they add their key.
+    
+# {query} is "q=<city>" for new searches and "id=<city id>" once the city is in the geocode index
+CURRENT_URL = "http://api.openweathermap.org/data/2.5/weather?{query}&appid={key}&units=metric"
+FORECAST_URL = "http://api.openweathermap.org/data/2.5/forecast?{query}&appid={key}&units=metric"
+# One Call 3.0 answers current + forecast in one request, by coordinates. It needs a
+# separate "One Call by Call" subscription, so it is off by default.
+USE_ONECALL = False
+ONECALL_URL = ("https://api.openweathermap.org/data/3.0/onecall?lat={lat}&lon={lon}"
+               "&exclude=minutely,alerts&appid={key}&units=metric")
+API_URLS = {'current': CURRENT_URL, 'forecast': FORECAST_URL, 'onecall': ONECALL_URL}
+
+# Persistent on-disk cache of API responses, keyed by (endpoint, city)
+CACHE_FILE = "weather_cache.sqlite3"
+CACHE_TTL = 300  # seconds (current conditions)
+CACHE_TTLS = {
+    'current': CACHE_TTL,
+    'forecast': 1800,  # the 3-hourly forecast changes far less often
+    'onecall': CACHE_TTL,  # carries current conditions too
+}
+# Expired entries younger than this are painted at once while a refresh runs
+CACHE_MAX_STALE = 24 * 3600  # seconds
+CACHE_MAX_ENTRIES = 500
+CACHE_MAX_BYTES = 20 * 1024 * 1024
+CACHE = ResponseCache(CACHE_FILE, ttls=CACHE_TTLS, default_ttl=CACHE_TTL,
+                      max_entries=CACHE_MAX_ENTRIES, max_bytes=CACHE_MAX_BYTES)
+
+# Search text -> canonical city (id, coordinates), learned from responses and kept on disk
+GEOCODE_FILE = "geocode_index.sqlite3"
+GEOCODER = GeocodeIndex(GEOCODE_FILE)
+
+# Shared single-flight group: concurrent lookups of the same city share one fetch
+FLIGHTS = SingleFlight()
+
+# Batch refresh settings (weather_batch_cli.py)
+BATCH_WORKERS = 8
+BATCH_PER_HOST = 4  # concurrent connections per API host
+BATCH_RETRIES = 3
+BATCH_MAX_RATE = None  # requests/second ceiling, e.g. 1.0 for the free plan (60/min)
+
+# Timing spans (network, decode, process, render, draw, search-to-paint) kept in a
+# ring buffer; the dashboard shows them (Ctrl+D), and --trace-out writes them as JSON lines on exit
+TRACE_ENABLED = True
+TRACE_CAPACITY = 4096  # most recent spans kept
+TRACER = Tracer(capacity=TRACE_CAPACITY, enabled=TRACE_ENABLED)
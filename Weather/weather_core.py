@@ -0,0 +1,601 @@
+# -*- coding: utf-8 -*-
+"""
+WeatherScope Pro - headless core.
+
+GUI-free forecast computations and the cached fetch pipeline used by the
+dashboard (modern_weather.py), the batch mode, workers and benchmarks.
+Only the standard library is imported here, so the module loads in a few
+milliseconds and runs without a display. HTTP, caching and request
+coalescing are injected (see WeatherService), not imported.
+"""
+
+import time
+from array import array
+from hashlib import blake2b
+from datetime import date, datetime, timedelta
+
+# Naive datetime for epoch 0; local timestamps are converted relative to it
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_DATE = date(1970, 1, 1)
+
+# Weather Icons with Unicode characters
+WEATHER_ICONS = {
+    "Clear": "☀️",
+    "Clouds": "☁️",
+    "Rain": "🌧️",
+    "Drizzle": "🌦️",
+    "Thunderstorm": "⛈️",
+    "Snow": "❄️",
+    "Mist": "🌫️",
+    "Smoke": "🌫️",
+    "Haze": "🌁",
+    "Dust": "🌪️",
+    "Fog": "🌁",
+    "Sand": "🏜️",
+    "Ash": "🌋",
+    "Squall": "🌬️",
+    "Tornado": "🌪️",
+    "Default": "❓"
+}
+
+
+class ForecastTable:
+    """
+    Columnar form of a 3-hourly forecast response, parsed once per fetch.
+
+    Each field is a typed array.array aligned by row and sorted by time:
+    dt (UTC epoch seconds), local_day (days since the epoch at the city's
+    local time), temp, humidity, wind, pop, and cond / desc, which are small
+    integer codes into the per-table `conditions` / `descriptions` lists.
+    `city` keeps the few response-level fields the app uses (name, id,
+    coord, country, timezone).
+
+    Rows are added with append() and the table is completed by finish(),
+    so decoders can fill it while parsing without building item dicts.
+    """
+    __slots__ = ('dt', 'local_day', 'temp', 'humidity', 'wind', 'pop', 'cond', 'desc',
+                 'conditions', 'descriptions', 'tz_offset', 'city',
+                 '_cond_codes', '_desc_codes')
+
+    def __init__(self, tz_offset=0):
+        self.tz_offset = tz_offset
+        self.city = {}
+        self.dt = array('q')
+        self.local_day = array('l')
+        self.temp = array('d')
+        self.humidity = array('B')
+        self.wind = array('f')
+        self.pop = array('f')
+        self.cond = array('B')
+        self.desc = array('H')
+        self.conditions = []
+        self.descriptions = []
+        self._cond_codes = {}
+        self._desc_codes = {}
+
+    @classmethod
+    def from_json(cls, forecast_raw):
+        """Build a table from a decoded /forecast response."""
+        city = forecast_raw.get('city', {})
+        table = cls.from_list(forecast_raw.get('list', []), city.get('timezone', 0))
+        table.city = compact_city(city)
+        return table
+
+    @classmethod
+    def from_list(cls, forecast_list, tz_offset=0):
+        """Build a table from the response's 'list' of 3-hour items."""
+        table = cls(tz_offset)
+        for item in forecast_list:
+            weather = item['weather'][0] if item.get('weather') else {}
+            table.append(item['dt'], item['main']['temp'], item['main'].get('humidity', 0),
+                         item.get('wind', {}).get('speed', 0), item.get('pop', 0),
+                         weather.get('main'), weather.get('description', ''))
+        return table.finish(tz_offset)
+
+    def append(self, dt, temp, humidity, wind, pop, main, desc):
+        """Add one 3-hour row; call finish() once all rows are in."""
+        code = self._cond_codes.get(main)
+        if code is None:
+            code = self._cond_codes[main] = len(self.conditions)
+            self.conditions.append(main)
+        self.cond.append(code)
+        code = self._desc_codes.get(desc)
+        if code is None:
+            code = self._desc_codes[desc] = len(self.descriptions)
+            self.descriptions.append(desc)
+        self.desc.append(code)
+        self.dt.append(dt)
+        self.temp.append(temp)
+        self.humidity.append(int(humidity))
+        self.wind.append(wind)
+        self.pop.append(pop)
+
+    def finish(self, tz_offset=None):
+        """Sort rows by time and compute local days. Returns the table."""
+        if tz_offset is not None:
+            self.tz_offset = tz_offset
+        dts = self.dt
+        if any(dts[i] > dts[i + 1] for i in range(len(dts) - 1)):
+            order = sorted(range(len(dts)), key=dts.__getitem__)
+            for name in ('dt', 'temp', 'humidity', 'wind', 'pop', 'cond', 'desc'):
+                column = getattr(self, name)
+                setattr(self, name, array(column.typecode, [column[i] for i in order]))
+        tz = self.tz_offset
+        self.local_day = array('l', [(dt + tz) // 86400 for dt in self.dt])
+        return self
+
+    def __len__(self):
+        return len(self.dt)
+
+    def condition(self, i):
+        """Condition name ('Rain', 'Clear', ...) of row i."""
+        return self.conditions[self.cond[i]]
+
+    def description(self, i):
+        """Condition description ('light rain', ...) of row i."""
+        return self.descriptions[self.desc[i]]
+
+    def local_datetime(self, i):
+        """Naive datetime of row i at the city's local time."""
+        return _EPOCH + timedelta(seconds=self.dt[i] + self.tz_offset)
+
+    def day_date(self, day):
+        """Calendar date for a local_day value."""
+        return _EPOCH_DATE + timedelta(days=day)
+
+    def __eq__(self, other):
+        if not isinstance(other, ForecastTable):
+            return NotImplemented
+        return (self.tz_offset == other.tz_offset and self.dt == other.dt
+                and self.temp == other.temp and self.humidity == other.humidity
+                and self.wind == other.wind and self.pop == other.pop
+                and [self.conditions[c] for c in self.cond] == [other.conditions[c] for c in other.cond]
+                and [self.descriptions[c] for c in self.desc] == [other.descriptions[c] for c in other.desc]
+                and self.city == other.city)
+
+    __hash__ = None
+
+    def fingerprint(self):
+        """Short digest of the table's content; equal tables give equal digests."""
+        digest = blake2b(digest_size=8)
+        for name in ('dt', 'temp', 'humidity', 'wind', 'pop'):
+            digest.update(getattr(self, name).tobytes())
+        digest.update(repr(([self.conditions[c] for c in self.cond],
+                            [self.descriptions[c] for c in self.desc],
+                            self.tz_offset, self.city)).encode('utf-8'))
+        return digest.hexdigest()
+
+
+# Response-level forecast fields kept on ForecastTable.city
+CITY_FIELDS = ('id', 'name', 'coord', 'country', 'timezone')
+
+
+def compact_city(city):
+    """The subset of a /forecast 'city' object the app uses."""
+    return {k: city[k] for k in CITY_FIELDS if k in city}
+
+
+def as_forecast_table(forecast, tz_offset=0):
+    """Accept a ForecastTable, a /forecast response dict, or a raw 'list' of items."""
+    if isinstance(forecast, ForecastTable):
+        return forecast
+    if isinstance(forecast, dict):
+        return ForecastTable.from_json(forecast)
+    return ForecastTable.from_list(forecast, tz_offset)
+
+
+# Numeric columns the interpolation engine can resample
+INTERP_FIELDS = ('temp', 'humidity', 'wind', 'pop')
+
+
+def _local_hour_start(tz_offset=0):
+    """Current hour at the target location, as naive-local epoch seconds."""
+    now_local = int(time.time()) + tz_offset
+    return now_local - now_local % 3600
+
+
+def _forecast_series(table, fields=INTERP_FIELDS):
+    """Local timestamps (truncated to the hour) plus per-field value columns."""
+    tz_offset = table.tz_offset
+    timestamps = [(dt + tz_offset) - (dt + tz_offset) % 3600 for dt in table.dt]
+    columns = {name: getattr(table, name) for name in fields}
+    columns['main'] = [table.conditions[c] for c in table.cond]
+    return timestamps, columns
+
+
+def resample_forecast(forecast, tz_offset=0, start=None, step=3600, count=24,
+                      fields=INTERP_FIELDS):
+    """
+    Resample the 3-hourly forecast onto a regular local-time grid.
+
+    `start` is naive-local epoch seconds (default: the current local hour);
+    `step` and `count` choose the resolution and horizon, e.g. step=900,
+    count=480 for 15-minute steps over 5 days. Returns (grid, columns) where
+    columns maps each numeric field plus 'main' (condition) to its values.
+    """
+    from weather_interp import interpolate, make_grid
+
+    table = as_forecast_table(forecast, tz_offset)
+    if start is None:
+        start = _local_hour_start(table.tz_offset)
+    timestamps, columns = _forecast_series(table, fields)
+    grid = make_grid(start, step, count)
+    resampled = interpolate(timestamps, {f: columns[f] for f in fields}, grid,
+                            {'main': columns['main']})
+    return grid, resampled
+
+
+def resample_many(forecasts, step=3600, count=24, fields=INTERP_FIELDS):
+    """
+    Batched resample_forecast() for many cities in one vectorised call.
+    `forecasts` is a list of ForecastTables (or (forecast_list, tz_offset)
+    pairs); each city's grid starts at its own current local hour.
+    Returns a list of (grid, columns).
+    """
+    from weather_interp import interpolate_batch, make_grid
+
+    series = []
+    for forecast in forecasts:
+        if isinstance(forecast, tuple):
+            table = as_forecast_table(*forecast)
+        else:
+            table = as_forecast_table(forecast)
+        timestamps, columns = _forecast_series(table, fields)
+        series.append((timestamps, columns, _local_hour_start(table.tz_offset)))
+    grid = make_grid(0, step, count)
+    results = interpolate_batch(series, grid, fields, ('main',))
+    return [([offset + g for g in grid], columns)
+            for (_ts, _cols, offset), columns in zip(series, results)]
+
+
+def get_24h_from_forecast(forecast, tz_offset=0):
+    """Interpolate the 3-hourly forecast into 24 hourly points starting from current hour
+    at the target location's local time (tz_offset in seconds).
+    Returns list of dicts: {'dt': datetime, 'label': 'HH:00', 'temp': float, 'main': str}
+    """
+    try:
+        table = as_forecast_table(forecast, tz_offset)
+        if not len(table):
+            return []
+        grid, columns = resample_forecast(table, fields=('temp',))
+        result = []
+        for t, temp, main in zip(grid, columns['temp'], columns['main']):
+            dt = _EPOCH + timedelta(seconds=float(t))
+            main = str(main) if main is not None else None
+            result.append({'dt': dt, 'label': dt.strftime('%H:%M'), 'temp': float(temp), 'main': main})
+        return result
+    except Exception:
+        return []
+
+
+def aggregate_daily(forecast, tz_offset=0):
+    """
+    Single pass over the forecast rows computing, per local day: min, max and
+    mean temperature, the dominant condition, total probability of
+    precipitation, and the slice of rows belonging to that day.
+
+    Rows are sorted by time, so each day is one contiguous `rows` range.
+    Returns a list of dicts ordered by date.
+    """
+    table = as_forecast_table(forecast, tz_offset)
+    days = []
+    n = len(table)
+    start = 0
+    while start < n:
+        day = table.local_day[start]
+        t_min = t_max = t_sum = table.temp[start]
+        pop_total = table.pop[start]
+        counts = {table.cond[start]: 1}
+        stop = start + 1
+        while stop < n and table.local_day[stop] == day:
+            temp = table.temp[stop]
+            if temp < t_min:
+                t_min = temp
+            elif temp > t_max:
+                t_max = temp
+            t_sum += temp
+            pop_total += table.pop[stop]
+            code = table.cond[stop]
+            counts[code] = counts.get(code, 0) + 1
+            stop += 1
+
+        # Most frequent condition; ties go to the one seen first in the day
+        dominant = table.conditions[max(counts, key=counts.get)] or "Default"
+        day_date = table.day_date(day)
+        days.append({
+            'day': day,
+            'day_name': day_date.strftime('%A'), # e.g., "Tuesday"
+            'date_iso': day_date.isoformat(),
+            'temp_max': t_max,
+            'temp_min': t_min,
+            'temp_mean': t_sum / (stop - start),
+            'icon_main': dominant,
+            'icon_char': WEATHER_ICONS.get(dominant, WEATHER_ICONS["Default"]),
+            'pop_total': pop_total,
+            'rows': range(start, stop),
+        })
+        start = stop
+    return days
+
+
+def build_day_index(daily):
+    """Map ISO date -> range of forecast rows, for O(1) per-day lookups."""
+    return {d['date_iso']: d['rows'] for d in daily}
+
+
+def process_forecast_data(forecast, tz_offset=0, daily=None):
+    """
+    Process the 3-hour forecast into a 5-day summary (today excluded).
+    Pass the precomputed `daily` aggregation to avoid another pass.
+    """
+    table = as_forecast_table(forecast, tz_offset)
+    if daily is None:
+        daily = aggregate_daily(table)
+    # Use local date at target timezone
+    today = (int(time.time()) + table.tz_offset) // 86400
+    return [d for d in daily if d['day'] != today][:5]
+
+
+def group_hourly_by_day(forecast, tz_offset=0):
+    """Group the 3-hour forecast rows by ISO date string -> range of row indices.
+    Returns a dict like {'2025-10-30': range(3, 11), ...}
+    """
+    return build_day_index(aggregate_daily(forecast, tz_offset))
+
+
+def generate_suggestions(current, forecast):
+    """Generate a short list of avoidance/safety suggestions based on current conditions
+    and the upcoming forecast. Returns a single concatenated string.
+    """
+    suggestions = []
+
+    try:
+        main = current['weather'][0]['main']
+        desc = current['weather'][0]['description']
+        wind = current['wind']['speed']
+        temp = current['main']['temp']
+        uvi = None
+        # try to read uvi if present in current or forecast (OneCall provides uvi)
+        if 'uvi' in current:
+            uvi = current['uvi']
+    except Exception:
+        main = None; desc = None; wind = 0; temp = None; uvi = None
+
+    # Basic rules
+    if main and main in ('Rain', 'Thunderstorm', 'Drizzle'):
+        suggestions.append('Rain expected — avoid outdoor events; carry an umbrella or seek indoor alternatives.')
+    if wind and wind >= 10:
+        suggestions.append('High winds — avoid boating and secure loose outdoor objects.')
+    if temp is not None and temp >= 33:
+        suggestions.append('Heat alert — avoid intense outdoor exercise during peak hours; stay hydrated and seek shade.')
+    if temp is not None and temp <= 0:
+        suggestions.append('Freezing temperatures — dress warmly and avoid prolonged exposure.')
+    if uvi is not None and uvi >= 7:
+        suggestions.append('High UV index — wear sunscreen and protective clothing.')
+
+    # Look for days with heavy rain probability in forecast (simple heuristic)
+    try:
+        table = as_forecast_table(forecast)
+        heavy_rain_days = set()
+        for i, pop in enumerate(table.pop):
+            if pop >= 0.6:
+                heavy_rain_days.add(table.local_day[i])
+        if heavy_rain_days:
+            suggestions.append('Some upcoming days have high rain probability — consider indoor plans for those days.')
+    except Exception:
+        pass
+
+    if not suggestions:
+        suggestions.append('No major hazards detected. Enjoy your day — check back for updates.')
+
+    return ' \n'.join(suggestions)
+
+
+def fingerprint(*parts):
+    """Short digest of plain values (dicts, lists, numbers, strings)."""
+    return blake2b(repr(parts).encode('utf-8'), digest_size=8).hexdigest()
+
+
+def _current_view(current):
+    """The /weather fields the Current tab displays (its render inputs)."""
+    try:
+        return (current['name'], current['sys']['country'], current['main']['temp'],
+                current['main']['feels_like'], current['main']['humidity'],
+                current['main']['pressure'], current['wind']['speed'],
+                current['weather'][0]['main'], current['weather'][0]['description'],
+                current['sys']['sunrise'], current['sys']['sunset'])
+    except (KeyError, IndexError, TypeError):
+        return current
+
+
+def section_fingerprints(current, forecast, suggestions):
+    """
+    Content fingerprints of the inputs of each UI section:
+    "current" (conditions card), "suggestions", "map" (coordinates and
+    marker name) and "forecast" (hourly chart, 5-day cards and chart).
+    A section whose fingerprint matches what is on screen need not re-render.
+    """
+    coord = current.get('coord') if isinstance(current, dict) else None
+    return {
+        "current": fingerprint(_current_view(current)),
+        "suggestions": fingerprint(suggestions),
+        "map": fingerprint(coord, current.get('name') if coord else None),
+        "forecast": forecast.fingerprint(),
+    }
+
+
+def data_version(package):
+    """
+    Upstream version of a data package: the observation time (`dt`) of the
+    current conditions and the forecast fingerprint. Two packages with the
+    same version show the same data.
+    """
+    current = package.get("current")
+    dt = current.get("dt") if isinstance(current, dict) else None
+    return dt, package["fingerprints"]["forecast"]
+
+
+def build_data_package(current, forecast, last_updated, timings=None, stale=False):
+    """Combine the current + forecast responses into the package the UI renders.
+    The forecast (a ForecastTable, or a decoded /forecast response) is stored
+    under "forecast" and aggregated per local day under "daily" / "day_index".
+    "fingerprints" holds per-section content digests (see section_fingerprints).
+    """
+    forecast = as_forecast_table(forecast)
+    daily = aggregate_daily(forecast)
+    suggestions = generate_suggestions(current, forecast)
+    package = {
+        "current": current,
+        "forecast": forecast,
+        "daily": daily,
+        "day_index": build_day_index(daily),
+        "suggestions": suggestions,
+        "fingerprints": section_fingerprints(current, forecast, suggestions),
+        "last_updated": last_updated.strftime("%I:%M %p"),
+        "timings": timings
+    }
+    if stale:
+        package["stale"] = True
+    return package
+
+
+class StaleRefreshError(Exception):
+    """
+    Raised by WeatherService.load() when the background refresh failed after
+    stale data was already delivered through `on_stale`. `cause` holds the
+    original exception.
+    """
+    def __init__(self, cause):
+        super().__init__(str(cause))
+        self.cause = cause
+
+
+class WeatherService:
+    """
+    Cached, coalesced weather lookups.
+
+    `client` is a weather_client.WeatherClient (or anything with a compatible
+    fetch(location, endpoints, raw=True) method), `cache` a
+    weather_cache.ResponseCache and `flights` a weather_client.SingleFlight;
+    cache and flights are optional. Raw response bodies are cached and
+    decoded with `decoders` (endpoint -> callable, default
+    weather_decode.DECODERS).
+
+    With a `geocoder` (weather_geocode.GeocodeIndex), search text it already
+    knows is fetched and cached by city id, and every text search teaches it
+    the city the API returned. `combined` names an endpoint that answers
+    current + forecast in one request (e.g. "onecall"); it is used for
+    geocoded places, whose coordinates it needs. Decoding and packaging
+    are timed as "decode" / "process" spans on `tracer` (weather_trace).
+    """
+    def __init__(self, client, cache=None, flights=None, endpoints=('current', 'forecast'),
+                 max_stale=None, normalize=str.lower, decoders=None, geocoder=None,
+                 combined=None, tracer=None):
+        if decoders is None:
+            from weather_decode import DECODERS as decoders
+        if tracer is None:
+            from weather_trace import NULL_TRACER as tracer
+        self.decoders = decoders
+        self.tracer = tracer  # records "decode" and "process" spans
+        self.client = client
+        self.cache = cache
+        self.flights = flights
+        self.endpoints = tuple(endpoints)
+        self.max_stale = max_stale  # seconds; None disables stale-while-revalidate
+        self.normalize = normalize
+        self.geocoder = geocoder
+        self.combined = combined
+
+    def _refresh(self, location, key, endpoints):
+        """Fetch `endpoints` for a location and store them in the cache.
+        A text search that the geocoder learns from is cached under the
+        city's canonical key instead of the text.
+        """
+        fetched, timings = self.client.fetch(location, endpoints, raw=True)
+        if self.geocoder is not None and isinstance(location, str):
+            place = self.geocoder.learn_bodies(location, fetched, self.decoders)
+            if place is not None:
+                key = self.normalize(place)
+        if self.cache is not None:
+            for endpoint, payload in fetched.items():
+                self.cache.put(endpoint, key, payload)
+        return fetched, timings
+
+    def _package(self, bodies, last_updated, timings=None, stale=False, place=None):
+        span = self.tracer.span
+        if self.combined is not None and self.combined in bodies:
+            with span('decode', endpoint=self.combined):
+                decoded = self.decoders[self.combined](bodies[self.combined], place)
+        else:
+            decoded = {}
+            for endpoint, body in bodies.items():
+                with span('decode', endpoint=endpoint):
+                    decoded[endpoint] = self.decoders[endpoint](body)
+        with span('process', stale=stale):
+            return build_data_package(decoded['current'], decoded['forecast'], last_updated,
+                                      timings=timings, stale=stale)
+
+    def resolve(self, location):
+        """
+        What to request for `location`: (location or place, cache key, endpoints).
+        A place is a weather_client.Place (anything with id/lat/lon).
+        """
+        place = location if hasattr(location, 'lat') else None
+        if place is None and self.geocoder is not None and isinstance(location, str):
+            place = self.geocoder.resolve(location)
+        if place is not None:
+            endpoints = (self.combined,) if self.combined is not None else self.endpoints
+            return place, self.normalize(place), endpoints
+        return location, self.normalize(location), self.endpoints
+
+    def load(self, location, on_stale=None, on_cold=None):
+        """
+        Return a data package for `location`.
+
+        Fresh cache entries are used as-is and only expired endpoints are
+        fetched. If every expired endpoint still has a stale entry, a package
+        marked "stale" is passed to `on_stale` before refreshing; otherwise
+        `on_cold` is called. Network errors propagate from the client, wrapped
+        in StaleRefreshError when stale data was already delivered.
+        """
+        location, key, endpoints = self.resolve(location)
+        place = location if hasattr(location, 'lat') else None
+        results = {}
+        stored_at = []
+        if self.cache is not None:
+            for endpoint in endpoints:
+                cached = self.cache.get(endpoint, key)
+                if cached:
+                    results[endpoint] = cached[0]
+                    stored_at.append(cached[1])
+        missing = tuple(e for e in endpoints if e not in results)
+
+        if not missing:
+            return self._package(results, datetime.fromtimestamp(min(stored_at)), place=place)
+
+        # Stale-while-revalidate: deliver expired entries now, refresh below
+        stale = {}
+        if self.cache is not None and self.max_stale is not None and on_stale is not None:
+            for endpoint in missing:
+                entry = self.cache.get_stale(endpoint, key, max_age=self.max_stale)
+                if entry:
+                    stale[endpoint] = entry
+        painted_stale = len(stale) == len(missing)
+        if painted_stale:
+            painted = dict(results, **{e: v[0] for e, v in stale.items()})
+            oldest = min(stored_at + [v[1] for v in stale.values()])
+            on_stale(self._package(painted, datetime.fromtimestamp(oldest), stale=True, place=place))
+        elif on_cold is not None:
+            on_cold()
+
+        try:
+            if self.flights is not None:
+                fetched, timings = self.flights.do((key, missing), self._refresh, location, key, missing)
+            else:
+                fetched, timings = self._refresh(location, key, missing)
+        except Exception as e:
+            if painted_stale:
+                raise StaleRefreshError(e) from e
+            raise
+        results.update(fetched)
+        return self._package(results, datetime.now(), timings=timings, place=place)
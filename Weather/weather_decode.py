@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""
+Response decoding for WeatherScope Pro.
+
+Response bodies are cached as raw bytes and decoded here. The /forecast
+payload (40 items with many fields the app never reads) is turned straight
+into a compact ForecastTable:
+
+- with orjson installed, the body is parsed by orjson (much faster than the
+  stdlib) and the tree is dropped as soon as the table is built;
+- otherwise the stdlib parser runs with an object hook that writes each
+  3-hour item into the table the moment it is parsed and discards it, so
+  the full decoded tree (40 nested items) is never held in memory.
+
+See benchmarks/bench_decode.py for decode-time and peak-memory numbers
+against the old response.json() path.
+
+decode_onecall() adapts the optional One Call 3.0 response (current +
+hourly + daily in one request) to the same pair of /weather-shaped dict and
+ForecastTable, so the rest of the app does not know which API answered.
+"""
+
+import json
+
+from weather_core import ForecastTable, compact_city
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except Exception:
+    ORJSON_AVAILABLE = False
+
+def loads(body):
+    """Decode a JSON body (bytes or str) with the fastest available backend."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(body)
+    return json.loads(body)
+
+
+def decode_current(body):
+    """Decode a /weather (current conditions) body; it is small, so keep it whole."""
+    return loads(body)
+
+
+def _decode_forecast_streaming(body):
+    """Stdlib decode that fills a ForecastTable while parsing."""
+    table = ForecastTable()
+    append = table.append
+
+    def hook(obj):
+        main = obj.get('main')
+        if main.__class__ is dict and 'dt' in obj:
+            # A 3-hour item: its children are already parsed, so emit the row
+            # now and drop the item instead of keeping it in the tree
+            weather = obj['weather'][0] if obj.get('weather') else {}
+            append(obj['dt'], main['temp'], main.get('humidity', 0),
+                   obj.get('wind', {}).get('speed', 0), obj.get('pop', 0),
+                   weather.get('main'), weather.get('description', ''))
+            return None
+        return obj
+
+    top = json.loads(body, object_hook=hook)
+    city = top.get('city', {})
+    table.city = compact_city(city)
+    return table.finish(city.get('timezone', 0))
+
+
+def decode_forecast(body):
+    """Decode a /forecast body straight into a ForecastTable."""
+    if ORJSON_AVAILABLE:
+        return ForecastTable.from_json(orjson.loads(body))
+    return _decode_forecast_streaming(body)
+
+
+def decode_onecall(body, place=None):
+    """
+    Decode a One Call 3.0 body into {'current': ..., 'forecast': ...} shaped
+    like the /weather and /forecast decoders' output.
+
+    The forecast holds only real forecast points: the hourly entries
+    (48 h), sampled every 3 hours like /forecast. The daily entries have
+    no times for their min/max temperatures, so they are not turned into
+    rows; the 5-day view covers the two hourly days. One Call has no place
+    name, so `place` (a weather_client.Place) supplies name, country and id.
+    """
+    data = loads(body)
+    tz_offset = data.get('timezone_offset', 0)
+    now = data.get('current', {})
+    coord = {'lat': data.get('lat'), 'lon': data.get('lon')}
+    current = {
+        'id': place.id if place else None,
+        'name': place.name if place else '',
+        'coord': coord,
+        'dt': now.get('dt'),
+        'timezone': tz_offset,
+        'weather': now.get('weather') or [{'main': None, 'description': ''}],
+        'main': {'temp': now.get('temp'), 'feels_like': now.get('feels_like'),
+                 'humidity': now.get('humidity'), 'pressure': now.get('pressure')},
+        'wind': {'speed': now.get('wind_speed', 0)},
+        'sys': {'country': place.country if place else '',
+                'sunrise': now.get('sunrise'), 'sunset': now.get('sunset')},
+        'uvi': now.get('uvi'),
+    }
+
+    table = ForecastTable()
+    for item in data.get('hourly', [])[::3]:
+        weather = item['weather'][0] if item.get('weather') else {}
+        table.append(item['dt'], item['temp'], item.get('humidity', 0), item.get('wind_speed', 0),
+                     item.get('pop', 0), weather.get('main'), weather.get('description', ''))
+    table.city = compact_city({
+        'id': current['id'], 'name': current['name'], 'coord': coord,
+        'country': current['sys']['country'], 'timezone': tz_offset,
+    })
+    return {'current': current, 'forecast': table.finish(tz_offset)}
+
+
+# endpoint name -> decoder, used by WeatherService and BatchFetcher.
+# 'onecall' decodes to both the 'current' and 'forecast' results.
+DECODERS = {
+    'current': decode_current,
+    'forecast': decode_forecast,
+    'onecall': decode_onecall,
+}
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""
+Local geocode index for WeatherScope Pro.
+
+GeocodeIndex remembers which city each search text resolved to, learning
+it from responses the app already receives (`current['id' / 'coord']`, the
+/forecast `city` object), and stores it on disk. A known text resolves
+locally to a Place, so the request goes out by city id ("id=2643743")
+rather than as free text the API has to geocode, and "london", "London,GB"
+and "london " share one cache entry per city (see
+weather_client.normalize_location).
+
+Only the exact search text and "name,country" are recorded as aliases: a
+bare "london" is not assumed to mean the London the user picked with
+"London,CA". A "name,country" alias keeps the first city it was bound to
+(two US Springfields share "springfield,us"); the exact search text always
+follows the city the API last returned for it.
+"""
+
+import sqlite3
+import time
+
+from weather_client import Place, normalize_location
+from weather_store import SQLiteStore
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS places (
+    id      INTEGER PRIMARY KEY,
+    name    TEXT NOT NULL,
+    country TEXT NOT NULL,
+    lat     REAL NOT NULL,
+    lon     REAL NOT NULL,
+    seen    REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS aliases (
+    query TEXT PRIMARY KEY,
+    id    INTEGER NOT NULL REFERENCES places (id)
+);
+"""
+
+
+def place_from_response(current=None, city=None):
+    """
+    Place described by a decoded /weather response (`current`) or a
+    /forecast `city` object. Returns None when the id or coordinates are missing.
+    """
+    try:
+        if current is not None:
+            return Place(int(current['id']), current['name'], current['sys'].get('country', ''),
+                         float(current['coord']['lat']), float(current['coord']['lon']))
+        if city is not None:
+            return Place(int(city['id']), city['name'], city.get('country', ''),
+                         float(city['coord']['lat']), float(city['coord']['lon']))
+    except (KeyError, TypeError, ValueError):
+        pass
+    return None
+
+
+class GeocodeIndex(SQLiteStore):
+    """
+    SQLite-backed map from search text to Place. Use ":memory:" as `path`
+    for a throwaway index. Counters: `hits`, `misses` and `learned`.
+    """
+    SCHEMA = _SCHEMA
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.hits = 0
+        self.misses = 0
+        self.learned = 0
+
+    def resolve(self, text):
+        """Return the Place `text` is known to mean, or None."""
+        query = normalize_location(text)
+        with self._lock:
+            try:
+                row = self._connect().execute(
+                    "SELECT p.id, p.name, p.country, p.lat, p.lon FROM aliases a "
+                    "JOIN places p ON p.id = a.id WHERE a.query = ?", (query,)).fetchone()
+            except sqlite3.Error as e:
+                print(f"Geocode lookup failed for {query}: {e}")
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return Place(*row)
+
+    def learn(self, text, current=None, city=None):
+        """
+        Record the city a search for `text` returned (see place_from_response).
+        Returns the Place, or None if the response did not identify one.
+        """
+        place = place_from_response(current, city)
+        if place is None:
+            return None
+        self.remember(text, place)
+        return place
+
+    def learn_bodies(self, text, bodies, decoders):
+        """
+        learn() from raw response bodies (endpoint -> bytes) decoded with
+        `decoders`. Callers cache the bodies under normalize_location() of
+        the returned Place, so searches and batch runs share one entry per city.
+        """
+        if 'current' in bodies:
+            return self.learn(text, current=decoders['current'](bodies['current']))
+        if 'forecast' in bodies:
+            return self.learn(text, city=decoders['forecast'](bodies['forecast']).city)
+        return None
+
+    def remember(self, text, place):
+        """
+        Record that `text` means `place`, and that "name,country" does
+        unless that alias already names another city.
+        """
+        query = normalize_location(text)
+        name_alias = normalize_location(f"{place.name},{place.country}")
+        with self._lock:
+            try:
+                conn = self._connect()
+                conn.execute("INSERT OR REPLACE INTO places VALUES (?, ?, ?, ?, ?, ?)",
+                             place + (time.time(),))
+                conn.execute("INSERT OR REPLACE INTO aliases VALUES (?, ?)", (query, place.id))
+                if name_alias != query:
+                    conn.execute("INSERT OR IGNORE INTO aliases VALUES (?, ?)", (name_alias, place.id))
+                conn.commit()
+                self.learned += 1
+            except sqlite3.Error as e:
+                print(f"Geocode index write failed for {place.name}: {e}")
+
+    def places(self):
+        """Every known Place, by name."""
+        with self._lock:
+            try:
+                rows = self._connect().execute(
+                    "SELECT id, name, country, lat, lon FROM places ORDER BY name").fetchall()
+            except sqlite3.Error as e:
+                print(f"Geocode index read failed: {e}")
+                rows = []
+        return [Place(*row) for row in rows]
+
+    def stats(self):
+        """Return counters and the number of known places as a dict."""
+        with self._lock:
+            try:
+                count = self._connect().execute("SELECT COUNT(*) FROM places").fetchone()[0]
+            except sqlite3.Error:
+                count = 0
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'learned': self.learned,
+                'places': count,
+            }
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+Cached vertical gradient images for WeatherScope Pro.
+
+Each (color1, color2, height) combination is rendered once into a single
+PhotoImage (one column of row colours, tiled across the full width by Tk)
+and kept in a small LRU, so resizing back and forth or switching between
+weather themes just re-places an existing image.
+
+See benchmarks/bench_gradient.py for the cost against drawing one canvas
+line per pixel row.
+"""
+
+from collections import OrderedDict
+
+GRADIENT_CACHE_SIZE = 8  # images kept; each is about screen width x height x 4 bytes
+
+
+def gradient_rows(rgb1, rgb2, height):
+    """
+    Colour of every pixel row, as '#rrggbb' strings.
+
+    `rgb1` / `rgb2` are 16-bit (r, g, b) tuples as returned by winfo_rgb();
+    the interpolation matches the original line-per-row gradient.
+    """
+    r1, g1, b1 = rgb1
+    r2, g2, b2 = rgb2
+    r_ratio = (r2 - r1) / height
+    g_ratio = (g2 - g1) / height
+    b_ratio = (b2 - b1) / height
+
+    rows = []
+    for i in range(height):
+        nr = max(0, min(int(r1 + r_ratio * i), 65535)) >> 8
+        ng = max(0, min(int(g1 + g_ratio * i), 65535)) >> 8
+        nb = max(0, min(int(b1 + b_ratio * i), 65535)) >> 8
+        rows.append(f'#{nr:02x}{ng:02x}{nb:02x}')
+    return rows
+
+
+class GradientCache:
+    """
+    Bounded LRU of gradient PhotoImages keyed by (color1, color2, height).
+
+    Images are made at least as wide as the screen so that widening a window
+    reuses the same image; one cache can be shared by every GradientFrame.
+    """
+    def __init__(self, max_size=GRADIENT_CACHE_SIZE):
+        self.max_size = max_size
+        self._images = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, widget, color1, color2, width, height):
+        """Return a PhotoImage of at least `width` x `height` for the colours."""
+        key = (color1, color2, height)
+        img = self._images.get(key)
+        if img is not None and img.width() >= width:
+            self._images.move_to_end(key)
+            self.hits += 1
+            return img
+
+        self.misses += 1
+        img = self._render(widget, color1, color2, max(width, widget.winfo_screenwidth()), height)
+        self._images[key] = img
+        self._images.move_to_end(key)
+        while len(self._images) > self.max_size:
+            self._images.popitem(last=False)
+            self.evictions += 1
+        return img
+
+    @staticmethod
+    def _render(widget, color1, color2, width, height):
+        # Imported here so the colour maths above stays usable without Tk
+        import tkinter as tk
+
+        rows = gradient_rows(widget.winfo_rgb(color1), widget.winfo_rgb(color2), height)
+        img = tk.PhotoImage(master=widget, width=width, height=height)
+        # One colour per row in a single column; `to` tiles it across the width
+        img.put(" ".join("{%s}" % c for c in rows), to=(0, 0, width, height))
+        return img
+
+    def clear(self):
+        """Drop every cached image."""
+        self._images.clear()
+
+    def stats(self):
+        """Return counters and current size as a dict."""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'entries': len(self._images),
+        }
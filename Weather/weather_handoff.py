@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""
+Worker -> Tk thread handoff for WeatherScope Pro.
+
+Fetch workers put typed messages into a HandoffQueue and leave applying
+them to the Tk thread. The queue keeps only the latest message per (city,
+channel): a newer result for a city replaces one that has not been applied
+yet, so superseded results are discarded before they cost any rendering.
+It is bounded; when too many cities are pending, the oldest ones are
+dropped. put() never blocks a worker.
+
+Draining is event-driven: the queue calls its `notify` callback when it
+goes from empty to non-empty, and the app answers with one after(0) drain
+on the Tk thread. However many messages arrive before that drain, they
+cost a single Tk event, and an idle app is never woken to look at an
+empty queue.
+
+Each search runs under a generation (Generations.begin()). Starting a new
+search cancels the token of the previous one: its worker stops posting, and
+anything it already posted is discarded when drained, so a slow request can
+never overwrite a newer result.
+"""
+
+import threading
+from collections import OrderedDict, namedtuple
+
+# Message kinds
+STALE = 'stale'  # expired cached data, painted while a refresh runs
+RESULT = 'result'  # fresh data package
+STATUS = 'status'  # quiet status-bar message (e.g. auto-refresh found no new data)
+REFRESH_FAILED = 'refresh_failed'  # stale data was painted but could not be refreshed
+ERROR = 'error'  # error shown to the user
+LOADING = 'loading'  # nothing cached: show the loading overlay
+DONE = 'done'  # the request finished (successfully or not)
+
+# Each kind belongs to a channel; a city keeps one pending message per channel
+_CHANNELS = {
+    STALE: 'data',
+    RESULT: 'data',
+    STATUS: 'error',
+    REFRESH_FAILED: 'error',
+    ERROR: 'error',
+    LOADING: 'progress',
+    DONE: 'progress',
+}
+
+DEFAULT_MAX_PENDING = 256
+
+Message = namedtuple('Message', 'kind key payload generation', defaults=(0,))
+
+
+class CancelToken:
+    """Cancellation flag handed to the worker of one search generation."""
+    def __init__(self, generation):
+        self.generation = generation
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class Generations:
+    """
+    Numbers searches. begin() cancels the previous search and returns the
+    token of the new one; is_current() tells whether a message still matters.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._current = CancelToken(0)
+
+    def begin(self):
+        with self._lock:
+            self._current.cancel()
+            self._current = CancelToken(self._current.generation + 1)
+            return self._current
+
+    @property
+    def current(self):
+        return self._current
+
+    def is_current(self, generation):
+        return generation == self._current.generation
+
+
+class HandoffQueue:
+    """
+    Bounded, coalescing queue of Messages from worker threads to the Tk thread.
+
+    `notify()` (optional) is called, on the putting thread and outside the
+    lock, by every put() that finds the queue empty: once per batch until
+    the next drain().
+
+    Counters: `put_count`, `superseded` (replaced before being drained),
+    `dropped` (evicted by the bound), `drained` and `notified`.
+    """
+    def __init__(self, max_pending=DEFAULT_MAX_PENDING, notify=None):
+        self.max_pending = max_pending
+        self.notify = notify
+        self._lock = threading.Lock()
+        self._pending = OrderedDict()  # (key, channel) -> Message, oldest first
+        self.put_count = 0
+        self.superseded = 0
+        self.dropped = 0
+        self.drained = 0
+        self.notified = 0
+
+    def put(self, kind, key, payload=None, generation=0):
+        """Queue a message for `key` (e.g. a normalised city); never blocks.
+        A message from an older generation never replaces a newer one.
+        """
+        channel = _CHANNELS[kind]
+        message = Message(kind, key, payload, generation)
+        with self._lock:
+            self.put_count += 1
+            wake = not self._pending and self.notify is not None
+            slot = (key, channel)
+            if slot in self._pending:
+                if self._pending[slot].generation > generation:
+                    self.superseded += 1
+                    return
+                self.superseded += 1
+                del self._pending[slot]
+            if channel == 'data' and (key, 'error') in self._pending:
+                # New data for the city makes a pending error for it moot
+                del self._pending[(key, 'error')]
+                self.superseded += 1
+            self._pending[slot] = message
+            while len(self._pending) > self.max_pending:
+                self._pending.popitem(last=False)
+                self.dropped += 1
+            if wake:
+                self.notified += 1
+        if wake:
+            self.notify()
+
+    def drain(self):
+        """Remove and return all pending messages, oldest first (Tk thread)."""
+        with self._lock:
+            messages = list(self._pending.values())
+            self._pending.clear()
+            self.drained += len(messages)
+        return messages
+
+    def __len__(self):
+        with self._lock:
+            return len(self._pending)
+
+    def stats(self):
+        """Return the counters as a dict."""
+        with self._lock:
+            return {
+                'put': self.put_count,
+                'superseded': self.superseded,
+                'dropped': self.dropped,
+                'drained': self.drained,
+                'notified': self.notified,
+                'pending': len(self._pending),
+            }
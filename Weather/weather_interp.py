@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+"""
+Vectorised forecast interpolation for WeatherScope Pro.
+
+Resamples the 3-hourly forecast onto any regular time grid (e.g. 24 hourly
+points, or 15-minute steps over 5 days). Numeric fields are linearly
+interpolated and categorical fields (condition codes) take the nearest
+forecast point, all in one pass over NumPy arrays using searchsorted/interp.
+Many cities can be resampled in a single batched call.
+
+Values outside the forecast range are clamped to the first/last point.
+When NumPy is not installed an equivalent bisect-based implementation is
+used, so callers never need to check.
+"""
+
+from bisect import bisect_right
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except Exception:
+    NUMPY_AVAILABLE = False
+
+
+def make_grid(start, step, count):
+    """Regular grid of `count` timestamps (seconds) from `start`, `step` apart."""
+    if NUMPY_AVAILABLE:
+        return start + step * np.arange(count, dtype=np.float64)
+    return [start + step * i for i in range(count)]
+
+
+def _nearest_indices(timestamps, grid):
+    """Index of the forecast point used for each grid time.
+    Picks the point before the target unless the target is at least halfway
+    to the next one; targets outside the range use the first/last point.
+    """
+    n = len(timestamps)
+    if NUMPY_AVAILABLE:
+        after = np.searchsorted(timestamps, grid, side='right')
+        after = np.clip(after, 1, n - 1) if n > 1 else np.zeros(len(grid), dtype=np.intp)
+        before = np.maximum(after - 1, 0)
+        span = timestamps[after] - timestamps[before]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            frac = np.where(span > 0, (grid - timestamps[before]) / span, 0.0)
+        return np.where(frac < 0.5, before, after)
+
+    result = []
+    for t in grid:
+        after = min(max(bisect_right(timestamps, t), 1), n - 1) if n > 1 else 0
+        before = max(after - 1, 0)
+        span = timestamps[after] - timestamps[before]
+        frac = (t - timestamps[before]) / span if span > 0 else 0.0
+        result.append(before if frac < 0.5 else after)
+    return result
+
+
+def _linear(timestamps, values, grid):
+    if NUMPY_AVAILABLE:
+        return np.interp(grid, timestamps, values)
+    n = len(timestamps)
+    out = []
+    for t in grid:
+        if t <= timestamps[0]:
+            out.append(values[0])
+            continue
+        if t >= timestamps[-1]:
+            out.append(values[-1])
+            continue
+        after = bisect_right(timestamps, t)
+        before = after - 1
+        if timestamps[before] == t or after >= n:
+            out.append(values[before])
+            continue
+        frac = (t - timestamps[before]) / (timestamps[after] - timestamps[before])
+        out.append(values[before] + (values[after] - values[before]) * frac)
+    return out
+
+
+def interpolate(timestamps, numeric, grid, categorical=None):
+    """
+    Resample one series onto `grid`.
+
+    `timestamps` must be sorted ascending; `numeric` and `categorical` map a
+    field name to a sequence of values aligned with `timestamps`.
+    Returns a dict field -> resampled values (NumPy arrays when available).
+    """
+    categorical = categorical or {}
+    if len(timestamps) == 0:
+        return {name: [] for name in list(numeric) + list(categorical)}
+
+    if NUMPY_AVAILABLE:
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        grid = np.asarray(grid, dtype=np.float64)
+    result = {}
+    for name, values in numeric.items():
+        if NUMPY_AVAILABLE:
+            values = np.asarray(values, dtype=np.float64)
+        result[name] = _linear(timestamps, values, grid)
+    if categorical:
+        idx = _nearest_indices(timestamps, grid)
+        for name, values in categorical.items():
+            if NUMPY_AVAILABLE:
+                result[name] = np.asarray(values)[idx]
+            else:
+                result[name] = [values[i] for i in idx]
+    return result
+
+
+def interpolate_batch(series, grid, numeric_fields, categorical_fields=()):
+    """
+    Resample many cities at once onto the same relative `grid`.
+
+    `series` is a list of (timestamps, fields, offset) tuples where `fields`
+    maps field name -> values and `offset` is added to `grid` for that city
+    (e.g. its own "now" or timezone). Returns one result dict per city, as
+    interpolate() would.
+
+    With NumPy, all cities are concatenated and shifted onto disjoint time
+    ranges, so each field is resampled with a single interp/searchsorted call.
+    """
+    if not NUMPY_AVAILABLE or not series:
+        return [interpolate(ts, {f: fields[f] for f in numeric_fields},
+                            [offset + g for g in grid],
+                            {f: fields[f] for f in categorical_fields})
+                for ts, fields, offset in series]
+
+    grid = np.asarray(grid, dtype=np.float64)
+    lengths = [len(ts) for ts, _fields, _offset in series]
+    if min(lengths) == 0:
+        return [interpolate(ts, {f: fields[f] for f in numeric_fields}, grid + offset,
+                            {f: fields[f] for f in categorical_fields})
+                for ts, fields, offset in series]
+
+    # Shift every city onto its own time band so the bands never overlap
+    firsts = np.array([float(ts[0]) for ts, _f, _o in series])
+    lasts = np.array([float(ts[-1]) for ts, _f, _o in series])
+    offsets = np.array([float(o) for _ts, _f, o in series])
+    targets = grid[None, :] + offsets[:, None]
+    band = float(max(lasts.max(), targets.max()) - min(firsts.min(), targets.min())) + 1.0
+    shifts = np.arange(len(series), dtype=np.float64) * band - firsts
+
+    all_ts = np.concatenate([np.asarray(ts, dtype=np.float64) + shift
+                             for (ts, _f, _o), shift in zip(series, shifts)])
+    # Clamp each city's targets to its own range, then move them into its band
+    clamped = np.clip(targets, firsts[:, None], lasts[:, None]) + shifts[:, None]
+    flat = clamped.ravel()
+
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    ends = starts + np.array(lengths) - 1
+    rows = np.repeat(np.arange(len(series)), len(grid))
+
+    merged = {}
+    for name in numeric_fields:
+        values = np.concatenate([np.asarray(f[name], dtype=np.float64) for _ts, f, _o in series])
+        merged[name] = np.interp(flat, all_ts, values).reshape(len(series), len(grid))
+    if categorical_fields:
+        after = np.searchsorted(all_ts, flat, side='right')
+        after = np.minimum(np.maximum(after, starts[rows] + 1), ends[rows])
+        before = np.maximum(after - 1, starts[rows])
+        span = all_ts[after] - all_ts[before]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            frac = np.where(span > 0, (flat - all_ts[before]) / span, 0.0)
+        idx = np.where(frac < 0.5, before, after)
+        for name in categorical_fields:
+            values = np.concatenate([np.asarray(f[name]) for _ts, f, _o in series])
+            merged[name] = values[idx].reshape(len(series), len(grid))
+
+    return [{name: merged[name][i] for name in merged} for i in range(len(series))]
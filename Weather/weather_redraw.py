@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""
+Coalescing redraw scheduler for WeatherScope Pro.
+
+RedrawScheduler sits on top of Tk's `after`: callers ask for a redraw by
+key (one key per widget), and all requests for a key that arrive before
+the next frame collapse into a single call of the most recent callback,
+so a resize drag or a burst of refreshes runs an expensive redraw
+(gradient, matplotlib canvases, map) once per frame.
+Heavy redraws (charts, map) share a per-frame time budget; whatever does
+not fit is carried over to the next frame instead of freezing the UI.
+
+The scheduler only needs an object with after()/after_cancel(), so it can
+be driven without a display.
+"""
+
+import time
+
+from weather_trace import NULL_TRACER
+
+FRAME_MS = 16  # ~60 frames per second
+HEAVY_BUDGET_MS = 40  # time heavy redraws may take per frame before the rest wait
+
+
+class RedrawScheduler:
+    """
+    Collapse bursts of redraw requests into at most one call per key per frame.
+
+    `widget` is the Tk widget whose after() drives the frames. Counters:
+    - merged:   requests absorbed into a redraw that was already pending,
+    - dropped:  pending redraws discarded without running (cancelled),
+    - deferred: heavy redraws pushed to a later frame by the budget,
+    - run:      redraws actually executed, over `frames` frames.
+    """
+    def __init__(self, widget, frame_ms=FRAME_MS, heavy_budget_ms=HEAVY_BUDGET_MS, tracer=None):
+        self.widget = widget
+        self.tracer = tracer or NULL_TRACER  # records a "draw" span per redraw
+        self.frame_ms = frame_ms
+        self.heavy_budget = heavy_budget_ms / 1000.0
+        self._pending = {}  # key -> [callback, heavy, due (monotonic seconds)]
+        self._after_id = None
+        self._timer_due = None
+        self.merged = 0
+        self.dropped = 0
+        self.deferred = 0
+        self.run = 0
+        self.frames = 0
+        self.timings = {}  # key -> duration (seconds) of its last redraw
+
+    def schedule(self, key, callback, heavy=False, delay_ms=0):
+        """
+        Request `callback()` for `key` on the next frame.
+
+        A later request for the same key replaces the pending callback. With
+        `delay_ms`, the redraw waits until no new request for the key has
+        arrived for that long (trailing debounce, e.g. for resize drags).
+        """
+        due = time.monotonic() + delay_ms / 1000.0
+        entry = self._pending.get(key)
+        if entry is not None:
+            self.merged += 1
+            entry[0] = callback
+            entry[1] = entry[1] or heavy
+            entry[2] = max(entry[2], due)
+        else:
+            self._pending[key] = [callback, heavy, due]
+        self._arm(due)
+
+    def cancel(self, key):
+        """Forget a pending redraw for `key`, if any."""
+        if self._pending.pop(key, None) is not None:
+            self.dropped += 1
+            if not self._pending:
+                self._disarm()
+
+    def close(self):
+        """Drop every pending redraw and stop scheduling frames."""
+        self.dropped += len(self._pending)
+        self._pending.clear()
+        self._disarm()
+
+    def pending(self, key):
+        """True when a redraw for `key` is waiting for a frame."""
+        return key in self._pending
+
+    def flush(self):
+        """Run every pending redraw now, ignoring delays and the budget."""
+        self._disarm()
+        entries, self._pending = self._pending, {}
+        for key, (callback, _heavy, _due) in entries.items():
+            self._call(key, callback)
+
+    def _arm(self, due):
+        """Make sure a frame is scheduled no later than `due`."""
+        due = max(due, time.monotonic() + self.frame_ms / 1000.0)
+        if self._after_id is not None:
+            if self._timer_due <= due:
+                return
+            self._disarm()
+        delay = max(1, int((due - time.monotonic()) * 1000))
+        self._timer_due = due
+        self._after_id = self.widget.after(delay, self._frame)
+
+    def _disarm(self):
+        if self._after_id is not None:
+            try:
+                self.widget.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+            self._timer_due = None
+
+    def _frame(self):
+        self._after_id = None
+        self._timer_due = None
+        self.frames += 1
+        start = now = time.monotonic()
+
+        ready = [key for key, entry in self._pending.items() if entry[2] <= now]
+        # Light redraws first: they are cheap and keep the UI responsive
+        ready.sort(key=lambda k: self._pending[k][1])
+        heavy_done = False
+        for key in ready:
+            callback, heavy, _due = self._pending[key]
+            if heavy and heavy_done and time.monotonic() - start >= self.heavy_budget:
+                self.deferred += 1
+                continue
+            del self._pending[key]
+            self._call(key, callback)
+            heavy_done = heavy_done or heavy
+
+        if self._pending:
+            self._arm(min(entry[2] for entry in self._pending.values()))
+
+    def _call(self, key, callback):
+        start = time.perf_counter()
+        try:
+            callback()
+        except Exception as e:
+            print(f"Redraw of {key} failed: {e}")
+        elapsed = self.timings[key] = time.perf_counter() - start
+        self.run += 1
+        self.tracer.record('draw', elapsed, key=key[0] if isinstance(key, tuple) else key)
+
+    def stats(self):
+        """Return the counters as a dict."""
+        return {
+            'frames': self.frames,
+            'run': self.run,
+            'merged': self.merged,
+            'dropped': self.dropped,
+            'deferred': self.deferred,
+            'pending': len(self._pending),
+        }
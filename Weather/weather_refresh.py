@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""
+Background auto-refresh scheduling for WeatherScope Pro.
+
+Without it the app only fetches when the user searches, so a dashboard left
+on a wall shows the same data forever. RefreshScheduler decides *when* each
+watched city is refreshed; the app does the fetching through its usual
+cached pipeline, so a refresh that finds fresh cache entries costs nothing.
+
+- every city has its own interval; each due time is jittered by
+  +/- `jitter` so cities watched together do not refresh in lockstep,
+- failures back off exponentially (interval * 2**failures, capped at
+  `max_backoff`) and reset on the next success,
+- succeeded() is given a data version (e.g. the upstream `dt` of the
+  current conditions) and reports whether it changed, so callers can skip
+  repainting data that is identical upstream.
+
+Like the other schedulers it holds no Tk state; the app polls due() from its
+ticker. All methods are thread-safe (workers report results).
+"""
+
+import random
+import threading
+import time
+
+DEFAULT_INTERVAL = 300  # seconds
+DEFAULT_JITTER = 0.1  # +/- fraction of the interval
+DEFAULT_MAX_BACKOFF = 3600  # seconds
+
+
+def retry_wait(delay):
+    """A backoff delay as shown in status messages ("45 s", "12 min")."""
+    return f"{delay:.0f} s" if delay < 60 else f"{delay / 60:.0f} min"
+
+
+class RefreshScheduler:
+    """
+    Per-city refresh timetable with jitter and error backoff.
+
+    Counters: `started`, `changed`, `unchanged` and `failed`.
+    """
+    def __init__(self, interval=DEFAULT_INTERVAL, jitter=DEFAULT_JITTER,
+                 max_backoff=DEFAULT_MAX_BACKOFF, rng=None, clock=time.monotonic):
+        self.interval = interval
+        self.jitter = jitter
+        self.max_backoff = max_backoff
+        self._rng = rng or random.Random()
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._cities = {}  # key -> {'location', 'interval', 'due', 'failures', 'version', 'busy'}
+        self.started = 0
+        self.changed = 0
+        self.unchanged = 0
+        self.failed = 0
+
+    def _jittered(self, delay):
+        return delay * self._rng.uniform(1 - self.jitter, 1 + self.jitter)
+
+    # --- Watch list ---
+
+    def watch(self, key, interval=None, version=None, spread=False, location=None):
+        """
+        Refresh `key` every `interval` seconds (default: the scheduler's),
+        starting one interval from now. `location` is what to fetch (the
+        text or Place the user searched; default: `key` itself) and is
+        kept when omitted on a later call. Call it again after the city was
+        fetched some other way (a user search, with that data's `version`)
+        to restart its timer. With `spread`, the first refresh falls at a
+        random point within one interval (staggers a startup list).
+        """
+        interval = interval or self.interval
+        first = interval * self._rng.random() if spread else self._jittered(interval)
+        with self._lock:
+            city = self._cities.get(key)
+            busy = city['busy'] if city else False
+            if location is None:
+                location = city['location'] if city else key
+            self._cities[key] = {'location': location, 'interval': interval,
+                                 'due': self._clock() + first, 'failures': 0,
+                                 'version': version, 'busy': busy}
+
+    def unwatch(self, key):
+        with self._lock:
+            self._cities.pop(key, None)
+
+    def watched(self):
+        with self._lock:
+            return list(self._cities)
+
+    # --- Scheduling ---
+
+    def due(self):
+        """Return (key, location) of the cities whose refresh is due and mark them in flight."""
+        now = self._clock()
+        ready = []
+        with self._lock:
+            for key, city in self._cities.items():
+                if not city['busy'] and city['due'] <= now:
+                    city['busy'] = True
+                    ready.append((key, city['location']))
+            self.started += len(ready)
+        return ready
+
+    def next_due(self):
+        """Seconds until the next refresh (None when nothing is watched)."""
+        with self._lock:
+            waiting = [c['due'] for c in self._cities.values() if not c['busy']]
+        return max(0.0, min(waiting) - self._clock()) if waiting else None
+
+    def succeeded(self, key, version):
+        """
+        Record a successful fetch of `key` (a scheduled refresh or a user
+        search) and schedule the next one. Returns True when `version`
+        differs from the last one seen, i.e. the data is worth repainting.
+        """
+        with self._lock:
+            city = self._cities.get(key)
+            if city is None:
+                return True
+            changed = version is None or version != city['version']
+            city['version'] = version
+            city['failures'] = 0
+            city['busy'] = False
+            city['due'] = self._clock() + self._jittered(city['interval'])
+            if changed:
+                self.changed += 1
+            else:
+                self.unchanged += 1
+            return changed
+
+    def failed_refresh(self, key):
+        """Record a failed refresh of `key`; returns the backoff delay in seconds."""
+        with self._lock:
+            city = self._cities.get(key)
+            if city is None:
+                return None
+            city['failures'] += 1
+            city['busy'] = False
+            delay = min(city['interval'] * 2 ** city['failures'], self.max_backoff)
+            delay = self._jittered(delay)
+            city['due'] = self._clock() + delay
+            self.failed += 1
+            return delay
+
+    def release(self, key):
+        """
+        Settle a refresh of `key` taken from due() that ended without
+        succeeded() or failed_refresh() (e.g. superseded by a search): it is
+        no longer in flight and keeps its due time. A no-op otherwise.
+        """
+        with self._lock:
+            city = self._cities.get(key)
+            if city is not None:
+                city['busy'] = False
+
+    def stats(self):
+        """Return the counters as a dict."""
+        with self._lock:
+            return {
+                'watched': len(self._cities),
+                'started': self.started,
+                'changed': self.changed,
+                'unchanged': self.unchanged,
+                'failed': self.failed,
+                'backing_off': sum(1 for c in self._cities.values() if c['failures']),
+            }
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""
+Shared SQLite plumbing for WeatherScope Pro's on-disk stores.
+
+ResponseCache (weather_cache), TileCache (weather_tiles) and GeocodeIndex
+(weather_geocode) each keep one connection, opened lazily and shared by
+every thread under an RLock. The two caches also evict least-recently-used
+rows once a row count or byte budget is exceeded; SQLiteStore holds that
+logic once.
+"""
+
+import sqlite3
+import threading
+
+
+class SQLiteStore:
+    """
+    Base for a SQLite-backed store. Use ":memory:" as `path` for a throwaway one.
+
+    Subclasses set SCHEMA and, to use _evict() and _usage(), LRU_TABLE (a
+    table with `size` and `last_access` columns), LRU_KEY (its key columns)
+    and LRU_TABLES (every table a victim's rows are deleted from).
+    """
+    SCHEMA = ""
+    TIMEOUT = 5.0  # seconds to wait for a lock held by another connection
+    LRU_TABLE = None
+    LRU_KEY = ()
+    LRU_TABLES = ()
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.RLock()
+        self._conn = None  # opened lazily on first use
+        self.evictions = 0
+
+    def _connect(self):
+        """Return the shared connection, creating the schema on first use."""
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=self.TIMEOUT)
+            self._conn.executescript(self.SCHEMA)
+        return self._conn
+
+    def _usage(self):
+        """(rows, bytes) tracked in LRU_TABLE; (0, 0) when the database cannot be read."""
+        with self._lock:
+            try:
+                return tuple(self._connect().execute(
+                    f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM {self.LRU_TABLE}").fetchone())
+            except sqlite3.Error:
+                return 0, 0
+
+    def _evict(self, conn, max_rows, max_bytes):
+        """Drop least-recently-used rows until both caps are satisfied."""
+        count, total = conn.execute(
+            f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM {self.LRU_TABLE}").fetchone()
+        if count <= max_rows and total <= max_bytes:
+            return
+        columns = ", ".join(self.LRU_KEY)
+        rows = conn.execute(
+            f"SELECT {columns}, size FROM {self.LRU_TABLE} ORDER BY last_access ASC").fetchall()
+        victims = []
+        for row in rows:
+            if count <= max_rows and total <= max_bytes:
+                break
+            victims.append(row[:-1])
+            count -= 1
+            total -= row[-1]
+        match = " AND ".join(f"{column} = ?" for column in self.LRU_KEY)
+        for table in self.LRU_TABLES:
+            conn.executemany(f"DELETE FROM {table} WHERE {match}", victims)
+        self.evictions += len(victims)
+
+    def close(self):
+        """Close the underlying database connection."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+"""
+Shared animation ticker for WeatherScope Pro.
+
+AnimationTicker drives value animations and periodic jobs from a single
+after() chain:
+- one animation per key; animating a key again retargets it from the value
+  currently shown, so back-to-back refreshes never fight over a label,
+- periodic jobs (the clock, the auto-refresh check) run on wall-clock
+  boundaries,
+- frames are capped at `fps` and only scheduled while something animates;
+  otherwise the ticker sleeps until the next periodic job (an idle
+  dashboard wakes once per second, for the clock),
+- pause() (window hidden or minimised) stops all wakeups until resume().
+
+Worker results do not go through the ticker: the handoff queue schedules
+its own drain when a message arrives (see weather_handoff).
+
+Like RedrawScheduler it only needs after()/after_cancel().
+"""
+
+import math
+import time
+
+DEFAULT_FPS = 30
+
+
+class AnimationTicker:
+    """
+    Drive value animations and periodic jobs from one after() chain.
+
+    Counters: `frames` (ticks run), `retargeted` (animations replaced by a
+    newer target before finishing) and `cancelled`.
+    """
+    def __init__(self, widget, fps=DEFAULT_FPS):
+        self.widget = widget
+        self.frame = 1.0 / fps
+        self._animations = {}  # key -> [start, end, t0, duration, apply]
+        self._periodic = {}  # key -> [interval, next_due, callback]
+        self._after_id = None
+        self._timer_due = None
+        self.paused = False
+        self.frames = 0
+        self.retargeted = 0
+        self.cancelled = 0
+
+    # --- Animations ---
+
+    def animate(self, key, apply, start, end, duration):
+        """
+        Animate `key` from `start` to `end` over `duration` seconds, calling
+        apply(value) on every frame and apply(end) last. If `key` is already
+        animating, it continues from its current value towards the new end.
+        """
+        now = time.monotonic()
+        running = self._animations.get(key)
+        if running is not None:
+            start = self._current(running, now)
+            self.retargeted += 1
+        if duration <= 0 or self.paused:
+            self._animations.pop(key, None)
+            self._call(key, apply, end)
+            return
+        self._animations[key] = [start, end, now, duration, apply]
+        self._wake(now + self.frame)
+
+    def value(self, key):
+        """Value `key` is showing right now, or None if it is not animating."""
+        running = self._animations.get(key)
+        return None if running is None else self._current(running, time.monotonic())
+
+    def cancel(self, key):
+        """Stop an animation or periodic job where it is."""
+        if self._animations.pop(key, None) is not None or self._periodic.pop(key, None) is not None:
+            self.cancelled += 1
+
+    @staticmethod
+    def _current(animation, now):
+        start, end, t0, duration, _apply = animation
+        progress = min(1.0, (now - t0) / duration)
+        return start + (end - start) * progress
+
+    # --- Periodic jobs ---
+
+    def every(self, key, interval, callback):
+        """Call `callback()` now and then every `interval` seconds, aligned to
+        wall-clock multiples of `interval` (e.g. on each second for a clock).
+        """
+        self._periodic[key] = [interval, 0.0, callback]
+        self._call(key, callback)
+        self._periodic[key][1] = self._next_boundary(interval)
+        self._wake(self._periodic[key][1])
+
+    @staticmethod
+    def _next_boundary(interval):
+        return time.monotonic() + interval - (time.time() % interval)
+
+    # --- Pausing ---
+
+    def pause(self):
+        """Stop ticking (e.g. while the window is minimised)."""
+        self.paused = True
+        self._disarm()
+
+    def resume(self):
+        """Start ticking again; periodic jobs and animations catch up at once."""
+        if not self.paused:
+            return
+        self.paused = False
+        for job in self._periodic.values():
+            job[1] = time.monotonic()  # run on the next tick
+        self._wake(time.monotonic())
+
+    def close(self):
+        """Drop every animation and periodic job."""
+        self._animations.clear()
+        self._periodic.clear()
+        self._disarm()
+
+    # --- Frame loop ---
+
+    def _wake(self, due):
+        """Make sure a tick is scheduled no later than `due`."""
+        if self.paused:
+            return
+        if self._after_id is not None:
+            if self._timer_due <= due:
+                return
+            self._disarm()
+        delay = max(1, math.ceil((due - time.monotonic()) * 1000))  # never wake early
+        self._timer_due = due
+        self._after_id = self.widget.after(delay, self._tick)
+
+    def _disarm(self):
+        if self._after_id is not None:
+            try:
+                self.widget.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+            self._timer_due = None
+
+    def _tick(self):
+        self._after_id = None
+        self._timer_due = None
+        if self.paused:
+            return
+        self.frames += 1
+        now = time.monotonic()
+
+        for key, animation in list(self._animations.items()):
+            if now - animation[2] >= animation[3]:
+                del self._animations[key]
+                self._call(key, animation[4], animation[1])
+            else:
+                self._call(key, animation[4], self._current(animation, now))
+
+        for key, job in list(self._periodic.items()):
+            if job[1] <= now:
+                self._call(key, job[2])
+                job[1] = self._next_boundary(job[0])
+
+        # Next wakeup: the next frame while animating, else the next periodic job
+        if self._animations:
+            self._wake(now + self.frame)
+        elif self._periodic:
+            self._wake(min(job[1] for job in self._periodic.values()))
+
+    @staticmethod
+    def _call(key, callback, *args):
+        try:
+            callback(*args)
+        except Exception as e:
+            print(f"Animation {key} failed: {e}")
+
+    def stats(self):
+        """Return the counters as a dict."""
+        return {
+            'frames': self.frames,
+            'animating': len(self._animations),
+            'periodic': len(self._periodic),
+            'retargeted': self.retargeted,
+            'cancelled': self.cancelled,
+            'paused': self.paused,
+        }
@@ -0,0 +1,323 @@
+# -*- coding: utf-8 -*-
+"""
+Offline map tile cache and prefetcher for WeatherScope Pro.
+
+TileCache is a SQLite database in the layout TkinterMapView reads tiles
+from (TkinterMapView(database_path=...), the schema of its OfflineLoader),
+plus a `tile_access` table used for size-capped least-recently-used
+eviction. TilePrefetcher warms the cache in the background around each
+searched coordinate, for the zoom levels the map shows (set_zoom(10) and
+its neighbours), so the map keeps working from the cache with no network.
+
+TkinterMapView only reads that database: tiles the widget downloads itself
+stay in its in-memory cache and are never written to the file. Only
+prefetched tiles work offline.
+
+Bulk downloading is against the usage policy of the public OpenStreetMap
+tile servers, so TilePrefetcher refuses them (see prefetch_allowed); point
+it at a tile server you run or one whose terms allow prefetching.
+
+The tile server is a URL template, so a local stub server works for tests:
+
+    TilePrefetcher(cache, "http://127.0.0.1:8000/{z}/{x}/{y}.png")
+"""
+
+import math
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+
+from weather_store import SQLiteStore
+
+DEFAULT_MAX_TILES = 20000
+DEFAULT_MAX_BYTES = 100 * 1024 * 1024  # 100 MB
+# zoom level -> radius in tiles prefetched around the centre tile
+DEFAULT_ZOOMS = {10: 2, 9: 1, 11: 3}
+DEFAULT_WORKERS = 4
+USER_AGENT = "WeatherScopePro/9.1 (tile prefetch)"  # tile servers require one
+
+_MAX_LAT = 85.05112878  # Web Mercator limit
+
+# Tile servers whose usage policy forbids bulk prefetching
+NO_PREFETCH_HOSTS = ('tile.openstreetmap.org',)
+
+# The first three tables are TkinterMapView's own offline database layout
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS server (
+    url      VARCHAR(300) PRIMARY KEY NOT NULL,
+    max_zoom INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tiles (
+    zoom       INTEGER NOT NULL,
+    x          INTEGER NOT NULL,
+    y          INTEGER NOT NULL,
+    server     VARCHAR(300) NOT NULL,
+    tile_image BLOB NOT NULL,
+    CONSTRAINT fk_server FOREIGN KEY (server) REFERENCES server (url),
+    CONSTRAINT pk_tiles PRIMARY KEY (zoom, x, y, server)
+);
+CREATE TABLE IF NOT EXISTS sections (
+    position_a VARCHAR(100) NOT NULL,
+    position_b VARCHAR(100) NOT NULL,
+    zoom_a     INTEGER NOT NULL,
+    zoom_b     INTEGER NOT NULL,
+    server     VARCHAR(300) NOT NULL,
+    CONSTRAINT fk_server FOREIGN KEY (server) REFERENCES server (url),
+    CONSTRAINT pk_sections PRIMARY KEY (position_a, position_b, zoom_a, zoom_b, server)
+);
+CREATE TABLE IF NOT EXISTS tile_access (
+    zoom        INTEGER NOT NULL,
+    x           INTEGER NOT NULL,
+    y           INTEGER NOT NULL,
+    server      VARCHAR(300) NOT NULL,
+    size        INTEGER NOT NULL,
+    last_access REAL    NOT NULL,
+    PRIMARY KEY (zoom, x, y, server)
+);
+CREATE INDEX IF NOT EXISTS tile_access_lru ON tile_access (last_access);
+"""
+
+
+def prefetch_allowed(server_url):
+    """False for tile servers that must not be prefetched from (NO_PREFETCH_HOSTS)."""
+    host = (urlsplit(server_url).hostname or '').rstrip('.')
+    return not any(host == h or host.endswith('.' + h) for h in NO_PREFETCH_HOSTS)
+
+
+def tile_xy(lat, lon, zoom):
+    """Slippy-map (x, y) of the tile containing (lat, lon) at `zoom`."""
+    lat = max(min(lat, _MAX_LAT), -_MAX_LAT)
+    n = 2 ** zoom
+    x = int((lon + 180.0) / 360.0 * n)
+    y = int((1.0 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2.0 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+
+def tiles_around(lat, lon, zoom, radius):
+    """(zoom, x, y) of the tiles within `radius` of the centre tile, nearest first.
+    x wraps around the antimeridian; rows beyond the poles are skipped.
+    """
+    cx, cy = tile_xy(lat, lon, zoom)
+    n = 2 ** zoom
+    seen = set()
+    tiles = []
+    for ring in range(radius + 1):
+        for dx in range(-ring, ring + 1):
+            for dy in range(-ring, ring + 1):
+                if max(abs(dx), abs(dy)) != ring or not 0 <= cy + dy < n:
+                    continue
+                tile = (zoom, (cx + dx) % n, cy + dy)
+                if tile not in seen:
+                    seen.add(tile)
+                    tiles.append(tile)
+    return tiles
+
+
+class TileCache(SQLiteStore):
+    """
+    SQLite tile store readable by TkinterMapView(database_path=cache.path).
+
+    Tiles written through put() are tracked in `tile_access` and evicted
+    least-recently-used first once `max_tiles` or `max_bytes` is exceeded.
+    """
+    SCHEMA = _SCHEMA
+    TIMEOUT = 10.0  # the map widget reads the same file from its own threads
+    LRU_TABLE = 'tile_access'
+    LRU_KEY = ('zoom', 'x', 'y', 'server')
+    LRU_TABLES = ('tiles', 'tile_access')
+
+    def __init__(self, path, max_tiles=DEFAULT_MAX_TILES, max_bytes=DEFAULT_MAX_BYTES):
+        super().__init__(path)
+        self.max_tiles = max_tiles
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def ensure_schema(self):
+        """Create the database file and tables (before the map widget opens it)."""
+        with self._lock:
+            try:
+                self._connect()
+            except sqlite3.Error as e:
+                print(f"Tile cache unavailable: {e}")
+        return self.path
+
+    def get(self, server, zoom, x, y):
+        """Return the tile image bytes, or None on a miss."""
+        with self._lock:
+            try:
+                conn = self._connect()
+                row = conn.execute(
+                    "SELECT tile_image FROM tiles WHERE zoom = ? AND x = ? AND y = ? AND server = ?",
+                    (zoom, x, y, server)).fetchone()
+                if row is None:
+                    self.misses += 1
+                    return None
+                conn.execute(
+                    "UPDATE tile_access SET last_access = ? "
+                    "WHERE zoom = ? AND x = ? AND y = ? AND server = ?",
+                    (time.time(), zoom, x, y, server))
+                conn.commit()
+                self.hits += 1
+                return bytes(row[0])
+            except sqlite3.Error as e:
+                print(f"Tile cache read failed for {zoom}/{x}/{y}: {e}")
+                self.misses += 1
+                return None
+
+    def touch(self, server, tiles):
+        """
+        Mark `tiles` ((zoom, x, y) tuples) as recently used.
+        Returns the set of those tiles that are already cached.
+        """
+        now = time.time()
+        with self._lock:
+            try:
+                conn = self._connect()
+                present = set()
+                for zoom, x, y in tiles:
+                    if conn.execute(
+                            "SELECT 1 FROM tiles WHERE zoom = ? AND x = ? AND y = ? AND server = ?",
+                            (zoom, x, y, server)).fetchone():
+                        present.add((zoom, x, y))
+                conn.executemany(
+                    "UPDATE tile_access SET last_access = ? "
+                    "WHERE zoom = ? AND x = ? AND y = ? AND server = ?",
+                    [(now, zoom, x, y, server) for zoom, x, y in present])
+                conn.commit()
+                return present
+            except sqlite3.Error as e:
+                print(f"Tile cache read failed: {e}")
+                return set()
+
+    def put(self, server, zoom, x, y, image, max_zoom=19):
+        """Store a tile image (bytes) and evict down to the size caps."""
+        blob = bytes(image)
+        with self._lock:
+            try:
+                conn = self._connect()
+                conn.execute("INSERT OR IGNORE INTO server VALUES (?, ?)", (server, max_zoom))
+                conn.execute("INSERT OR REPLACE INTO tiles VALUES (?, ?, ?, ?, ?)",
+                             (zoom, x, y, server, blob))
+                conn.execute("INSERT OR REPLACE INTO tile_access VALUES (?, ?, ?, ?, ?, ?)",
+                             (zoom, x, y, server, len(blob), time.time()))
+                self._evict(conn, self.max_tiles, self.max_bytes)
+                conn.commit()
+            except sqlite3.Error as e:
+                print(f"Tile cache write failed for {zoom}/{x}/{y}: {e}")
+
+    def stats(self):
+        """Return counters and current size as a dict."""
+        with self._lock:
+            count, total = self._usage()
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'tiles': count,
+                'bytes': total,
+            }
+
+
+class TilePrefetcher:
+    """
+    Download missing tiles around a coordinate into a TileCache, in the background.
+
+    `server_url` is a template with {z}, {x} and {y}; servers that forbid
+    prefetching raise ValueError (see prefetch_allowed). `zooms` maps zoom
+    level -> radius in tiles. `online` turns False after a connection
+    failure and back to True after the next successful download, so callers
+    can switch the map to cache-only mode while offline. When everything
+    around a coordinate is already cached while offline, its centre tile is
+    downloaded again as a probe, so `online` still recovers.
+    """
+    def __init__(self, cache, server_url, zooms=None, workers=DEFAULT_WORKERS,
+                 timeout=10, session=None):
+        if not prefetch_allowed(server_url):
+            raise ValueError(f"{urlsplit(server_url).hostname} does not allow tile prefetching")
+        self.cache = cache
+        self._server_url = server_url  # fixed: a new server needs a new (checked) prefetcher
+        self.zooms = dict(DEFAULT_ZOOMS if zooms is None else zooms)
+        self.timeout = timeout
+        self._session = session or requests.Session()
+        self._session.headers.setdefault('User-Agent', USER_AGENT)
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tile-prefetch")
+        self._lock = threading.Lock()
+        self._inflight = set()
+        self.online = True
+        self.fetched = 0
+        self.already_cached = 0
+        self.failed = 0
+
+    @property
+    def server_url(self):
+        return self._server_url
+
+    def prefetch(self, lat, lon):
+        """
+        Queue downloads of uncached tiles around (lat, lon) without touching
+        the cache on the calling thread. Returns a future whose result is
+        the list of download futures.
+        """
+        return self._pool.submit(self._plan, lat, lon)
+
+    def _plan(self, lat, lon):
+        wanted = [tile for zoom, radius in self.zooms.items()
+                  for tile in tiles_around(lat, lon, zoom, radius)]
+        present = self.cache.touch(self.server_url, wanted)
+        futures = []
+        with self._lock:
+            self.already_cached += len(present)
+            missing = [tile for tile in wanted if tile not in present]
+            if not missing and not self.online:
+                missing = wanted[:1]  # probe: are we back online?
+            for tile in missing:
+                if tile in self._inflight:
+                    continue
+                self._inflight.add(tile)
+                futures.append(self._pool.submit(self._fetch, *tile))
+        return futures
+
+    def _fetch(self, zoom, x, y):
+        url = self.server_url.format(z=zoom, x=x, y=y)
+        try:
+            response = self._session.get(url, timeout=self.timeout)
+            response.raise_for_status()
+            self.cache.put(self.server_url, zoom, x, y, response.content)
+            with self._lock:
+                self.fetched += 1
+                self.online = True
+            return True
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            with self._lock:
+                self.failed += 1
+                self.online = False
+            return False
+        except requests.exceptions.RequestException as e:
+            print(f"Tile prefetch failed for {zoom}/{x}/{y}: {e}")
+            with self._lock:
+                self.failed += 1
+            return False
+        finally:
+            with self._lock:
+                self._inflight.discard((zoom, x, y))
+
+    def stats(self):
+        """Return counters as a dict."""
+        with self._lock:
+            return {
+                'fetched': self.fetched,
+                'already_cached': self.already_cached,
+                'failed': self.failed,
+                'pending': len(self._inflight),
+                'online': self.online,
+            }
+
+    def close(self):
+        """Stop downloading (queued tiles are dropped) and close connections."""
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self._session.close()
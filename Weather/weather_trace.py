@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""
+Lightweight timing spans for WeatherScope Pro.
+
+A Tracer keeps the most recent spans (name, start time, duration, thread,
+attributes) in a fixed-size ring buffer, so tracing can stay on in normal
+use at a cost of a few microseconds per span. The pipeline records:
+
+- network  one per HTTP request (endpoint, URL without the API key, bytes)
+- decode   response body -> dict / ForecastTable (endpoint)
+- process  building the data package (daily aggregation, suggestions, fingerprints)
+- forecast the dashboard's 24-hour and 5-day computations
+- render   one per UI section that re-rendered (section)
+- draw     one per redraw run by the RedrawScheduler (key: charts, map, gradients)
+- search   from pressing Search to the result being painted
+
+summary() aggregates them per name (and key attribute), and export_jsonl()
+writes one JSON object per span for offline analysis:
+
+    with tracer.span("decode", endpoint="forecast"):
+        table = decode_forecast(body)
+"""
+
+import json
+import threading
+import time
+from collections import deque
+
+DEFAULT_CAPACITY = 4096
+
+# Attribute that splits a span name into rows of the summary
+_GROUP_BY = ('endpoint', 'section', 'key', 'step')
+
+
+class _Span:
+    __slots__ = ('tracer', 'name', 'attrs', 'start')
+
+    def __init__(self, tracer, name, attrs):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.attrs['error'] = exc_type.__name__
+        self.tracer.record(self.name, time.perf_counter() - self.start, **self.attrs)
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Tracer:
+    """
+    Thread-safe ring buffer of timing spans. With `enabled` False, span()
+    and record() do nothing.
+    """
+    def __init__(self, capacity=DEFAULT_CAPACITY, enabled=True):
+        self.enabled = enabled
+        self._spans = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self.recorded = 0
+
+    def span(self, name, **attrs):
+        """Context manager that records how long its block took."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, attrs)
+
+    def record(self, name, duration, **attrs):
+        """Record a span measured elsewhere (`duration` in seconds, ending now)."""
+        if not self.enabled:
+            return
+        span = {
+            'name': name,
+            'start': time.time() - duration,
+            'ms': duration * 1000.0,
+            'thread': threading.current_thread().name,
+        }
+        if attrs:
+            span.update(attrs)
+        with self._lock:
+            self._spans.append(span)
+            self.recorded += 1
+
+    def spans(self, name=None):
+        """Buffered spans, oldest first (optionally only those called `name`)."""
+        with self._lock:
+            spans = list(self._spans)
+        return spans if name is None else [s for s in spans if s['name'] == name]
+
+    def clear(self):
+        with self._lock:
+            self._spans.clear()
+
+    def summary(self):
+        """
+        Rows {'span', 'count', 'mean_ms', 'p95_ms', 'max_ms', 'last_ms'}
+        per span name (split by endpoint/section/key), slowest total first.
+        """
+        groups = {}
+        for span in self.spans():
+            label = span['name']
+            for attr in _GROUP_BY:
+                if attr in span:
+                    label = f"{label}:{span[attr]}"
+                    break
+            groups.setdefault(label, []).append(span['ms'])
+        rows = []
+        for label, times in groups.items():
+            ordered = sorted(times)
+            rows.append({
+                'span': label,
+                'count': len(times),
+                'mean_ms': sum(times) / len(times),
+                'p95_ms': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+                'max_ms': ordered[-1],
+                'last_ms': times[-1],
+                '_total': sum(times),
+            })
+        rows.sort(key=lambda row: row.pop('_total'), reverse=True)
+        return rows
+
+    def export_jsonl(self, path):
+        """Write the buffered spans to `path`, one JSON object per line. Returns the count."""
+        spans = self.spans()
+        with open(path, 'w', encoding='utf-8') as f:
+            for span in spans:
+                f.write(json.dumps(span, default=str) + '\n')
+        return len(spans)
+
+
+# Shared disabled tracer for components created without one
+NULL_TRACER = Tracer(capacity=1, enabled=False)